@@ -5,16 +5,37 @@ AI Agent orchestrator - uses LangGraph multi-agent system for intelligent payrol
 from datetime import datetime
 from sqlalchemy.orm import Session
 from models.database import CrewMember, PayrollRecord, CrewAssignment
+from models.cache import crew_cache
+from models.fingerprint import record_fingerprint
+from rules.engine import CompiledRules, compiled_rules
+from scheduling.index import AssignmentIndex
+from scheduling.legality import DutyValidator, attach_violations
 import time
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 class CrewPayOrchestrator:
     """Orchestrates AI agents for crew payroll processing."""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        index: Optional[AssignmentIndex] = None,
+        rules: Optional[CompiledRules] = None,
+        run_id: Optional[int] = None
+    ):
+        """
+        An optional AssignmentIndex covering the period being processed
+        replaces the per-crew assignment query; optional CompiledRules for
+        that period replace the default rules in force on its start date.
+        Records are tagged with ``run_id`` when processed as part of a run.
+        """
         self.db = db
+        self.index = index
+        self.rules = rules
+        self.run_id = run_id
+        self.validator = DutyValidator()
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
     
     def process_crew_member(
@@ -32,102 +53,105 @@ class CrewPayOrchestrator:
         
         start_time = time.time()
         
-        crew = self.db.query(CrewMember).filter(
-            CrewMember.id == crew_member_id
-        ).first()
+        crew = crew_cache.get(self.db, crew_member_id)
         
         if not crew:
             raise ValueError(f"Crew member {crew_member_id} not found")
         
         # Get assignments
-        assignments = self.db.query(CrewAssignment).filter(
-            CrewAssignment.crew_member_id == crew_member_id,
-            CrewAssignment.duty_start >= period_start,
-            CrewAssignment.duty_start <= period_end
-        ).all()
-        
-        # Simulate AI agent processing
-        # In production, this would call LangGraph agents
-        
-        # Flight Time Calculator Agent
-        credit_hours = sum([a.credit_hours for a in assignments])
-        if credit_hours == 0:
-            for assignment in assignments:
-                if assignment.duty_start and assignment.duty_end:
-                    hours = (assignment.duty_end - assignment.duty_start).total_seconds() / 3600
-                    credit_hours += hours
-        
-        # Per Diem Calculator Agent (intelligent)
-        per_diem_days = 0.0
-        for assignment in assignments:
-            flight = assignment.flight
-            if flight:
-                # Intelligent per diem calculation
-                if flight.is_international:
-                    per_diem_days += 1.5  # International gets more
-                else:
-                    per_diem_days += 1.0
-        
-        # Premium Pay Calculator Agent
-        premium_pay = 0.0
-        for assignment in assignments:
-            flight = assignment.flight
-            if flight:
-                if flight.is_red_eye:
-                    premium_pay += 75.0  # AI catches more premium opportunities
-                # Check for holiday, etc.
+        if self.index is not None:
+            assignments = self.index.in_period(crew_member_id, period_start, period_end)
+        else:
+            assignments = self.db.query(CrewAssignment).filter(
+                CrewAssignment.crew_member_id == crew_member_id,
+                CrewAssignment.duty_start >= period_start,
+                CrewAssignment.duty_start <= period_end
+            ).all()
+        
+        payroll = self.calculate_payroll(
+            crew, assignments, period_start, period_end, start_time
+        )
         
-        # Guarantee Calculator Agent
-        paid_hours = max(credit_hours, 75.0)
+        self.db.add(payroll)
+        self.db.commit()
+        self.db.refresh(payroll)
         
-        # Base pay
-        base_pay = paid_hours * crew.hourly_rate
+        return {
+            "payroll_id": payroll.id,
+            "crew_member": f"{crew.first_name} {crew.last_name}",
+            "gross_pay": payroll.gross_pay,
+            "overtime_pay": payroll.overtime_pay,
+            "premium_pay": payroll.premium_pay,
+            "gross_pay_cents": payroll.gross_pay_cents,
+            "overtime_pay_cents": payroll.overtime_pay_cents,
+            "premium_pay_cents": payroll.premium_pay_cents,
+            "processing_time": payroll.processing_time_seconds,
+            "explanation": payroll.calculation_details
+        }
+    
+    def calculate_payroll(
+        self,
+        crew: CrewMember,
+        assignments: List[CrewAssignment],
+        period_start: datetime,
+        period_end: datetime,
+        start_time: float
+    ) -> PayrollRecord:
+        """Run the agent pipeline over already-loaded assignments (not persisted)."""
         
-        # Per diem
-        per_diem_pay = per_diem_days * 50.0  # $50 per day
+        # Simulate AI agent processing
+        # In production, this would call LangGraph agents
         
-        # Overtime
-        overtime_hours = max(0, credit_hours - 75.0)
-        overtime_pay = overtime_hours * crew.hourly_rate * 1.5
+        # Compliance Checker Agent: flag bad duty data before paying on it
+        violations = self.validator.validate_crew(crew.id, assignments)
         
-        gross_pay = base_pay + per_diem_pay + overtime_pay + premium_pay
+        # Flight Time, Per Diem, Premium Pay and Guarantee Calculator Agents
+        rules = self.rules or compiled_rules("ai_agent", period_start.date())
+        pay = rules.evaluator_for(crew.base, crew.position).evaluate(
+            crew.hourly_rate_cents, assignments
+        )
         
         processing_time = time.time() - start_time
         
         # Generate explanation (simulated AI explanation)
+        away = (
+            f" over {pay.tafb_hours:.1f} hours away from base"
+            if pay.tafb_hours is not None else ""
+        )
         explanation = (
             f"Processed payroll for {crew.first_name} {crew.last_name} "
-            f"({crew.employee_id}). Calculated {credit_hours:.2f} credit hours "
-            f"from {len(assignments)} assignments. Applied {per_diem_days:.1f} "
-            f"per diem days. Detected premium pay opportunities totaling ${premium_pay:.2f}. "
-            f"Final gross pay: ${gross_pay:,.2f}."
+            f"({crew.employee_id}). Calculated {pay.credit_hours:.2f} credit hours "
+            f"from {len(assignments)} assignments. Applied {pay.per_diem_days:.1f} "
+            f"per diem days{away}. "
+            f"Detected premium pay opportunities totaling ${pay.premium_pay:.2f}. "
+            f"Final gross pay: ${pay.gross_pay:,.2f}."
         )
+        if violations:
+            explanation += (
+                f" Flagged {len(violations)} duty violation(s) for review: "
+                + "; ".join(v.detail for v in violations[:3])
+                + ("." if len(violations) <= 3 else "; ...")
+            )
         
         payroll = PayrollRecord(
-            crew_member_id=crew_member_id,
+            crew_member_id=crew.id,
             period_start=period_start,
             period_end=period_end,
-            credit_hours=credit_hours,
-            paid_hours=paid_hours,
-            base_pay=base_pay,
-            per_diem_pay=per_diem_pay,
-            overtime_pay=overtime_pay,
-            premium_pay=premium_pay,
-            gross_pay=gross_pay,
+            credit_hours=pay.credit_hours,
+            paid_hours=pay.paid_hours,
+            tafb_hours=pay.tafb_hours,
+            base_pay_cents=pay.base_pay_cents,
+            per_diem_pay_cents=pay.per_diem_pay_cents,
+            overtime_pay_cents=pay.overtime_pay_cents,
+            premium_pay_cents=pay.premium_pay_cents,
+            gross_pay_cents=pay.gross_pay_cents,
             processing_system="ai_agent",
             processing_time_seconds=processing_time,
             processing_status="completed",
-            calculation_details=explanation
+            calculation_details=explanation,
+            run_id=self.run_id,
+            fingerprint=record_fingerprint(pay)
         )
+        attach_violations(payroll, violations)
         
-        self.db.add(payroll)
-        self.db.commit()
-        self.db.refresh(payroll)
-        
-        return {
-            "payroll_id": payroll.id,
-            "crew_member": f"{crew.first_name} {crew.last_name}",
-            "gross_pay": gross_pay,
-            "processing_time": processing_time,
-            "explanation": explanation
-        }
+        return payroll
@@ -0,0 +1,299 @@
+"""
+Event-driven payroll recompute after assignment and flight changes.
+
+Payroll otherwise only changes when an endpoint or a batch run calculates
+it. With ``RECOMPUTE_ON_CHANGE=1``, ORM writes to crew assignments and
+flights are captured from session events: each flush notes the affected
+(crew member, duty start) pairs and flight ids on the session, and once
+the transaction commits they are handed to the RecomputeRunner. Work that
+is rolled back is dropped.
+
+The runner's dispatcher thread resolves each change to the payroll periods
+already calculated for that crew member that contain it, and debounces
+per (crew member, period, engine): a recompute starts
+``RECOMPUTE_DEBOUNCE_SECONDS`` after the last change to it, so editing a
+whole trip costs one recalculation. Recomputes run on a small pool
+(``RECOMPUTE_WORKERS``) with the engine that produced the period's payroll
+and are saved as new payroll records. Nothing polls: the dispatcher sleeps
+until a change arrives or a deadline passes.
+
+As with the crew cache, only ORM writes made in this process are seen;
+bulk UPDATEs and other processes' writes are not.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from agents.orchestrator import CrewPayOrchestrator
+from mainframe.batch_processor import BatchProcessor
+from models.cache import crew_cache
+from models.database import CrewAssignment, Flight, PayrollRecord, SessionLocal
+from scheduling.index import AssignmentIndex
+
+# (crew member id, duty start) touched by a change
+Change = Tuple[int, datetime]
+# (crew member id, period start, period end, processing system) to recompute
+Key = Tuple[int, datetime, datetime, str]
+
+# Ids per IN clause while resolving changes
+_IN_CHUNK = 1000
+
+_CHANGES_INFO = "recompute_changes"
+
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(ids), _IN_CHUNK):
+        yield ids[start:start + _IN_CHUNK]
+
+
+class RecomputeRunner:
+    """Debounces captured changes and recomputes affected payroll in the background."""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        debounce_seconds: Optional[float] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.enabled = (
+            enabled if enabled is not None
+            else os.getenv("RECOMPUTE_ON_CHANGE", "0") == "1"
+        )
+        self.debounce_seconds = (
+            debounce_seconds if debounce_seconds is not None
+            else float(os.getenv("RECOMPUTE_DEBOUNCE_SECONDS", "2"))
+        )
+        self.max_workers = max_workers or int(os.getenv("RECOMPUTE_WORKERS", "2"))
+        self._cond = threading.Condition()
+        self._changes: Set[Change] = set()
+        self._flight_ids: Set[int] = set()
+        self._due: Dict[Key, float] = {}  # key -> monotonic deadline
+        self._running: Set[Key] = set()
+        self._resolving = False
+        self._stopping = False
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.changes_received = 0
+        self.debounced = 0
+        self.recomputed = 0
+        self.errors = 0
+
+    def notify(self, changes: Set[Change], flight_ids: Set[int]):
+        """Queue committed changes; called from the committing thread."""
+        with self._cond:
+            if self._stopping:
+                return
+            self._changes |= changes
+            self._flight_ids |= flight_ids
+            self.changes_received += len(changes) + len(flight_ids)
+            if self._dispatcher is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="recompute"
+                )
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="recompute-dispatcher", daemon=True
+                )
+                self._dispatcher.start()
+            self._cond.notify_all()
+
+    def _next_deadline(self) -> Optional[float]:
+        waiting = [deadline for key, deadline in self._due.items() if key not in self._running]
+        return min(waiting, default=None)
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not (self._changes or self._flight_ids or self._stopping):
+                    deadline = self._next_deadline()
+                    if deadline is not None and deadline <= time.monotonic():
+                        break
+                    self._cond.wait(None if deadline is None else deadline - time.monotonic())
+                changes, self._changes = self._changes, set()
+                flight_ids, self._flight_ids = self._flight_ids, set()
+                stopping = self._stopping
+                self._resolving = bool(changes or flight_ids)
+
+            if changes or flight_ids:
+                try:
+                    keys = self._resolve(changes, flight_ids)
+                except Exception as e:
+                    keys = set()
+                    print(f"Error resolving payroll changes: {e}")
+                deadline = time.monotonic() + self.debounce_seconds
+                with self._cond:
+                    for key in keys:
+                        if key in self._due:
+                            self.debounced += 1
+                        self._due[key] = deadline
+                    self._resolving = False
+                    self._cond.notify_all()
+
+            self._submit_due(flush=stopping)
+            if stopping:
+                return
+
+    def _resolve(self, changes: Set[Change], flight_ids: Set[int]) -> Set[Key]:
+        """Map changes to the calculated payroll periods that contain them."""
+        db = SessionLocal()
+        try:
+            changes = set(changes)
+            for ids in _chunks(sorted(flight_ids)):
+                changes.update(db.query(
+                    CrewAssignment.crew_member_id, CrewAssignment.duty_start
+                ).filter(CrewAssignment.flight_id.in_(ids)))
+
+            starts_by_crew = defaultdict(list)
+            for crew_id, duty_start in changes:
+                if crew_id is not None and duty_start is not None:
+                    starts_by_crew[crew_id].append(duty_start)
+
+            keys = set()
+            for ids in _chunks(sorted(starts_by_crew)):
+                periods = db.query(
+                    PayrollRecord.crew_member_id, PayrollRecord.period_start,
+                    PayrollRecord.period_end, PayrollRecord.processing_system
+                ).filter(PayrollRecord.crew_member_id.in_(ids)).distinct()
+                for crew_id, period_start, period_end, system in periods:
+                    # Same bounds the engines use to pick a period's assignments
+                    if any(period_start <= start <= period_end for start in starts_by_crew[crew_id]):
+                        keys.add((crew_id, period_start, period_end, system))
+            return keys
+        finally:
+            db.close()
+
+    def _submit_due(self, flush: bool = False):
+        now = time.monotonic()
+        with self._cond:
+            ready = [
+                key for key, deadline in self._due.items()
+                if key not in self._running and (flush or deadline <= now)
+            ]
+            for key in ready:
+                del self._due[key]
+                self._running.add(key)
+        for key in ready:
+            self._executor.submit(self._recompute, key)
+
+    def _recompute(self, key: Key):
+        # A key that came due again while this ran stays in _due; on shutdown
+        # nothing else will submit it, so run it again here.
+        while True:
+            self._recompute_once(key)
+            with self._cond:
+                if not (self._stopping and key in self._due):
+                    self._running.discard(key)
+                    self._cond.notify_all()
+                    return
+                del self._due[key]
+
+    def _recompute_once(self, key: Key):
+        crew_id, period_start, period_end, system = key
+        start_time = time.time()
+        db = SessionLocal()
+        try:
+            crew = crew_cache.get(db, crew_id)
+            if crew is not None:
+                index = AssignmentIndex.load(db, period_start, period_end, crew_ids=[crew_id])
+                engine = BatchProcessor(db) if system == "mainframe" else CrewPayOrchestrator(db)
+                payroll = engine.calculate_payroll(
+                    crew, index.in_period(crew_id, period_start, period_end),
+                    period_start, period_end, start_time
+                )
+                db.add(payroll)
+                db.commit()
+                with self._cond:
+                    self.recomputed += 1
+        except Exception as e:
+            db.rollback()
+            with self._cond:
+                self.errors += 1
+            print(f"Error recomputing payroll for crew {crew_id}: {e}")
+        finally:
+            db.close()
+
+    def wait_idle(self, timeout: float = 30.0) -> bool:
+        """Block until every queued change has been recomputed; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._changes or self._flight_ids or self._resolving or self._due or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "debounce_seconds": self.debounce_seconds,
+                "workers": self.max_workers,
+                "pending": len(self._due),
+                "running": len(self._running),
+                "changes_received": self.changes_received,
+                "debounced": self.debounced,
+                "recomputed": self.recomputed,
+                "errors": self.errors,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop taking changes and recompute everything still pending without waiting out its debounce."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            dispatcher, executor = self._dispatcher, self._executor
+        if dispatcher is not None:
+            dispatcher.join()
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+recompute_runner = RecomputeRunner()
+
+
+def _assignment_changes(assignment: CrewAssignment) -> Set[Change]:
+    """Current and previous (crew member, duty start) of a flushed assignment."""
+    state = inspect(assignment)
+    crew_ids = [v for v in state.attrs.crew_member_id.history.sum() if v is not None]
+    starts = [v for v in state.attrs.duty_start.history.sum() if v is not None]
+    return {(crew_id, start) for crew_id in crew_ids for start in starts}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session, flush_context):
+    """Note assignment and flight writes on the session until it commits."""
+    if not recompute_runner.enabled:
+        return
+
+    changes, flight_ids = session.info.setdefault(_CHANGES_INFO, (set(), set()))
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, CrewAssignment):
+            changes |= _assignment_changes(obj)
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, CrewAssignment):
+            changes |= _assignment_changes(obj)
+        elif isinstance(obj, Flight):
+            flight_ids.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session):
+    captured = session.info.pop(_CHANGES_INFO, None)
+    if captured and (captured[0] or captured[1]):
+        recompute_runner.notify(*captured)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_changes(session):
+    session.info.pop(_CHANGES_INFO, None)
@@ -0,0 +1,179 @@
+"""
+Admission control for the API's endpoint classes.
+
+Every costed endpoint belongs to one class:
+
+    interactive  crew lookups, reports and drift summaries
+    single       one crew member (or one explicit list) calculated on request
+    batch        fleet-wide batch runs
+
+Each class has its own concurrency limit and a bounded FIFO queue, so two
+overlapping batch runs cannot take every database connection away from
+interactive traffic. A request that finds the queue full is rejected at
+once with 429; one that waits longer than the class's queue timeout gets
+503. Both carry a Retry-After estimated from how long the class's requests
+have recently held their slot.
+
+Limits come from ``ADMISSION_<CLASS>_CONCURRENCY``, ``ADMISSION_<CLASS>_QUEUE``
+and ``ADMISSION_<CLASS>_TIMEOUT_SECONDS``. Waiting happens on the event
+loop, so endpoints that do blocking work should be plain ``def`` handlers
+(run on the thread pool) for the limits to keep the loop responsive.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict
+
+from fastapi import Depends, HTTPException
+
+# class: (concurrency, queue, queue timeout seconds)
+DEFAULT_LIMITS = {
+    "interactive": (32, 64, 2.0),
+    "single": (8, 16, 10.0),
+    "batch": (1, 1, 30.0),
+}
+
+# Weight of the newest sample in the moving average of slot hold times
+_HOLD_SMOOTHING = 0.2
+
+
+class AdmissionLimit:
+    """Concurrency limit with a bounded wait queue for one endpoint class."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout_seconds: float
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.active = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.avg_hold_seconds = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if needed; raises 429/503 when overloaded."""
+        start = time.monotonic()
+
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self._admit(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise self._overloaded(429, "queue is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timed_out += 1
+            raise self._overloaded(503, "timed out waiting for a slot")
+
+        self._admit(time.monotonic() - start)
+
+    def release(self, hold_seconds: float = None):
+        """Free a slot, handing it straight to the oldest waiter if there is one."""
+        if hold_seconds is not None:
+            self.avg_hold_seconds = (
+                hold_seconds if self.avg_hold_seconds is None
+                else self.avg_hold_seconds + _HOLD_SMOOTHING * (hold_seconds - self.avg_hold_seconds)
+            )
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def retry_after_seconds(self) -> int:
+        """Rough time until a slot frees up for a request joining the queue now."""
+        hold = self.avg_hold_seconds or 1.0
+        return max(1, math.ceil(hold * (len(self._waiters) + 1) / self.max_concurrent))
+
+    def _admit(self, wait_seconds: float):
+        self.admitted += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def _overloaded(self, status_code: int, reason: str) -> HTTPException:
+        return HTTPException(
+            status_code=status_code,
+            detail=f"Too many {self.name} requests: {reason}",
+            headers={"Retry-After": str(self.retry_after_seconds())}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout_seconds,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": self.total_wait_seconds / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "avg_hold_seconds": self.avg_hold_seconds or 0.0,
+        }
+
+
+def _limit_from_env(name: str) -> AdmissionLimit:
+    concurrency, queue, timeout = DEFAULT_LIMITS[name]
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdmissionLimit(
+        name,
+        max_concurrent=int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+        queue_timeout_seconds=float(os.getenv(f"{prefix}_TIMEOUT_SECONDS", str(timeout)))
+    )
+
+
+admission_limits = {name: _limit_from_env(name) for name in DEFAULT_LIMITS}
+
+
+def admission(name: str):
+    """Route dependency holding a slot of the named class until the response is sent."""
+    limit = admission_limits[name]
+
+    async def hold_slot():
+        await limit.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            limit.release(time.monotonic() - start)
+
+    return Depends(hold_slot)
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Per-class counters for the metrics endpoint."""
+    return {name: limit.stats() for name, limit in admission_limits.items()}
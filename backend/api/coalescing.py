@@ -0,0 +1,70 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+A dashboard refresh can fire the same /compare or /ai-agent/process call
+for one crew member and period many times at once. The first caller
+starts the computation on the thread pool; callers that arrive with the
+same key while it is still running await that computation instead of
+starting their own, and all of them receive its result (or its error).
+The key is dropped as soon as the computation finishes, so a later
+request always computes afresh.
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """Share one in-flight computation between identical concurrent calls."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run ``fn(*args)`` on the thread pool unless ``key`` is already running.
+
+        The computation is shielded: a caller that goes away does not cancel
+        it for the others. ``fn`` must not depend on any one caller's
+        request state (e.g. it opens its own database session), and its
+        result is shared, so it should not be mutated by callers.
+        """
+        with self._lock:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+                task.add_done_callback(lambda done: self._finish(key, done))
+                self._inflight[key] = task
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            if task.cancelled() or task.exception() is not None:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            calls = self.executions + self.coalesced
+            return {
+                "in_flight": len(self._inflight),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "coalesce_rate": self.coalesced / calls if calls else 0.0,
+            }
+
+
+request_coalescer = SingleFlight()
@@ -3,32 +3,62 @@ FastAPI routes for crew pay demo system.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
+import time
 
+from api.admission import admission, admission_stats
+from api.coalescing import request_coalescer
+from api.serialization import FastJSONResponse, payroll_response, serialized
 from api.schemas import (
     CrewMemberResponse, PayrollCalculationRequest, PayrollResponse,
     ComparisonRequest, ComparisonResponse, BatchProcessRequest,
-    BatchProcessResponse, HealthResponse
+    BatchProcessResponse, HealthResponse, RollupResponse,
+    MultiPeriodBatchRequest, MultiPeriodBatchResponse, DutyViolationResponse,
+    ShadowDriftResponse, MultiCrewPayrollRequest, MultiCrewPayrollItem,
+    MultiCrewPayrollResponse, SimulationRequest, SimulationResponse,
+    SimulationGroupDelta, PayrollRunResponse, RunDiffResponse,
+    DistributedBatchResponse, DistributedBatchStatus
 )
-from models.database import get_db, CrewMember, PayrollRecord
+from models.database import (
+    get_db, get_read_db, get_read_router, SessionLocal, CrewMember, PayrollRecord
+)
+from models.cache import crew_cache
+from models.money import from_cents
 from mainframe.batch_processor import BatchProcessor
+from mainframe.distributed import enqueue_batch, queue_status
 from agents.orchestrator import CrewPayOrchestrator
+from agents.recompute import recompute_runner
 from comparison.analyzer import ComparisonAnalyzer
+from comparison.runs import diff_runs, finish_run, list_runs, start_run
+from comparison.shadow import get_drift_summaries, shadow_runner
+from rules.engine import PayRule, compiled_rules
+from rules.simulation import simulate_rule_changes
+from scheduling.index import AssignmentIndex
+from scheduling.records import iter_active_crew_chunks
+from scheduling.legality import DutyValidator
+from reporting.export import EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_payroll_export
+from reporting.rollups import RollupAccumulator, get_rollups
 
-router = APIRouter()
+# Read-only handlers depend on get_read_db, which routes to a read replica
+# when one is configured and caught up; everything that writes uses get_db.
+# Costed endpoints hold an admission slot of their class (see api/admission.py);
+# handlers that block for long are plain functions so they run on the thread pool.
+router = APIRouter(default_response_class=FastJSONResponse)
 
 # ============================================================================
 # CREW MEMBER ENDPOINTS
 # ============================================================================
 
-@router.get("/crew", response_model=List[CrewMemberResponse])
+@router.get("/crew", response_model=List[CrewMemberResponse],
+            dependencies=[admission("interactive")])
 async def list_crew_members(
     skip: int = 0,
     limit: int = 100,
     position: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of crew members."""
     query = db.query(CrewMember).filter(CrewMember.status == "active")
@@ -37,12 +67,45 @@ async def list_crew_members(
         query = query.filter(CrewMember.position == position)
     
     crew_members = query.offset(skip).limit(limit).all()
-    return crew_members
+    return serialized([CrewMemberResponse.model_validate(c) for c in crew_members])
 
-@router.get("/crew/{crew_id}", response_model=CrewMemberResponse)
-async def get_crew_member(crew_id: int, db: Session = Depends(get_db)):
+@router.get("/crew/duty-violations", response_model=List[DutyViolationResponse],
+            dependencies=[admission("interactive")])
+def list_duty_violations(
+    period_start: datetime,
+    period_end: datetime,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Validate duty legality for the active fleet over a period.
+    
+    Flags overlapping duties, insufficient rest and over-long duties
+    without running any pay calculation. Crew are swept in
+    BATCH_CHUNK_SIZE chunks with one assignment query each, so only one
+    chunk's assignments are in memory at a time.
+    """
+    validator = DutyValidator()
+    violations = []
+    for chunk in iter_active_crew_chunks(db):
+        index = AssignmentIndex.load(
+            db, period_start, period_end,
+            crew_id_range=(chunk[0].id, chunk[-1].id)
+        )
+        results = validator.validate_index(index)
+        # The id range can take in inactive crew between active ones
+        violations.extend(
+            DutyViolationResponse.model_construct(**violation.to_dict())
+            for crew in chunk if crew.id in results
+            for violation in results[crew.id]
+        )
+    
+    return serialized(violations)
+
+@router.get("/crew/{crew_id}", response_model=CrewMemberResponse,
+            dependencies=[admission("interactive")])
+async def get_crew_member(crew_id: int, db: Session = Depends(get_read_db)):
     """Get specific crew member."""
-    crew = db.query(CrewMember).filter(CrewMember.id == crew_id).first()
+    crew = crew_cache.get(db, crew_id)
     
     if not crew:
         raise HTTPException(status_code=404, detail="Crew member not found")
@@ -53,8 +116,9 @@ async def get_crew_member(crew_id: int, db: Session = Depends(get_db)):
 # MAINFRAME PROCESSING ENDPOINTS
 # ============================================================================
 
-@router.post("/mainframe/process", response_model=PayrollResponse)
-async def process_mainframe(
+@router.post("/mainframe/process", response_model=PayrollResponse,
+             dependencies=[admission("single")])
+def process_mainframe(
     request: PayrollCalculationRequest,
     db: Session = Depends(get_db)
 ):
@@ -73,9 +137,7 @@ async def process_mainframe(
     
     try:
         # Process single crew (part of batch simulation)
-        crew = db.query(CrewMember).filter(
-            CrewMember.id == request.crew_member_id
-        ).first()
+        crew = crew_cache.get(db, request.crew_member_id)
         
         if not crew:
             raise HTTPException(status_code=404, detail="Crew member not found")
@@ -87,29 +149,18 @@ async def process_mainframe(
             request.period_end
         )
         
-        return PayrollResponse(
-            payroll_id=payroll.id,
-            crew_member=f"{crew.first_name} {crew.last_name}",
-            period_start=payroll.period_start,
-            period_end=payroll.period_end,
-            credit_hours=payroll.credit_hours,
-            paid_hours=payroll.paid_hours,
-            base_pay=payroll.base_pay,
-            per_diem_pay=payroll.per_diem_pay,
-            overtime_pay=payroll.overtime_pay,
-            premium_pay=payroll.premium_pay,
-            gross_pay=payroll.gross_pay,
-            processing_system=payroll.processing_system,
-            processing_time_seconds=payroll.processing_time_seconds,
-            processing_status=payroll.processing_status,
-            explanation=payroll.calculation_details
-        )
+        return serialized(payroll_response(
+            payroll,
+            f"{crew.first_name} {crew.last_name}",
+            payroll.calculation_details
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/mainframe/batch", response_model=BatchProcessResponse)
-async def process_mainframe_batch(
+@router.post("/mainframe/batch", response_model=BatchProcessResponse,
+             dependencies=[admission("batch")])
+def process_mainframe_batch(
     request: BatchProcessRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -132,7 +183,8 @@ async def process_mainframe_batch(
         stats = processor.run_batch_job(
             request.period_start,
             request.period_end,
-            simulate_delay=request.simulate_delay
+            simulate_delay=request.simulate_delay,
+            shadow_sample_rate=request.shadow_sample_rate
         )
         
         return BatchProcessResponse(
@@ -142,25 +194,84 @@ async def process_mainframe_batch(
             total_pay=stats['total_pay'],
             processing_time_seconds=stats['processing_time_seconds'],
             average_time_per_crew=stats['processing_time_seconds'] / max(stats['processed'], 1),
-            system="mainframe"
+            system="mainframe",
+            run_id=stats['run_id'],
+            shadow_run_id=stats['shadow_run_id']
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/mainframe/batch/multi-period", response_model=MultiPeriodBatchResponse,
+             dependencies=[admission("batch")])
+def process_mainframe_multi_period_batch(
+    request: MultiPeriodBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Run MAINFRAME batch processing for several pay periods at once.
+    
+    Used for retro and quarter-end reprocessing: assignments are scanned
+    once for the whole span instead of once per period.
+    """
+    processor = BatchProcessor(db)
+    
+    try:
+        stats = processor.run_multi_period_batch(
+            [(p.period_start, p.period_end) for p in request.periods],
+            simulate_delay=request.simulate_delay
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return MultiPeriodBatchResponse(system="mainframe", **stats)
+
+@router.post("/batch/distributed", response_model=DistributedBatchResponse,
+             dependencies=[admission("single")])
+def enqueue_distributed_batch(
+    request: BatchProcessRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a batch run for distributed workers (either engine).
+    
+    Writes one work item per chunk of active crew and returns at once;
+    workers started with ``python batch_worker.py work`` process them.
+    """
+    try:
+        run, items = enqueue_batch(db, request.period_start, request.period_end, request.system)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return DistributedBatchResponse(
+        run_id=run.id,
+        system=request.system,
+        period_start=request.period_start,
+        period_end=request.period_end,
+        work_items=items
+    )
+
+@router.get("/batch/distributed/{run_id}", response_model=DistributedBatchStatus,
+            dependencies=[admission("interactive")])
+def distributed_batch_status(run_id: int, db: Session = Depends(get_db)):
+    """Progress of a distributed run: work items by state, crew processed and errors."""
+    status = queue_status(db, run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    return status
+
 # ============================================================================
 # AI AGENT PROCESSING ENDPOINTS
 # ============================================================================
 
-@router.post("/ai-agent/process", response_model=PayrollResponse)
-async def process_ai_agent(
-    request: PayrollCalculationRequest,
-    db: Session = Depends(get_db)
-):
+@router.post("/ai-agent/process", response_model=PayrollResponse,
+             dependencies=[admission("single")])
+async def process_ai_agent(request: PayrollCalculationRequest):
     """
     Process single crew member using AI AGENT system.
     
     This uses LangGraph multi-agent orchestration for real-time processing.
+    Identical concurrent requests share one calculation.
     """
     if request.system not in ["ai_agent", "both"]:
         raise HTTPException(
@@ -168,43 +279,46 @@ async def process_ai_agent(
             detail="System must be 'ai_agent' or 'both'"
         )
     
-    orchestrator = CrewPayOrchestrator(db)
-    
     try:
-        result = orchestrator.process_crew_member(
+        response = await request_coalescer.do(
+            ("ai_agent", request.crew_member_id, request.period_start, request.period_end),
+            _process_ai_agent,
             request.crew_member_id,
             request.period_start,
             request.period_end
         )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return serialized(response)
+
+def _process_ai_agent(
+    crew_member_id: int,
+    period_start: datetime,
+    period_end: datetime
+) -> PayrollResponse:
+    """Run and save the AI engine calculation in its own session (shared by coalesced callers)."""
+    db = SessionLocal()
+    try:
+        orchestrator = CrewPayOrchestrator(db)
+        result = orchestrator.process_crew_member(crew_member_id, period_start, period_end)
         
         # Fetch the saved payroll record
         payroll = db.query(PayrollRecord).filter(
             PayrollRecord.id == result['payroll_id']
         ).first()
         
-        return PayrollResponse(
-            payroll_id=payroll.id,
-            crew_member=result['crew_member'],
-            period_start=payroll.period_start,
-            period_end=payroll.period_end,
-            credit_hours=payroll.credit_hours,
-            paid_hours=payroll.paid_hours,
-            base_pay=payroll.base_pay,
-            per_diem_pay=payroll.per_diem_pay,
-            overtime_pay=payroll.overtime_pay,
-            premium_pay=payroll.premium_pay,
-            gross_pay=payroll.gross_pay,
-            processing_system=payroll.processing_system,
-            processing_time_seconds=payroll.processing_time_seconds,
-            processing_status=payroll.processing_status,
-            explanation=result['explanation']
+        return payroll_response(
+            payroll,
+            result['crew_member'],
+            result['explanation']
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        db.close()
 
-@router.post("/ai-agent/batch", response_model=BatchProcessResponse)
-async def process_ai_agent_batch(
+@router.post("/ai-agent/batch", response_model=BatchProcessResponse,
+             dependencies=[admission("batch")])
+def process_ai_agent_batch(
     request: BatchProcessRequest,
     db: Session = Depends(get_db)
 ):
@@ -219,31 +333,41 @@ async def process_ai_agent_batch(
             detail="This endpoint only processes AI agent batch"
         )
     
-    orchestrator = CrewPayOrchestrator(db)
-    
-    # Get all active crew
-    crew_members = db.query(CrewMember).filter(
-        CrewMember.status == "active"
-    ).all()
-    
-    total_crew = len(crew_members)
+    total_crew = 0
     processed = 0
     errors = 0
-    total_pay = 0.0
+    rollups = RollupAccumulator()
+    rules = compiled_rules("ai_agent", request.period_start.date())
     start_time = datetime.utcnow()
+    run = start_run(db, request.period_start, request.period_end, "ai_agent")
     
-    for crew in crew_members:
-        try:
-            result = orchestrator.process_crew_member(
-                crew.id,
-                request.period_start,
-                request.period_end
-            )
-            processed += 1
-            total_pay += result['gross_pay']
-        except Exception as e:
-            errors += 1
-            print(f"Error processing {crew.employee_id}: {e}")
+    # Stream active crew in chunks, with one assignment query per chunk
+    for chunk in iter_active_crew_chunks(db):
+        total_crew += len(chunk)
+        index = AssignmentIndex.load(
+            db, request.period_start, request.period_end,
+            crew_id_range=(chunk[0].id, chunk[-1].id)
+        )
+        orchestrator = CrewPayOrchestrator(db, index=index, rules=rules, run_id=run.id)
+        
+        for crew in chunk:
+            try:
+                result = orchestrator.process_crew_member(
+                    crew.id,
+                    request.period_start,
+                    request.period_end
+                )
+                processed += 1
+                rollups.add(
+                    crew, result['gross_pay_cents'],
+                    result['overtime_pay_cents'], result['premium_pay_cents']
+                )
+            except Exception as e:
+                errors += 1
+                print(f"Error processing {crew.employee_id}: {e}")
+    
+    rollups.store(db, request.period_start, request.period_end, "ai_agent")
+    finish_run(db, run)
     
     end_time = datetime.utcnow()
     processing_time = (end_time - start_time).total_seconds()
@@ -252,98 +376,367 @@ async def process_ai_agent_batch(
         total_crew=total_crew,
         processed=processed,
         errors=errors,
-        total_pay=total_pay,
+        total_pay=rollups.gross_pay,
         processing_time_seconds=processing_time,
         average_time_per_crew=processing_time / max(processed, 1),
-        system="ai_agent"
+        system="ai_agent",
+        run_id=run.id
     )
 
 # ============================================================================
-# COMPARISON ENDPOINT
+# MULTI-CREW PROCESSING
 # ============================================================================
 
-@router.post("/compare", response_model=ComparisonResponse)
-async def compare_systems(
-    request: ComparisonRequest,
+@router.post("/payroll/process", response_model=MultiCrewPayrollResponse,
+             dependencies=[admission("single")])
+def process_multiple_crew(
+    request: MultiCrewPayrollRequest,
     db: Session = Depends(get_db)
 ):
+    """
+    Calculate payroll for a list of crew members with either engine.
+    
+    Crew (via the cache) and all their assignments are fetched with one
+    query each, every payroll is written in a single commit, and results
+    come back in request order. A crew member that is missing or fails to
+    calculate gets an error entry instead of failing the whole request.
+    """
+    start_time = time.time()
+    crew_ids = list(dict.fromkeys(request.crew_member_ids))
+    
+    crew_by_id = crew_cache.get_many(db, crew_ids)
+    index = AssignmentIndex.load(
+        db, request.period_start, request.period_end, crew_ids=list(crew_by_id)
+    )
+    rules = compiled_rules(request.system, request.period_start.date())
+    if request.system == "mainframe":
+        engine = BatchProcessor(db, index=index, rules=rules)
+    else:
+        engine = CrewPayOrchestrator(db, index=index, rules=rules)
+    
+    items = []
+    payrolls = []
+    for crew_id in crew_ids:
+        crew = crew_by_id.get(crew_id)
+        if crew is None:
+            items.append(MultiCrewPayrollItem(crew_member_id=crew_id, error="Crew member not found"))
+            continue
+        try:
+            payroll = engine.calculate_payroll(
+                crew,
+                index.in_period(crew_id, request.period_start, request.period_end),
+                request.period_start,
+                request.period_end,
+                time.time()
+            )
+        except Exception as e:
+            items.append(MultiCrewPayrollItem(crew_member_id=crew_id, error=str(e)))
+            continue
+        items.append(MultiCrewPayrollItem(crew_member_id=crew_id))
+        payrolls.append((items[-1], crew, payroll))
+    
+    try:
+        db.add_all([payroll for _, _, payroll in payrolls])
+        db.flush()
+        # Build responses from the flushed objects; after commit they would
+        # be expired and reloaded one query at a time
+        for item, crew, payroll in payrolls:
+            item.payroll = payroll_response(
+                payroll,
+                f"{crew.first_name} {crew.last_name}",
+                payroll.calculation_details
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return serialized(MultiCrewPayrollResponse(
+        system=request.system,
+        requested=len(crew_ids),
+        succeeded=len(payrolls),
+        failed=len(crew_ids) - len(payrolls),
+        processing_time_seconds=time.time() - start_time,
+        results=items
+    ))
+
+@router.post("/payroll/simulate", response_model=SimulationResponse,
+             dependencies=[admission("batch")])
+def simulate_payroll(
+    request: SimulationRequest,
+    db: Session = Depends(get_read_db)
+):
+    """
+    What-if simulation of fleet pay under hypothetical rule changes.
+    
+    Every active crew member's pay for the period is calculated in memory
+    under the current rules and under the overrides; nothing is saved.
+    Returns the fleet totals and the deltas per base and position.
+    """
+    start_time = time.time()
+    
+    try:
+        overrides = [
+            PayRule(request.system, o.parameters, base=o.base, position=o.position)
+            for o in request.overrides
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        result = simulate_rule_changes(
+            db, request.system, request.period_start, request.period_end, overrides
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    baseline = result.total_cents("baseline")
+    scenario = result.total_cents("scenario")
+    return serialized(SimulationResponse(
+        system=request.system,
+        period_start=request.period_start,
+        period_end=request.period_end,
+        crew_count=result.crew_count,
+        baseline_gross_pay=from_cents(baseline),
+        scenario_gross_pay=from_cents(scenario),
+        gross_pay_delta=from_cents(scenario - baseline),
+        processing_time_seconds=time.time() - start_time,
+        groups=[
+            SimulationGroupDelta(
+                base=group.base,
+                position=group.position,
+                headcount=group.headcount,
+                baseline_gross_pay=from_cents(group.total_cents("baseline", "gross_pay_cents")),
+                scenario_gross_pay=from_cents(group.total_cents("scenario", "gross_pay_cents")),
+                gross_pay_delta=from_cents(group.delta_cents("gross_pay_cents")),
+                base_pay_delta=from_cents(group.delta_cents("base_pay_cents")),
+                per_diem_pay_delta=from_cents(group.delta_cents("per_diem_pay_cents")),
+                overtime_pay_delta=from_cents(group.delta_cents("overtime_pay_cents")),
+                premium_pay_delta=from_cents(group.delta_cents("premium_pay_cents"))
+            )
+            for group in result.sorted_groups()
+        ]
+    ))
+
+# ============================================================================
+# COMPARISON ENDPOINT
+# ============================================================================
+
+@router.post("/compare", response_model=ComparisonResponse,
+             dependencies=[admission("single")])
+async def compare_systems(request: ComparisonRequest):
     """
     Compare MAINFRAME vs AI AGENT systems side-by-side.
     
     Processes the same crew member with both systems and analyzes differences.
+    Identical concurrent requests share one comparison.
+    """
+    response = await request_coalescer.do(
+        ("compare", request.crew_member_id, request.period_start, request.period_end),
+        _compare_systems,
+        request
+    )
+    return serialized(response)
+
+def _compare_systems(request: ComparisonRequest) -> ComparisonResponse:
+    """Run both engines in their own session (shared by coalesced callers)."""
+    db = SessionLocal()
+    try:
+        # Get crew member (the AI engine below reuses the cached entry)
+        crew = crew_cache.get(db, request.crew_member_id)
+        
+        if not crew:
+            raise HTTPException(status_code=404, detail="Crew member not found")
+        
+        # Both engines read the crew's assignments from one shared index
+        index = AssignmentIndex.load(
+            db, request.period_start, request.period_end, crew_ids=[crew.id]
+        )
+        
+        # Process with mainframe
+        mainframe_processor = BatchProcessor(db, index=index)
+        mainframe_start = datetime.utcnow()
+        mainframe_payroll = mainframe_processor._process_crew_member(
+            crew,
+            request.period_start,
+            request.period_end
+        )
+        mainframe_time = (datetime.utcnow() - mainframe_start).total_seconds()
+        
+        # Process with AI agents
+        ai_orchestrator = CrewPayOrchestrator(db, index=index)
+        ai_result = ai_orchestrator.process_crew_member(
+            crew.id,
+            request.period_start,
+            request.period_end
+        )
+        
+        ai_payroll = db.query(PayrollRecord).filter(
+            PayrollRecord.id == ai_result['payroll_id']
+        ).first()
+        
+        # Compare results
+        analyzer = ComparisonAnalyzer()
+        comparison = analyzer.compare_payroll_records(
+            mainframe_payroll,
+            ai_payroll,
+            mainframe_time,
+            ai_result['processing_time']
+        )
+        
+        return ComparisonResponse(
+            crew_member=f"{crew.first_name} {crew.last_name}",
+            period=f"{request.period_start.date()} to {request.period_end.date()}",
+            mainframe_result={
+                "gross_pay": mainframe_payroll.gross_pay,
+                "processing_time": mainframe_time,
+                "credit_hours": mainframe_payroll.credit_hours,
+                "base_pay": mainframe_payroll.base_pay,
+                "per_diem": mainframe_payroll.per_diem_pay,
+                "premium_pay": mainframe_payroll.premium_pay
+            },
+            ai_agent_result={
+                "gross_pay": ai_payroll.gross_pay,
+                "processing_time": ai_result['processing_time'],
+                "credit_hours": ai_payroll.credit_hours,
+                "base_pay": ai_payroll.base_pay,
+                "per_diem": ai_payroll.per_diem_pay,
+                "premium_pay": ai_payroll.premium_pay,
+                "explanation": ai_result['explanation']
+            },
+            comparison=comparison['metrics'],
+            differences=comparison['differences'],
+            winner=comparison['winner'],
+            recommendation=comparison['recommendation']
+        )
+    finally:
+        db.close()
+
+@router.get("/shadow/drift", response_model=List[ShadowDriftResponse],
+            dependencies=[admission("interactive")])
+async def shadow_drift(
+    period_start: Optional[datetime] = None,
+    period_end: Optional[datetime] = None,
+    limit: int = 20,
+    db: Session = Depends(get_read_db)
+):
     """
+    Drift summaries from shadow runs of the AI engine.
     
-    # Get crew member
-    crew = db.query(CrewMember).filter(
-        CrewMember.id == request.crew_member_id
-    ).first()
+    Each mainframe batch run with a shadow sample rate above zero gets one
+    summary; it shows status "running" until every sampled crew member has
+    been compared.
+    """
+    summaries = get_drift_summaries(db, period_start, period_end, limit)
+    return serialized([ShadowDriftResponse.model_validate(s) for s in summaries])
+
+@router.get("/payroll/runs", response_model=List[PayrollRunResponse],
+            dependencies=[admission("interactive")])
+async def payroll_runs(
+    period_start: Optional[datetime] = None,
+    period_end: Optional[datetime] = None,
+    limit: int = 50,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Batch runs, most recent first, with their record counts and digests.
     
-    if not crew:
-        raise HTTPException(status_code=404, detail="Crew member not found")
+    Two completed runs of a period with the same digest paid every crew
+    member identically.
+    """
+    runs = list_runs(db, period_start, period_end, limit)
+    return serialized([PayrollRunResponse.model_validate(r) for r in runs])
+
+@router.get("/payroll/runs/{run_a}/diff/{run_b}", response_model=RunDiffResponse,
+            dependencies=[admission("single")])
+def diff_payroll_runs(run_a: int, run_b: int, db: Session = Depends(get_read_db)):
+    """
+    Crew whose pay changed between two runs of the same period.
     
-    # Process with mainframe
-    mainframe_processor = BatchProcessor(db)
-    mainframe_start = datetime.utcnow()
-    mainframe_payroll = mainframe_processor._process_crew_member(
-        crew,
-        request.period_start,
-        request.period_end
-    )
-    mainframe_time = (datetime.utcnow() - mainframe_start).total_seconds()
-    
-    # Process with AI agents
-    ai_orchestrator = CrewPayOrchestrator(db)
-    ai_result = ai_orchestrator.process_crew_member(
-        crew.id,
-        request.period_start,
-        request.period_end
-    )
+    Compares per-record fingerprints rather than records, so only changed
+    crew are loaded; each is reported with field-level deltas.
+    """
+    start_time = time.time()
     
-    ai_payroll = db.query(PayrollRecord).filter(
-        PayrollRecord.id == ai_result['payroll_id']
-    ).first()
-    
-    # Compare results
-    analyzer = ComparisonAnalyzer()
-    comparison = analyzer.compare_payroll_records(
-        mainframe_payroll,
-        ai_payroll,
-        mainframe_time,
-        ai_result['processing_time']
-    )
+    try:
+        diff = diff_runs(db, run_a, run_b)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return serialized(RunDiffResponse(
+        processing_time_seconds=time.time() - start_time,
+        **diff
+    ))
+
+# ============================================================================
+# REPORTING ENDPOINTS
+# ============================================================================
+
+@router.get("/payroll/export", dependencies=[admission("interactive")])
+async def export_payroll(
+    period_start: datetime,
+    period_end: datetime,
+    system: str = "mainframe",
+    format: str = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Stream all payroll records for a period and engine.
+    
+    Columns match the PayrollResponse schema. Supported formats are
+    csv, arrow (IPC stream) and parquet.
+    """
+    if system not in ["mainframe", "ai_agent"]:
+        raise HTTPException(
+            status_code=400,
+            detail="System must be 'mainframe' or 'ai_agent'"
+        )
     
-    return ComparisonResponse(
-        crew_member=f"{crew.first_name} {crew.last_name}",
-        period=f"{request.period_start.date()} to {request.period_end.date()}",
-        mainframe_result={
-            "gross_pay": mainframe_payroll.gross_pay,
-            "processing_time": mainframe_time,
-            "credit_hours": mainframe_payroll.credit_hours,
-            "base_pay": mainframe_payroll.base_pay,
-            "per_diem": mainframe_payroll.per_diem_pay,
-            "premium_pay": mainframe_payroll.premium_pay
-        },
-        ai_agent_result={
-            "gross_pay": ai_payroll.gross_pay,
-            "processing_time": ai_result['processing_time'],
-            "credit_hours": ai_payroll.credit_hours,
-            "base_pay": ai_payroll.base_pay,
-            "per_diem": ai_payroll.per_diem_pay,
-            "premium_pay": ai_payroll.premium_pay,
-            "explanation": ai_result['explanation']
-        },
-        comparison=comparison['metrics'],
-        differences=comparison['differences'],
-        winner=comparison['winner'],
-        recommendation=comparison['recommendation']
+    try:
+        content = stream_payroll_export(
+            db,
+            period_start,
+            period_end,
+            system,
+            export_format=format,
+            chunk_size=chunk_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filename = f"payroll_{system}_{period_start.date()}_{period_end.date()}.{format}"
+    
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
+@router.get("/payroll/rollups", response_model=List[RollupResponse],
+            dependencies=[admission("interactive")])
+async def payroll_rollups(
+    period_start: datetime,
+    period_end: datetime,
+    system: str = "mainframe",
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get per base/position totals for a period.
+    
+    Rollups are refreshed by batch runs, so this is a small indexed lookup
+    regardless of how many payroll records exist.
+    """
+    return get_rollups(db, period_start, period_end, system)
+
 # ============================================================================
 # HEALTH & STATUS
 # ============================================================================
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: Session = Depends(get_read_db)):
     """Health check endpoint."""
     
     # Test database
@@ -365,3 +758,15 @@ async def health_check(db: Session = Depends(get_db)):
         agents_available=agents_available,
         mainframe_available=True
     )
+
+@router.get("/metrics", response_model=Dict[str, Any])
+async def metrics():
+    """In-process metrics (cache hit rates, etc.)."""
+    return {
+        "crew_cache": crew_cache.stats(),
+        "coalescing": request_coalescer.stats(),
+        "admission": admission_stats(),
+        "shadow": shadow_runner.stats(),
+        "recompute": recompute_runner.stats(),
+        "read_replicas": get_read_router().stats()
+    }
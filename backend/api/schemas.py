@@ -2,7 +2,8 @@
 Pydantic schemas for API requests/responses.
 """
 
-from pydantic import BaseModel, Field
+import json
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
@@ -24,6 +25,17 @@ class PayrollCalculationRequest(BaseModel):
     period_end: datetime
     system: str = Field(..., pattern="^(mainframe|ai_agent|both)$")
 
+class DutyViolationResponse(BaseModel):
+    crew_member_id: int
+    kind: str  # "overlap", "insufficient_rest", "duty_too_long"
+    assignment_id: int
+    other_assignment_id: Optional[int] = None
+    hours: float
+    detail: str
+    
+    class Config:
+        from_attributes = True
+
 class PayrollResponse(BaseModel):
     payroll_id: int
     crew_member: str
@@ -31,6 +43,15 @@ class PayrollResponse(BaseModel):
     period_end: datetime
     credit_hours: float
     paid_hours: float
+    tafb_hours: Optional[float] = Field(
+        None,
+        description=(
+            "Hours away from base over the period's trips. Only computed when a "
+            "pay rule sets per_diem_per_tafb_hour; the built-in rules do not, so "
+            "default per diem is still per credit hour (mainframe) or per flight "
+            "day (ai_agent)."
+        )
+    )
     base_pay: float
     per_diem_pay: float
     overtime_pay: float
@@ -40,10 +61,30 @@ class PayrollResponse(BaseModel):
     processing_time_seconds: float
     processing_status: str
     explanation: Optional[str] = None
+    violations: List[DutyViolationResponse] = []
     
     class Config:
         from_attributes = True
 
+class MultiCrewPayrollRequest(BaseModel):
+    crew_member_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    period_start: datetime
+    period_end: datetime
+    system: str = Field(..., pattern="^(mainframe|ai_agent)$")
+
+class MultiCrewPayrollItem(BaseModel):
+    crew_member_id: int
+    payroll: Optional[PayrollResponse] = None
+    error: Optional[str] = None
+
+class MultiCrewPayrollResponse(BaseModel):
+    system: str
+    requested: int
+    succeeded: int
+    failed: int
+    processing_time_seconds: float
+    results: List[MultiCrewPayrollItem]
+
 class ComparisonRequest(BaseModel):
     crew_member_id: int
     period_start: datetime
@@ -67,6 +108,9 @@ class BatchProcessRequest(BaseModel):
     period_end: datetime
     system: str = Field(..., pattern="^(mainframe|ai_agent)$")
     simulate_delay: bool = True
+    # Fraction of crew re-run by the AI engine in shadow (mainframe only);
+    # None uses SHADOW_SAMPLE_RATE
+    shadow_sample_rate: Optional[float] = Field(None, ge=0, le=1)
 
 class BatchProcessResponse(BaseModel):
     total_crew: int
@@ -76,6 +120,134 @@ class BatchProcessResponse(BaseModel):
     processing_time_seconds: float
     average_time_per_crew: float
     system: str
+    run_id: Optional[int] = None
+    shadow_run_id: Optional[int] = None
+
+class PayPeriod(BaseModel):
+    period_start: datetime
+    period_end: datetime
+
+class MultiPeriodBatchRequest(BaseModel):
+    periods: List[PayPeriod] = Field(..., min_length=1)
+    simulate_delay: bool = True
+
+class PeriodBatchResult(BaseModel):
+    period_start: datetime
+    period_end: datetime
+    run_id: Optional[int] = None
+    total_crew: int
+    processed: int
+    errors: int
+    total_pay: float
+
+class MultiPeriodBatchResponse(BaseModel):
+    total_crew: int
+    processed: int
+    errors: int
+    total_pay: float
+    assignments_scanned: int
+    processing_time_seconds: float
+    periods: List[PeriodBatchResult]
+    system: str
+
+class RollupResponse(BaseModel):
+    period_start: datetime
+    period_end: datetime
+    processing_system: str
+    base: str
+    position: str
+    headcount: int
+    gross_pay: float
+    overtime_pay: float
+    premium_pay: float
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ShadowDriftResponse(BaseModel):
+    id: int
+    period_start: datetime
+    period_end: datetime
+    sample_rate: float
+    status: str  # "running" or "completed"
+    crew_offered: int
+    sampled: int
+    skipped: int
+    compared: int
+    errors: int
+    matches: int
+    mismatches: int
+    total_difference_cents: int
+    max_difference_cents: int
+    max_difference_crew_member_id: Optional[int] = None
+    field_mismatches: Dict[str, int] = {}
+    mainframe_time_seconds: float
+    ai_agent_time_seconds: float
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    @field_validator("field_mismatches", mode="before")
+    @classmethod
+    def _parse_field_mismatches(cls, value):
+        # Stored as a JSON string column
+        return json.loads(value) if isinstance(value, str) else (value or {})
+    
+    class Config:
+        from_attributes = True
+
+class DistributedBatchResponse(BaseModel):
+    run_id: int
+    system: str
+    period_start: datetime
+    period_end: datetime
+    work_items: int
+
+class DistributedBatchStatus(BaseModel):
+    run_id: int
+    system: str
+    period_start: datetime
+    period_end: datetime
+    status: str  # run status: "running" or "completed"
+    work_items: Dict[str, int]  # count per item state
+    processed: int
+    errors: int
+    record_count: int
+    digest: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+
+class PayrollRunResponse(BaseModel):
+    id: int
+    period_start: datetime
+    period_end: datetime
+    processing_system: str
+    status: str  # "running" or "completed"
+    record_count: int
+    digest: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class RunCrewDiff(BaseModel):
+    crew_member_id: int
+    # ComparisonAnalyzer difference entries, values under "run_a"/"run_b"
+    differences: List[Dict[str, Any]]
+
+class RunDiffResponse(BaseModel):
+    run_a: int
+    run_b: int
+    period_start: datetime
+    period_end: datetime
+    identical: bool
+    crew_compared: int
+    gross_pay_delta: float  # run B minus run A
+    changed: List[RunCrewDiff]
+    added: List[int]  # crew member ids only in run B
+    removed: List[int]  # crew member ids only in run A
+    processing_time_seconds: float
 
 class HealthResponse(BaseModel):
     status: str
@@ -83,3 +255,47 @@ class HealthResponse(BaseModel):
     database: str
     agents_available: bool
     mainframe_available: bool
+
+class RuleOverride(BaseModel):
+    # Pay rule parameters to change (rules.engine.PARAMETER_NAMES), optionally
+    # only for one base and/or position
+    parameters: Dict[str, float] = Field(..., min_length=1)
+    base: Optional[str] = None
+    position: Optional[str] = None
+    
+    @field_validator("parameters")
+    @classmethod
+    def non_negative(cls, value):
+        negative = [name for name, amount in value.items() if amount < 0]
+        if negative:
+            raise ValueError(f"Parameters must not be negative: {', '.join(negative)}")
+        return value
+
+class SimulationRequest(BaseModel):
+    period_start: datetime
+    period_end: datetime
+    system: str = Field("mainframe", pattern="^(mainframe|ai_agent)$")
+    overrides: List[RuleOverride] = Field(..., min_length=1)
+
+class SimulationGroupDelta(BaseModel):
+    base: str
+    position: str
+    headcount: int
+    baseline_gross_pay: float
+    scenario_gross_pay: float
+    gross_pay_delta: float
+    base_pay_delta: float
+    per_diem_pay_delta: float
+    overtime_pay_delta: float
+    premium_pay_delta: float
+
+class SimulationResponse(BaseModel):
+    system: str
+    period_start: datetime
+    period_end: datetime
+    crew_count: int
+    baseline_gross_pay: float
+    scenario_gross_pay: float
+    gross_pay_delta: float
+    processing_time_seconds: float
+    groups: List[SimulationGroupDelta]
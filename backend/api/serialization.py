@@ -0,0 +1,84 @@
+"""
+Fast response serialization for payroll endpoints.
+
+Responses are built straight from ORM attributes without re-validation and
+encoded with orjson when it is installed. Each response carries a
+``Server-Timing: serialize;dur=<ms>`` header so benchmarks can report the
+serialization stage separately from the calculation itself.
+"""
+
+import time
+from typing import Any, List, Optional, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from api.schemas import DutyViolationResponse, PayrollResponse
+from models.database import PayrollRecord
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# PayrollResponse fields copied verbatim from PayrollRecord columns
+_RECORD_FIELDS = [
+    "period_start", "period_end", "credit_hours", "paid_hours", "tafb_hours", "base_pay",
+    "per_diem_pay", "overtime_pay", "premium_pay", "gross_pay",
+    "processing_system", "processing_time_seconds", "processing_status",
+]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def payroll_response(
+    payroll: PayrollRecord,
+    crew_member: str,
+    explanation: Optional[str] = None
+) -> PayrollResponse:
+    """
+    Build a PayrollResponse from a PayrollRecord without re-validating it.
+
+    The record's columns already have the schema's types, so model_construct
+    is safe here and skips pydantic's per-field validation.
+    """
+    values = {field: getattr(payroll, field) for field in _RECORD_FIELDS}
+    violations = [
+        DutyViolationResponse.model_construct(
+            **{field: getattr(v, field) for field in DutyViolationResponse.model_fields}
+        )
+        for v in payroll.violations
+    ]
+    return PayrollResponse.model_construct(
+        payroll_id=payroll.id,
+        crew_member=crew_member,
+        explanation=explanation,
+        violations=violations,
+        **values
+    )
+
+
+def serialized(
+    content: Union[BaseModel, List[BaseModel]],
+    status_code: int = 200
+) -> FastJSONResponse:
+    """Encode a model (or list of models) and record the time it took."""
+    start = time.perf_counter()
+    mode = "python" if orjson is not None else "json"
+
+    if isinstance(content, list):
+        data = [item.model_dump(mode=mode) for item in content]
+    else:
+        data = content.model_dump(mode=mode)
+
+    response = FastJSONResponse(data, status_code=status_code)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    response.headers["Server-Timing"] = f"serialize;dur={elapsed_ms:.3f}"
+    return response
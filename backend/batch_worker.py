@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Queue distributed batch runs and run the workers that process them.
+
+Workers on any number of nodes share the work queue in the configured
+DATABASE_URL; start more of them to go faster. ``--processes`` starts
+several in one go, which is the easiest way to try it locally against one
+PostgreSQL database.
+
+Usage:
+    python batch_worker.py enqueue --period-start 2024-01-01 --period-end 2024-01-31 [--system ai_agent]
+    python batch_worker.py work [--processes 4] [--exit-when-idle] [--simulate-delay]
+    python batch_worker.py status RUN_ID
+"""
+
+import argparse
+import multiprocessing
+import sys
+from datetime import datetime
+
+from models.database import SessionLocal, ensure_schema
+
+
+def enqueue(args):
+    from mainframe.distributed import enqueue_batch
+
+    db = SessionLocal()
+    try:
+        run, items = enqueue_batch(
+            db,
+            datetime.fromisoformat(args.period_start),
+            datetime.fromisoformat(args.period_end),
+            args.system,
+            args.chunk_size
+        )
+        print(f"Queued run {run.id}: {items} work item(s) for the {args.system} engine")
+    finally:
+        db.close()
+
+
+def _work(exit_when_idle: bool, simulate_delay: bool):
+    from mainframe.distributed import BatchWorker
+
+    worker = BatchWorker(simulate_delay=simulate_delay)
+    print(f"Worker {worker.worker_id} started")
+    worker.run(exit_when_idle=exit_when_idle)
+    print(
+        f"Worker {worker.worker_id} stopped: {worker.completed} item(s) done, "
+        f"{worker.lost} lost to expired leases, {worker.failed} failed"
+    )
+
+
+def work(args):
+    if args.processes == 1:
+        _work(args.exit_when_idle, args.simulate_delay)
+        return
+
+    # Spawn rather than fork, so no process inherits another's DB connections
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_work, args=(args.exit_when_idle, args.simulate_delay))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+def status(args):
+    from mainframe.distributed import queue_status
+
+    db = SessionLocal()
+    try:
+        result = queue_status(db, args.run_id)
+    finally:
+        db.close()
+    if result is None:
+        sys.exit(f"Payroll run {args.run_id} not found")
+
+    items = ", ".join(f"{state} {count}" for state, count in result["work_items"].items())
+    print(f"Run {result['run_id']} ({result['system']}): {result['status']}")
+    print(f"  work items: {items}")
+    print(f"  crew processed: {result['processed']}, errors: {result['errors']}")
+    if result["digest"]:
+        print(f"  records: {result['record_count']}, digest {result['digest']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="queue a batch run")
+    enqueue_parser.add_argument("--period-start", required=True, help="ISO date")
+    enqueue_parser.add_argument("--period-end", required=True, help="ISO date")
+    enqueue_parser.add_argument("--system", choices=["mainframe", "ai_agent"], default="mainframe")
+    enqueue_parser.add_argument("--chunk-size", type=int, help="crew per work item (default BATCH_CHUNK_SIZE)")
+    enqueue_parser.set_defaults(handler=enqueue)
+
+    work_parser = commands.add_parser("work", help="process queued work items")
+    work_parser.add_argument("--processes", type=int, default=1)
+    work_parser.add_argument("--exit-when-idle", action="store_true", help="stop once nothing is queued or claimed")
+    work_parser.add_argument("--simulate-delay", action="store_true", help="add mainframe-style per-crew delays")
+    work_parser.set_defaults(handler=work)
+
+    status_parser = commands.add_parser("status", help="show a run's progress")
+    status_parser.add_argument("run_id", type=int)
+    status_parser.set_defaults(handler=status)
+
+    args = parser.parse_args()
+    ensure_schema()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,16 @@
 Comparison analyzer for mainframe vs AI agent systems.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from models.database import PayrollRecord
+from models.money import MINUTES_PER_HOUR, from_cents, to_minutes
+
+# Fields compared between the engines, in report order
+COMPARED_FIELDS = ("gross_pay", "credit_hours", "per_diem_pay", "premium_pay")
+# Every pay-bearing PayrollRecord field
+RECORD_FIELDS = COMPARED_FIELDS + ("paid_hours", "base_pay", "overtime_pay")
+
+_HOURS_FIELDS = ("credit_hours", "paid_hours")
 
 
 class ComparisonAnalyzer:
@@ -22,48 +30,7 @@ class ComparisonAnalyzer:
         Returns detailed comparison with winner determination.
         """
         
-        differences = []
-        
-        # Compare gross pay
-        gross_diff = abs(mainframe.gross_pay - ai_agent.gross_pay)
-        if gross_diff > 0.01:  # More than 1 cent difference
-            differences.append({
-                "field": "gross_pay",
-                "mainframe": mainframe.gross_pay,
-                "ai_agent": ai_agent.gross_pay,
-                "difference": gross_diff,
-                "percentage": (gross_diff / mainframe.gross_pay * 100) if mainframe.gross_pay > 0 else 0
-            })
-        
-        # Compare credit hours
-        hours_diff = abs(mainframe.credit_hours - ai_agent.credit_hours)
-        if hours_diff > 0.01:
-            differences.append({
-                "field": "credit_hours",
-                "mainframe": mainframe.credit_hours,
-                "ai_agent": ai_agent.credit_hours,
-                "difference": hours_diff
-            })
-        
-        # Compare per diem
-        per_diem_diff = abs(mainframe.per_diem_pay - ai_agent.per_diem_pay)
-        if per_diem_diff > 0.01:
-            differences.append({
-                "field": "per_diem_pay",
-                "mainframe": mainframe.per_diem_pay,
-                "ai_agent": ai_agent.per_diem_pay,
-                "difference": per_diem_diff
-            })
-        
-        # Compare premium pay
-        premium_diff = abs(mainframe.premium_pay - ai_agent.premium_pay)
-        if premium_diff > 0.01:
-            differences.append({
-                "field": "premium_pay",
-                "mainframe": mainframe.premium_pay,
-                "ai_agent": ai_agent.premium_pay,
-                "difference": premium_diff
-            })
+        differences = self.field_differences(mainframe, ai_agent)
         
         # Performance metrics
         speed_improvement = (
@@ -93,6 +60,44 @@ class ComparisonAnalyzer:
             "recommendation": self._generate_recommendation(winner, differences, speed_improvement)
         }
     
+    def field_differences(
+        self,
+        left: PayrollRecord,
+        right: PayrollRecord,
+        labels: Tuple[str, str] = ("mainframe", "ai_agent"),
+        fields: Tuple[str, ...] = COMPARED_FIELDS
+    ) -> List[Dict[str, Any]]:
+        """
+        Fields on which two records differ, with both values under ``labels``.
+        
+        Pay is compared in integer cents and hours in whole minutes, so any
+        reported difference is real rather than float rounding noise.
+        """
+        
+        differences = []
+        for field in fields:
+            if field in _HOURS_FIELDS:
+                diff = abs(to_minutes(getattr(left, field)) - to_minutes(getattr(right, field)))
+                difference = diff / MINUTES_PER_HOUR
+            else:
+                left_cents = getattr(left, f"{field}_cents")
+                diff = abs(left_cents - getattr(right, f"{field}_cents"))
+                difference = from_cents(diff)
+            if not diff:
+                continue
+            
+            entry = {
+                "field": field,
+                labels[0]: getattr(left, field),
+                labels[1]: getattr(right, field),
+                "difference": difference
+            }
+            if field == "gross_pay":
+                entry["percentage"] = (diff / left_cents * 100) if left_cents > 0 else 0
+            differences.append(entry)
+        
+        return differences
+    
     def _determine_winner(
         self,
         differences: List[Dict],
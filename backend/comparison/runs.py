@@ -0,0 +1,200 @@
+"""
+Payroll runs and run-to-run diffs.
+
+Every batch run is recorded as a PayrollRun and tags the records it
+produces with its id. Each record carries a fingerprint of its pay content
+and, once the run finishes, the run stores a Merkle digest over them (see
+models.fingerprint).
+
+diff_runs() answers "whose pay changed between run A and run B of this
+period?" after a code or rule change. Matching digests mean nothing
+changed and no records are read. Otherwise each run's (crew member id,
+fingerprint) pairs are streamed in crew order off the (run_id,
+crew_member_id) index and merge-joined, which is linear in the number of
+records; only crew whose fingerprints differ have their full records
+loaded, and their field-level deltas are reported with ComparisonAnalyzer.
+
+A run can hold more than one record for a crew member, e.g. when a
+distributed batch requeues a work item after its lease expires. Digests
+and diffs then use the latest record (highest id), so neither depends on
+row order.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from comparison.analyzer import RECORD_FIELDS, ComparisonAnalyzer
+from models.database import PayrollRecord, PayrollRun
+from models.fingerprint import MerkleDigest
+from models.money import from_cents
+
+# Rows fetched per round trip while streaming a run's fingerprints
+_FETCH_SIZE = 5000
+
+
+def start_run(
+    db: Session,
+    period_start: datetime,
+    period_end: datetime,
+    system: str
+) -> PayrollRun:
+    """Record the start of a batch run; pass its id to the engine."""
+    run = PayrollRun(
+        period_start=period_start,
+        period_end=period_end,
+        processing_system=system,
+        status="running"
+    )
+    db.add(run)
+    db.commit()
+    return run
+
+
+def _fingerprints(db: Session, run_id: int) -> Iterator[Tuple[int, int]]:
+    """(crew member id, fingerprint) of a run's latest record per crew, in crew id order."""
+    rows = db.query(PayrollRecord.crew_member_id, PayrollRecord.fingerprint).filter(
+        PayrollRecord.run_id == run_id
+    ).order_by(PayrollRecord.crew_member_id, PayrollRecord.id).yield_per(_FETCH_SIZE)
+
+    previous = None
+    for row in rows:
+        if previous is not None and row[0] != previous[0]:
+            yield previous
+        previous = row
+    if previous is not None:
+        yield previous
+
+
+def finish_run(db: Session, run: PayrollRun) -> PayrollRun:
+    """Compute the digest over the run's committed records and mark it completed."""
+    digest = MerkleDigest()
+    for crew_member_id, fingerprint in _fingerprints(db, run.id):
+        digest.add(crew_member_id, fingerprint)
+
+    run.record_count = digest.count
+    run.digest = digest.hexdigest()
+    run.status = "completed"
+    run.completed_at = datetime.utcnow()
+    db.commit()
+    return run
+
+
+def _changed_crew(
+    db: Session,
+    run_a: int,
+    run_b: int
+) -> Tuple[int, List[int], List[int], List[int]]:
+    """Merge-join two runs' fingerprints: (crew compared, changed, only in A, only in B)."""
+    left = iter(_fingerprints(db, run_a))
+    right = iter(_fingerprints(db, run_b))
+    a = next(left, None)
+    b = next(right, None)
+
+    compared = 0
+    changed, removed, added = [], [], []
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            removed.append(a[0])
+            a = next(left, None)
+        elif a is None or b[0] < a[0]:
+            added.append(b[0])
+            b = next(right, None)
+        else:
+            compared += 1
+            if a[1] != b[1] or a[1] is None:
+                changed.append(a[0])
+            a = next(left, None)
+            b = next(right, None)
+
+    return compared, changed, removed, added
+
+
+def _records_by_crew(db: Session, run_id: int, crew_ids: List[int]) -> Dict[int, PayrollRecord]:
+    """Each crew member's latest record in a run."""
+    records = {}
+    for start in range(0, len(crew_ids), _FETCH_SIZE):
+        for record in db.query(PayrollRecord).filter(
+            PayrollRecord.run_id == run_id,
+            PayrollRecord.crew_member_id.in_(crew_ids[start:start + _FETCH_SIZE])
+        ).order_by(PayrollRecord.id):
+            records[record.crew_member_id] = record
+    return records
+
+
+def diff_runs(db: Session, run_a_id: int, run_b_id: int) -> Dict[str, Any]:
+    """
+    Crew whose pay differs between two completed runs of the same period.
+
+    Differences use ComparisonAnalyzer's vocabulary, with the run values
+    under "run_a" and "run_b", over every pay field of the record. Raises
+    LookupError for an unknown run and ValueError for runs that cannot be
+    compared.
+    """
+    runs = {run.id: run for run in db.query(PayrollRun).filter(
+        PayrollRun.id.in_((run_a_id, run_b_id))
+    )}
+    for run_id in (run_a_id, run_b_id):
+        if run_id not in runs:
+            raise LookupError(f"Payroll run {run_id} not found")
+    run_a, run_b = runs[run_a_id], runs[run_b_id]
+
+    if (run_a.period_start, run_a.period_end) != (run_b.period_start, run_b.period_end):
+        raise ValueError("Runs cover different pay periods")
+    if run_a.status != "completed" or run_b.status != "completed":
+        raise ValueError("Both runs must be completed")
+
+    result = {
+        "run_a": run_a.id,
+        "run_b": run_b.id,
+        "period_start": run_a.period_start,
+        "period_end": run_a.period_end,
+        "identical": run_a.digest == run_b.digest,
+        "crew_compared": min(run_a.record_count, run_b.record_count),
+        "changed": [],
+        "added": [],
+        "removed": [],
+        "gross_pay_delta": 0.0,
+    }
+    if result["identical"]:
+        return result
+
+    compared, changed, removed, added = _changed_crew(db, run_a.id, run_b.id)
+    before = _records_by_crew(db, run_a.id, changed)
+    after = _records_by_crew(db, run_b.id, changed)
+
+    analyzer = ComparisonAnalyzer()
+    delta_cents = 0
+    for crew_member_id in changed:
+        a, b = before[crew_member_id], after[crew_member_id]
+        delta_cents += b.gross_pay_cents - a.gross_pay_cents
+        result["changed"].append({
+            "crew_member_id": crew_member_id,
+            "differences": analyzer.field_differences(
+                a, b, labels=("run_a", "run_b"), fields=RECORD_FIELDS
+            ),
+        })
+
+    result.update(
+        crew_compared=compared,
+        added=added,
+        removed=removed,
+        gross_pay_delta=from_cents(delta_cents),
+    )
+    return result
+
+
+def list_runs(
+    db: Session,
+    period_start: Optional[datetime] = None,
+    period_end: Optional[datetime] = None,
+    limit: int = 50
+) -> List[PayrollRun]:
+    """Most recent runs first, optionally for one period."""
+    query = db.query(PayrollRun)
+    if period_start is not None:
+        query = query.filter(PayrollRun.period_start == period_start)
+    if period_end is not None:
+        query = query.filter(PayrollRun.period_end == period_end)
+    return query.order_by(PayrollRun.id.desc()).limit(limit).all()
@@ -0,0 +1,305 @@
+"""
+Sampled shadow runs of the AI engine alongside mainframe batches.
+
+A mainframe batch offers each payroll it produces to a ShadowBatch. A
+sample of them (``SHADOW_SAMPLE_RATE``) is recalculated by the AI engine on
+a small thread pool, compared with ComparisonAnalyzer and folded into a
+drift summary stored in ``shadow_drift_summaries``.
+
+The batch thread only copies the mainframe result and enqueues it. If the
+shadow queue is full the sample is skipped rather than making the batch
+wait, so shadow mode never adds more than a copy and a queue push per crew
+member. Shadow AI results are compared and then discarded; they are never
+saved as payroll records.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from agents.orchestrator import CrewPayOrchestrator
+from comparison.analyzer import ComparisonAnalyzer
+from models.cache import CrewSnapshot
+from models.database import PayrollRecord, SessionLocal, ShadowDriftSummary
+from rules.engine import compiled_rules
+
+# PayrollRecord columns ComparisonAnalyzer reads from the mainframe result
+_COMPARED_COLUMNS = (
+    "credit_hours", "paid_hours", "base_pay_cents", "per_diem_pay_cents",
+    "overtime_pay_cents", "premium_pay_cents", "gross_pay_cents",
+    "processing_time_seconds",
+)
+
+
+def _detached_copy(payroll: PayrollRecord) -> PayrollRecord:
+    """Copy the compared columns into a transient record safe to read from another thread."""
+    return PayrollRecord(**{column: getattr(payroll, column) for column in _COMPARED_COLUMNS})
+
+
+class ShadowBatch:
+    """Shadow comparison state for one mainframe batch run."""
+
+    def __init__(
+        self,
+        runner: "ShadowRunner",
+        summary_id: int,
+        period_start: datetime,
+        period_end: datetime,
+        sample_rate: float
+    ):
+        self.runner = runner
+        self.summary_id = summary_id
+        self.period_start = period_start
+        self.period_end = period_end
+        self.sample_rate = sample_rate
+
+        # AI engine pay calculation only; nothing is persisted through it
+        self._orchestrator = CrewPayOrchestrator(
+            None, rules=compiled_rules("ai_agent", period_start.date())
+        )
+        self._analyzer = ComparisonAnalyzer()
+        self._random = random.Random()
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+        # Updated from the batch thread
+        self.crew_offered = 0
+        self.sampled = 0
+        self.skipped = 0
+
+        # Updated from shadow workers under _lock
+        self.compared = 0
+        self.errors = 0
+        self.matches = 0
+        self.total_difference_cents = 0
+        self.max_difference_cents = 0
+        self.max_difference_crew_member_id = None
+        self.field_mismatches: Counter = Counter()
+        self.mainframe_time_seconds = 0.0
+        self.ai_agent_time_seconds = 0.0
+
+    def should_sample(self) -> bool:
+        """Count one crew member paid by the batch and decide whether to shadow it."""
+        self.crew_offered += 1
+        return self._random.random() < self.sample_rate
+
+    def submit(self, crew, payroll: PayrollRecord, assignments: List) -> bool:
+        """
+        Queue an AI-engine recalculation of a mainframe payroll.
+
+        ``assignments`` must be safe to read from another thread (detached
+        AssignmentRecords, e.g. from an AssignmentIndex). Returns False if the
+        shadow queue was full and the sample was skipped.
+        """
+        if not self.runner._acquire():
+            self.skipped += 1
+            return False
+
+        self.sampled += 1
+        future = self.runner.executor.submit(
+            self._compare,
+            crew if isinstance(crew, CrewSnapshot) else CrewSnapshot.from_model(crew),
+            _detached_copy(payroll),
+            list(assignments)
+        )
+        future.add_done_callback(self.runner._release)
+        self._futures.append(future)
+        return True
+
+    def _compare(self, crew: CrewSnapshot, mainframe: PayrollRecord, assignments: List):
+        try:
+            ai_agent = self._orchestrator.calculate_payroll(
+                crew, assignments, self.period_start, self.period_end, time.time()
+            )
+            result = self._analyzer.compare_payroll_records(
+                mainframe,
+                ai_agent,
+                mainframe.processing_time_seconds or 0.0,
+                ai_agent.processing_time_seconds
+            )
+        except Exception as e:
+            print(f"Shadow comparison failed for crew {crew.id}: {e}")
+            with self._lock:
+                self.errors += 1
+            return
+
+        difference = abs(mainframe.gross_pay_cents - ai_agent.gross_pay_cents)
+        with self._lock:
+            self.compared += 1
+            if result["metrics"]["accuracy_match"]:
+                self.matches += 1
+            self.field_mismatches.update(d["field"] for d in result["differences"])
+            self.total_difference_cents += difference
+            if difference > self.max_difference_cents:
+                self.max_difference_cents = difference
+                self.max_difference_crew_member_id = crew.id
+            self.mainframe_time_seconds += mainframe.processing_time_seconds or 0.0
+            self.ai_agent_time_seconds += ai_agent.processing_time_seconds
+
+    def close(self) -> Future:
+        """
+        Stop sampling and store the summary once every queued sample is done.
+
+        Runs on the shadow pool, so the batch returns immediately. The
+        returned future resolves when the summary has been written.
+        """
+        futures = list(self._futures)
+        return self.runner.executor.submit(self._finish, futures)
+
+    def _finish(self, futures: List[Future]):
+        wait(futures)
+        self.runner._record(self)
+
+        db = SessionLocal()
+        try:
+            summary = db.get(ShadowDriftSummary, self.summary_id)
+            summary.status = "completed"
+            summary.crew_offered = self.crew_offered
+            summary.sampled = self.sampled
+            summary.skipped = self.skipped
+            summary.compared = self.compared
+            summary.errors = self.errors
+            summary.matches = self.matches
+            summary.mismatches = self.compared - self.matches
+            summary.total_difference_cents = self.total_difference_cents
+            summary.max_difference_cents = self.max_difference_cents
+            summary.max_difference_crew_member_id = self.max_difference_crew_member_id
+            summary.field_mismatches = json.dumps(dict(self.field_mismatches))
+            summary.mainframe_time_seconds = self.mainframe_time_seconds
+            summary.ai_agent_time_seconds = self.ai_agent_time_seconds
+            summary.completed_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+
+class ShadowRunner:
+    """Process-wide thread pool and limits for shadow comparisons."""
+
+    def __init__(
+        self,
+        sample_rate: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.sample_rate = (
+            sample_rate if sample_rate is not None
+            else float(os.getenv("SHADOW_SAMPLE_RATE", "0"))
+        )
+        self.max_workers = max_workers or int(os.getenv("SHADOW_WORKERS", "2"))
+        self.max_pending = (
+            max_pending if max_pending is not None
+            else int(os.getenv("SHADOW_MAX_PENDING", "1000"))
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.batches = 0
+        self.sampled = 0
+        self.skipped = 0
+        self.compared = 0
+        self.mismatches = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="shadow"
+                    )
+        return self._executor
+
+    def start_batch(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        sample_rate: Optional[float] = None
+    ) -> Optional[ShadowBatch]:
+        """Open a shadow run for a batch, or return None when sampling is off."""
+        rate = self.sample_rate if sample_rate is None else sample_rate
+        if rate <= 0:
+            return None
+
+        db = SessionLocal()
+        try:
+            summary = ShadowDriftSummary(
+                period_start=period_start,
+                period_end=period_end,
+                sample_rate=rate,
+                status="running",
+                started_at=datetime.utcnow()
+            )
+            db.add(summary)
+            db.commit()
+            summary_id = summary.id
+        finally:
+            db.close()
+
+        return ShadowBatch(self, summary_id, period_start, period_end, min(rate, 1.0))
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, _future: Future = None):
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, batch: ShadowBatch):
+        with self._lock:
+            self.batches += 1
+            self.sampled += batch.sampled
+            self.skipped += batch.skipped
+            self.compared += batch.compared
+            self.mismatches += batch.compared - batch.matches
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "batches": self.batches,
+                "sampled": self.sampled,
+                "skipped": self.skipped,
+                "compared": self.compared,
+                "mismatches": self.mismatches,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool, by default letting queued comparisons finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+shadow_runner = ShadowRunner()
+
+
+def get_drift_summaries(
+    db: Session,
+    period_start: Optional[datetime] = None,
+    period_end: Optional[datetime] = None,
+    limit: int = 20
+) -> List[ShadowDriftSummary]:
+    """Most recent drift summaries, optionally for one period."""
+    query = db.query(ShadowDriftSummary)
+    if period_start is not None:
+        query = query.filter(ShadowDriftSummary.period_start == period_start)
+    if period_end is not None:
+        query = query.filter(ShadowDriftSummary.period_end == period_end)
+    return query.order_by(ShadowDriftSummary.id.desc()).limit(limit).all()
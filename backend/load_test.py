@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Drive the API with concurrent load and report throughput and latency.
+
+A fixed number of workers share one pooled, keep-alive HTTP client and
+issue requests back to back for the given duration. Each request picks an
+endpoint by weight from the mix and a random crew member, so coalescing
+only merges genuinely identical calls. Results are reported per endpoint:
+requests, status codes, throughput and p50/p95/p99 latency.
+
+With ``--local`` the script starts its own server (uvicorn on a free port)
+against a SQLite database seeded with sample data, so it needs nothing
+running beforehand.
+
+Usage:
+    python load_test.py --local [--concurrency 16] [--duration 30]
+    python load_test.py --base-url http://localhost:8000/api/v1 \\
+        --mix crew=40,ai_agent=30,mainframe=10,compare=20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import httpx
+
+DEFAULT_MIX = "crew=40,ai_agent=30,mainframe=10,compare=20"
+
+# endpoint name: (method, path, request "system" field or None)
+ENDPOINTS = {
+    "crew": ("GET", "/crew", None),
+    "ai_agent": ("POST", "/ai-agent/process", "ai_agent"),
+    "mainframe": ("POST", "/mainframe/process", "mainframe"),
+    "compare": ("POST", "/compare", None),
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse ``name=weight,...`` into endpoint weights."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Mix weights must not all be zero")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LoadResults:
+    """Latencies and status codes collected per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, endpoint: str, status: str, seconds: float):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict]:
+        rows = {}
+        all_latencies = []
+        all_statuses = Counter()
+        for endpoint in sorted(self.latencies):
+            rows[endpoint] = self._row(self.latencies[endpoint], self.statuses[endpoint], elapsed)
+            all_latencies.extend(self.latencies[endpoint])
+            all_statuses.update(self.statuses[endpoint])
+        rows["total"] = self._row(all_latencies, all_statuses, elapsed)
+        return rows
+
+    @staticmethod
+    def _row(latencies: List[float], statuses: Counter, elapsed: float) -> Dict:
+        ordered = sorted(latencies)
+        ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+        return {
+            "requests": len(ordered),
+            "ok": ok,
+            "errors": len(ordered) - ok,
+            "statuses": dict(statuses),
+            "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+        }
+
+
+async def run_load(
+    base_url: str,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    period_start: datetime,
+    period_end: datetime,
+    timeout: float = 60.0
+) -> Tuple[Dict[str, Dict], float]:
+    """Run the workers and return (per-endpoint summary, elapsed seconds)."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        response = await client.get("/crew", params={"limit": 1000})
+        response.raise_for_status()
+        crew_ids = [crew["id"] for crew in response.json()]
+        if not crew_ids:
+            raise RuntimeError("No active crew members; load sample data first")
+
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        period = {"period_start": period_start.isoformat(), "period_end": period_end.isoformat()}
+        results = LoadResults()
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                endpoint = rng.choices(names, weights)[0]
+                method, path, system = ENDPOINTS[endpoint]
+                if method == "GET":
+                    kwargs = {"params": {"limit": 100}}
+                else:
+                    body = {"crew_member_id": rng.choice(crew_ids), **period}
+                    if system:
+                        body["system"] = system
+                    kwargs = {"json": body}
+
+                start = time.perf_counter()
+                try:
+                    reply = await client.request(method, path, **kwargs)
+                    status = str(reply.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                results.record(endpoint, status, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return results.summary(elapsed), elapsed
+
+
+def print_report(summary: Dict[str, Dict], elapsed: float, concurrency: int):
+    print(f"\n{elapsed:.1f}s with {concurrency} concurrent workers\n")
+    print(
+        f"{'Endpoint':<12}{'requests':>10}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuses"
+    )
+    for endpoint, row in summary.items():
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(row["statuses"].items()))
+        print(
+            f"{endpoint:<12}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>9.1f}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            f"{row['max_ms']:>10.1f}  {statuses}"
+        )
+    print()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(num_crew: int, database_url: str) -> Tuple[subprocess.Popen, str]:
+    """Seed a local database and start uvicorn on a free port; returns (process, base URL)."""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "DATABASE_URL": database_url}
+
+    seed = (
+        "from models.database import SessionLocal, init_db, CrewMember\n"
+        "from mainframe.data_loader import DataLoader\n"
+        "init_db()\n"
+        "db = SessionLocal()\n"
+        "if not db.query(CrewMember).count():\n"
+        f"    DataLoader(db).generate_all_sample_data(num_crew={num_crew}, num_flights={num_crew * 4})\n"
+        "db.close()\n"
+    )
+    subprocess.run([sys.executable, "-c", seed], cwd=backend_dir, env=env, check=True)
+
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}/api/v1"
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Local server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("Local server did not become healthy within 30s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default=os.getenv("API_BASE_URL", "http://localhost:8000/api/v1"))
+    parser.add_argument("--local", action="store_true", help="start a local server with a seeded SQLite database")
+    parser.add_argument("--database-url", help="database for --local (default: a temporary SQLite file)")
+    parser.add_argument("--crew", type=int, default=50, help="crew members to seed with --local")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--period-start", help="ISO date (default: first of this month)")
+    parser.add_argument("--period-days", type=int, default=30)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    period_start = (
+        datetime.fromisoformat(args.period_start) if args.period_start
+        else datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    )
+    period_end = period_start + timedelta(days=args.period_days)
+
+    process = None
+    base_url = args.base_url
+    scratch = tempfile.TemporaryDirectory(prefix="crewpay-load-")
+    if args.local:
+        database_url = args.database_url or f"sqlite:///{os.path.join(scratch.name, 'load.db')}"
+        process, base_url = start_local_server(args.crew, database_url)
+    try:
+        print(f"Load test against {base_url}: mix {args.mix}")
+        summary, elapsed = asyncio.run(run_load(
+            base_url, mix, args.concurrency, args.duration, period_start, period_end
+        ))
+        print_report(summary, elapsed, args.concurrency)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,21 @@
 FastAPI main application for Crew Pay Intelligence System.
 """
 
+import time
+
+_import_start = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from models.database import init_db
+from fastapi.middleware.gzip import GZipMiddleware
+import os
+from models.database import ensure_schema
 from api.routes import router
+from agents.recompute import recompute_runner
+from comparison.shadow import shadow_runner
+
+# Cold start breakdown; see startup_report.py for a per-module report
+STARTUP_TIMINGS = {"import_seconds": time.perf_counter() - _import_start}
 
 app = FastAPI(
     title="Crew Pay Intelligence System",
@@ -22,14 +33,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large payloads (batch results, exports); small responses pass through
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "4096"))
+)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1", tags=["crew-pay"])
 
 
 @app.on_event("startup")
 async def startup():
-    """Initialize database on startup."""
-    init_db()
+    """Check the database schema on startup (tables are only created when stale)."""
+    start = time.perf_counter()
+    ensure_schema()
+    STARTUP_TIMINGS["ensure_schema_seconds"] = time.perf_counter() - start
+    
+    print(
+        f"Startup: imports {STARTUP_TIMINGS['import_seconds']:.3f}s, "
+        f"schema check {STARTUP_TIMINGS['ensure_schema_seconds']:.3f}s"
+    )
     
     # Optionally load sample data on first start
     # Uncomment to auto-load data:
@@ -41,6 +65,13 @@ async def startup():
     # db.close()
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Let queued shadow comparisons and change-driven recomputes finish."""
+    recompute_runner.shutdown(wait=True)
+    shadow_runner.shutdown(wait=True)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -5,6 +5,18 @@ Mainframe batch processor - simulates legacy batch payroll processing.
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from models.database import CrewMember, PayrollRecord, CrewAssignment, Flight
+from comparison.runs import finish_run, start_run
+from comparison.shadow import shadow_runner
+from models.fingerprint import record_fingerprint
+from models.money import from_cents
+from reporting.rollups import RollupAccumulator
+from rules.engine import CompiledRules, compiled_rules
+from scheduling.index import AssignmentIndex
+from scheduling.records import iter_active_crew_chunks, load_assignment_records
+from scheduling.legality import DutyValidator, attach_violations
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import heapq
 import time
 import random
 
@@ -12,8 +24,47 @@ import random
 class BatchProcessor:
     """Simulates legacy mainframe batch processing."""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        index: Optional[AssignmentIndex] = None,
+        rules: Optional[CompiledRules] = None,
+        chunk_size: Optional[int] = None,
+        run_id: Optional[int] = None
+    ):
+        """
+        An optional AssignmentIndex covering the period being processed
+        replaces the per-crew assignment query; optional CompiledRules for
+        that period replace the default rules in force on its start date.
+        Batch jobs stream crew in chunks of ``chunk_size`` (default
+        BATCH_CHUNK_SIZE). Records are tagged with ``run_id`` when processed
+        as part of a run.
+        """
         self.db = db
+        self.index = index
+        self.rules = rules
+        self.chunk_size = chunk_size
+        self.run_id = run_id
+        self.validator = DutyValidator()
+    
+    def _rules_for(self, period_start: datetime) -> CompiledRules:
+        return self.rules or compiled_rules("mainframe", period_start.date())
+    
+    def _load_assignments(
+        self,
+        crew_id: int,
+        period_start: datetime,
+        period_end: datetime
+    ) -> List[CrewAssignment]:
+        """Assignments starting within the period, from the index if present."""
+        if self.index is not None:
+            return self.index.in_period(crew_id, period_start, period_end)
+        
+        return self.db.query(CrewAssignment).filter(
+            CrewAssignment.crew_member_id == crew_id,
+            CrewAssignment.duty_start >= period_start,
+            CrewAssignment.duty_start <= period_end
+        ).all()
     
     def _process_crew_member(
         self,
@@ -26,68 +77,60 @@ class BatchProcessor:
         start_time = time.time()
         
         # Get all assignments in period
-        assignments = self.db.query(CrewAssignment).filter(
-            CrewAssignment.crew_member_id == crew.id,
-            CrewAssignment.duty_start >= period_start,
-            CrewAssignment.duty_start <= period_end
-        ).all()
+        assignments = self._load_assignments(crew.id, period_start, period_end)
         
-        # Calculate credit hours (simplified)
-        credit_hours = sum([a.credit_hours for a in assignments])
-        if credit_hours == 0:
-            # Calculate from duty times
-            for assignment in assignments:
-                if assignment.duty_start and assignment.duty_end:
-                    hours = (assignment.duty_end - assignment.duty_start).total_seconds() / 3600
-                    credit_hours += hours
-        
-        # Minimum guarantee
-        paid_hours = max(credit_hours, 75.0)  # 75 hour guarantee
+        payroll = self.calculate_payroll(
+            crew, assignments, period_start, period_end, start_time
+        )
         
-        # Base pay
-        base_pay = paid_hours * crew.hourly_rate
+        # Add some delay to simulate mainframe processing
+        time.sleep(random.uniform(0.1, 0.3))
         
-        # Per diem (simplified: $2.50 per hour)
-        per_diem_pay = credit_hours * 2.50
+        self.db.add(payroll)
+        self.db.commit()
+        self.db.refresh(payroll)
         
-        # Overtime (hours over 75)
-        overtime_hours = max(0, credit_hours - 75.0)
-        overtime_pay = overtime_hours * crew.hourly_rate * 1.5
+        return payroll
+    
+    def calculate_payroll(
+        self,
+        crew: CrewMember,
+        assignments: List[CrewAssignment],
+        period_start: datetime,
+        period_end: datetime,
+        start_time: float
+    ) -> PayrollRecord:
+        """Apply mainframe pay rules to already-loaded assignments (not persisted)."""
         
-        # Premium pay (simplified)
-        premium_pay = 0.0
-        for assignment in assignments:
-            flight = assignment.flight
-            if flight and flight.is_red_eye:
-                premium_pay += 50.0  # $50 per red-eye
+        # Duty legality check runs before any pay is computed
+        violations = self.validator.validate_crew(crew.id, assignments)
         
-        gross_pay = base_pay + per_diem_pay + overtime_pay + premium_pay
+        pay = self._rules_for(period_start).evaluator_for(
+            crew.base, crew.position
+        ).evaluate(crew.hourly_rate_cents, assignments)
         
         processing_time = time.time() - start_time
         
-        # Add some delay to simulate mainframe processing
-        time.sleep(random.uniform(0.1, 0.3))
-        
         payroll = PayrollRecord(
             crew_member_id=crew.id,
             period_start=period_start,
             period_end=period_end,
-            credit_hours=credit_hours,
-            paid_hours=paid_hours,
-            base_pay=base_pay,
-            per_diem_pay=per_diem_pay,
-            overtime_pay=overtime_pay,
-            premium_pay=premium_pay,
-            gross_pay=gross_pay,
+            credit_hours=pay.credit_hours,
+            paid_hours=pay.paid_hours,
+            tafb_hours=pay.tafb_hours,
+            base_pay_cents=pay.base_pay_cents,
+            per_diem_pay_cents=pay.per_diem_pay_cents,
+            overtime_pay_cents=pay.overtime_pay_cents,
+            premium_pay_cents=pay.premium_pay_cents,
+            gross_pay_cents=pay.gross_pay_cents,
             processing_system="mainframe",
             processing_time_seconds=processing_time,
             processing_status="completed",
-            calculation_details="Mainframe batch calculation"
+            calculation_details="Mainframe batch calculation",
+            run_id=self.run_id,
+            fingerprint=record_fingerprint(pay)
         )
-        
-        self.db.add(payroll)
-        self.db.commit()
-        self.db.refresh(payroll)
+        attach_violations(payroll, violations)
         
         return payroll
     
@@ -95,34 +138,72 @@ class BatchProcessor:
         self,
         period_start: datetime,
         period_end: datetime,
-        simulate_delay: bool = True
+        simulate_delay: bool = True,
+        shadow_sample_rate: Optional[float] = None
     ) -> dict:
-        """Run full batch job for all active crew."""
+        """
+        Run full batch job for all active crew.
         
-        start_time = time.time()
+        Per base/position rollups for the period are refreshed at the end,
+        and the run's digest is stored for later run diffs. A sample of
+        crew (``shadow_sample_rate``, default SHADOW_SAMPLE_RATE) is
+        recalculated by the AI engine in the background for drift tracking;
+        the batch does not wait for it.
+        """
         
-        crew_members = self.db.query(CrewMember).filter(
-            CrewMember.status == "active"
-        ).all()
+        start_time = time.time()
+        rules = self._rules_for(period_start)
         
-        total_crew = len(crew_members)
+        total_crew = 0
         processed = 0
         errors = 0
-        total_pay = 0.0
-        
-        for crew in crew_members:
-            try:
-                payroll = self._process_crew_member(crew, period_start, period_end)
-                processed += 1
-                total_pay += payroll.gross_pay
-                
-                # Simulate batch delay
-                if simulate_delay:
-                    time.sleep(random.uniform(0.5, 1.5))
+        # Fleet totals are kept in exact cents by the rollup accumulator
+        rollups = RollupAccumulator()
+        run = start_run(self.db, period_start, period_end, "mainframe")
+        shadow = shadow_runner.start_batch(period_start, period_end, shadow_sample_rate)
+        
+        # Crew arrive in id-ordered chunks; each chunk gets one assignment
+        # query, so neither the roster nor the period's assignments are
+        # ever fully in memory
+        for chunk in iter_active_crew_chunks(self.db, self.chunk_size):
+            total_crew += len(chunk)
+            batch = BatchProcessor(
+                self.db,
+                index=self.index if self.index is not None else AssignmentIndex.load(
+                    self.db, period_start, period_end,
+                    crew_id_range=(chunk[0].id, chunk[-1].id)
+                ),
+                rules=rules,
+                run_id=run.id
+            )
+            
+            for crew in chunk:
+                try:
+                    payroll = batch._process_crew_member(crew, period_start, period_end)
+                    processed += 1
+                    rollups.add(
+                        crew, payroll.gross_pay_cents,
+                        payroll.overtime_pay_cents, payroll.premium_pay_cents
+                    )
+                    
+                    if shadow is not None and shadow.should_sample():
+                        shadow.submit(
+                            crew, payroll,
+                            batch._load_assignments(crew.id, period_start, period_end)
+                        )
                     
-            except Exception as e:
-                errors += 1
-                print(f"Error processing {crew.employee_id}: {e}")
+                    # Simulate batch delay
+                    if simulate_delay:
+                        time.sleep(random.uniform(0.5, 1.5))
+                        
+                except Exception as e:
+                    errors += 1
+                    print(f"Error processing {crew.employee_id}: {e}")
+        
+        rollups.store(self.db, period_start, period_end, "mainframe")
+        finish_run(self.db, run)
+        if shadow is not None:
+            shadow.close()
         
         processing_time = time.time() - start_time
         
@@ -130,6 +211,142 @@ class BatchProcessor:
             "total_crew": total_crew,
             "processed": processed,
             "errors": errors,
-            "total_pay": total_pay,
-            "processing_time_seconds": processing_time
+            "total_pay": rollups.gross_pay,
+            "processing_time_seconds": processing_time,
+            "run_id": run.id,
+            "shadow_run_id": shadow.summary_id if shadow is not None else None
+        }
+    
+    def _bucket_by_period(
+        self,
+        assignments: List[CrewAssignment],
+        periods: List[Tuple[datetime, datetime]]
+    ) -> Dict[Tuple[int, int], List[CrewAssignment]]:
+        """
+        Assign each assignment to every period containing its duty_start.
+        
+        Both inputs must be sorted by start time. Periods are opened as the
+        sweep passes their start and retired once their end is behind it, so
+        the whole pass is O((n + p) log p) regardless of how many periods.
+        """
+        buckets = defaultdict(list)
+        open_periods = []  # min-heap of (period_end, period_index)
+        next_period = 0
+        
+        for assignment in assignments:
+            duty_start = assignment.duty_start
+            
+            while next_period < len(periods) and periods[next_period][0] <= duty_start:
+                heapq.heappush(open_periods, (periods[next_period][1], next_period))
+                next_period += 1
+            
+            while open_periods and open_periods[0][0] < duty_start:
+                heapq.heappop(open_periods)
+            
+            for _, index in open_periods:
+                buckets[(assignment.crew_member_id, index)].append(assignment)
+        
+        return buckets
+    
+    def run_multi_period_batch(
+        self,
+        periods: List[Tuple[datetime, datetime]],
+        simulate_delay: bool = True
+    ) -> dict:
+        """
+        Run the batch job for several pay periods with one assignment scan.
+        
+        The active roster is streamed in BATCH_CHUNK_SIZE chunks, as in
+        run_batch_job. Each chunk's assignments for the whole span are
+        loaded once, sorted by duty_start, and swept into their periods;
+        every period's payroll for the chunk is then computed from the
+        buckets and committed, so neither the roster nor the pending
+        records outgrow one chunk. Each period is its own run. Returns
+        overall totals plus per-period stats.
+        """
+        
+        if not periods:
+            raise ValueError("At least one period is required")
+        
+        start_time = time.time()
+        ordered = sorted(periods)
+        span_end = max(end for _, end in ordered)
+        
+        runs = [
+            start_run(self.db, period_start, period_end, "mainframe")
+            for period_start, period_end in ordered
+        ]
+        period_batches = [BatchProcessor(self.db, run_id=run.id) for run in runs]
+        rollups = [RollupAccumulator() for _ in ordered]
+        processed = [0] * len(ordered)
+        errors = [0] * len(ordered)
+        total_crew = 0
+        assignments_scanned = 0
+        
+        for chunk in iter_active_crew_chunks(self.db, self.chunk_size):
+            total_crew += len(chunk)
+            assignments = load_assignment_records(
+                self.db,
+                ordered[0][0],
+                span_end,
+                order_by_start=True,
+                crew_id_range=(chunk[0].id, chunk[-1].id)
+            )
+            assignments_scanned += len(assignments)
+            buckets = self._bucket_by_period(assignments, ordered)
+            
+            for index, (period_start, period_end) in enumerate(ordered):
+                for crew in chunk:
+                    try:
+                        payroll = period_batches[index].calculate_payroll(
+                            crew,
+                            buckets.get((crew.id, index), []),
+                            period_start,
+                            period_end,
+                            time.time()
+                        )
+                        self.db.add(payroll)
+                        processed[index] += 1
+                        rollups[index].add(
+                            crew, payroll.gross_pay_cents,
+                            payroll.overtime_pay_cents, payroll.premium_pay_cents
+                        )
+                        
+                        # Simulate batch delay
+                        if simulate_delay:
+                            time.sleep(random.uniform(0.5, 1.5))
+                            
+                    except Exception as e:
+                        errors[index] += 1
+                        print(f"Error processing {crew.employee_id}: {e}")
+            
+            self.db.commit()
+        
+        period_stats = []
+        total_pay_cents = 0
+        for index, (period_start, period_end) in enumerate(ordered):
+            rollups[index].store(self.db, period_start, period_end, "mainframe")
+            finish_run(self.db, runs[index])
+            
+            period_stats.append({
+                "period_start": period_start,
+                "period_end": period_end,
+                "run_id": runs[index].id,
+                "total_crew": total_crew,
+                "processed": processed[index],
+                "errors": errors[index],
+                "total_pay": rollups[index].gross_pay
+            })
+            total_pay_cents += rollups[index].gross_pay_cents
+        
+        processing_time = time.time() - start_time
+        
+        return {
+            "total_crew": total_crew,
+            "processed": sum(processed),
+            "errors": sum(errors),
+            "total_pay": from_cents(total_pay_cents),
+            "assignments_scanned": assignments_scanned,
+            "processing_time_seconds": processing_time,
+            "periods": period_stats
         }
@@ -0,0 +1,394 @@
+"""
+Distributed batch runs over a database-backed work queue.
+
+run_batch_job() pays the whole roster from one process. In distributed
+mode a coordinator (enqueue_batch) records a PayrollRun and writes one
+work item per chunk of ``BATCH_CHUNK_SIZE`` active crew to
+``batch_work_items``. Any number of BatchWorker processes, on any number of
+nodes sharing the database, then drain the queue, so scaling out is just
+starting more workers (see batch_worker.py).
+
+Workers claim items with ``SELECT ... FOR UPDATE SKIP LOCKED``, so they
+never block on or double-claim each other's rows, followed by a
+conditional UPDATE that also keeps claims safe on SQLite, which has no row
+locks. A claim holds a lease (``BATCH_LEASE_SECONDS``) that the worker
+renews while it works. If a worker dies its lease runs out and the item is
+re-queued; after ``BATCH_MAX_ATTEMPTS`` claims it is marked failed instead.
+
+A worker calculates its chunk in memory and saves the payroll records in
+the same transaction that marks the item done, and only while it still
+holds the claim. An item's records are therefore saved exactly once, even
+when a slow worker loses its lease to another. Whichever worker closes the
+last item finalizes the run: rollups are rebuilt from the run's records and
+the run digest is stored, so a distributed run diffs cleanly against a
+single-process one (comparison.runs). Finalizing is one transaction, so a
+worker that dies part way leaves the run "running"; the next
+requeue_expired() sweep finalizes any running run with no open items.
+
+Leases are stamped with each worker's clock, so keep nodes NTP-synced.
+"""
+
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func
+from sqlalchemy.orm import Session
+
+from agents.orchestrator import CrewPayOrchestrator
+from comparison.runs import finish_run, start_run
+from mainframe.batch_processor import BatchProcessor
+from models.database import (
+    BatchWorkItem, CrewMember, PayrollRecord, PayrollRun, SessionLocal
+)
+from reporting.rollups import RollupAccumulator
+from rules.engine import compiled_rules
+from scheduling.index import AssignmentIndex
+from scheduling.records import iter_active_crew_chunks, load_active_crew
+
+# Item states that still need a worker
+OPEN_STATES = ("queued", "claimed")
+
+_ROLLUP_FETCH_SIZE = 5000
+
+
+def lease_seconds() -> float:
+    return float(os.getenv("BATCH_LEASE_SECONDS", "120"))
+
+
+def max_attempts() -> int:
+    return int(os.getenv("BATCH_MAX_ATTEMPTS", "3"))
+
+
+def enqueue_batch(
+    db: Session,
+    period_start: datetime,
+    period_end: datetime,
+    system: str = "mainframe",
+    chunk_size: Optional[int] = None
+) -> Tuple[PayrollRun, int]:
+    """Record a run and queue one work item per chunk of active crew; returns (run, items)."""
+    run = start_run(db, period_start, period_end, system)
+
+    items = 0
+    for chunk in iter_active_crew_chunks(db, chunk_size):
+        db.add(BatchWorkItem(
+            run_id=run.id,
+            period_start=period_start,
+            period_end=period_end,
+            processing_system=system,
+            first_crew_id=chunk[0].id,
+            last_crew_id=chunk[-1].id,
+            status="queued"
+        ))
+        items += 1
+    # All items become visible at once, so no worker sees a partial queue
+    db.commit()
+
+    if not items:
+        finalize_if_complete(db, run.id)
+    return run, items
+
+
+def requeue_expired(db: Session) -> int:
+    """Re-queue claims whose lease ran out (or fail them after too many attempts)."""
+    now = datetime.utcnow()
+    expired = and_(BatchWorkItem.status == "claimed", BatchWorkItem.lease_expires_at < now)
+
+    exhausted = db.query(BatchWorkItem.id, BatchWorkItem.run_id).filter(
+        expired, BatchWorkItem.attempts >= max_attempts()
+    ).all()
+    if exhausted:
+        db.query(BatchWorkItem).filter(
+            BatchWorkItem.id.in_([item_id for item_id, _ in exhausted]), expired
+        ).update({
+            "status": "failed",
+            "last_error": "Lease expired on the final attempt",
+            "completed_at": now
+        }, synchronize_session=False)
+
+    requeued = db.query(BatchWorkItem).filter(expired).update({
+        "status": "queued",
+        "claimed_by": None,
+        "lease_expires_at": None
+    }, synchronize_session=False)
+
+    # Runs whose last item closed but whose finalizer died or failed
+    has_items = exists().where(BatchWorkItem.run_id == PayrollRun.id)
+    has_open_items = exists().where(
+        BatchWorkItem.run_id == PayrollRun.id,
+        BatchWorkItem.status.in_(OPEN_STATES)
+    )
+    stranded = {run_id for run_id, in db.query(PayrollRun.id).filter(
+        PayrollRun.status == "running", has_items, ~has_open_items
+    )}
+    db.commit()
+
+    for run_id in stranded | {run_id for _, run_id in exhausted}:
+        _try_finalize(db, run_id)
+    return requeued
+
+
+def claim_work_item(db: Session, worker_id: str) -> Optional[BatchWorkItem]:
+    """Claim the oldest queued item for ``worker_id``, or None when the queue is empty."""
+    while True:
+        item_id = db.query(BatchWorkItem.id).filter(
+            BatchWorkItem.status == "queued"
+        ).order_by(BatchWorkItem.id).limit(1).with_for_update(skip_locked=True).scalar()
+        if item_id is None:
+            db.rollback()
+            return None
+
+        claimed = db.query(BatchWorkItem).filter(
+            BatchWorkItem.id == item_id,
+            BatchWorkItem.status == "queued"
+        ).update({
+            "status": "claimed",
+            "claimed_by": worker_id,
+            "lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds()),
+            "attempts": BatchWorkItem.attempts + 1
+        }, synchronize_session=False)
+        db.commit()
+
+        if claimed:
+            return db.get(BatchWorkItem, item_id, populate_existing=True)
+        # Another worker got there first (only possible without row locks)
+
+
+def _holds_claim(item_id: int, worker_id: str):
+    return and_(
+        BatchWorkItem.id == item_id,
+        BatchWorkItem.claimed_by == worker_id,
+        BatchWorkItem.status == "claimed"
+    )
+
+
+def finalize_if_complete(db: Session, run_id: int) -> bool:
+    """
+    Finish a run once none of its items are open.
+
+    Safe to call from every worker: only the one that moves the run from
+    "running" to "finalizing" stores rollups and the digest. The status
+    change, rollups and digest commit together, so "finalizing" is never
+    seen by other sessions and a failure leaves the run "running" for
+    requeue_expired() to finalize again.
+    """
+    open_items = db.query(BatchWorkItem).filter(
+        BatchWorkItem.run_id == run_id,
+        BatchWorkItem.status.in_(OPEN_STATES)
+    ).count()
+    if open_items:
+        db.rollback()
+        return False
+
+    won = db.query(PayrollRun).filter(
+        PayrollRun.id == run_id,
+        PayrollRun.status == "running"
+    ).update({"status": "finalizing"}, synchronize_session=False)
+    if not won:
+        db.rollback()
+        return False
+
+    # The updated row stays locked until finish_run commits everything
+    try:
+        run = db.get(PayrollRun, run_id, populate_existing=True)
+        rollups = RollupAccumulator()
+        for row in db.query(
+            CrewMember.base, CrewMember.position, PayrollRecord.gross_pay_cents,
+            PayrollRecord.overtime_pay_cents, PayrollRecord.premium_pay_cents
+        ).join(CrewMember, CrewMember.id == PayrollRecord.crew_member_id).filter(
+            PayrollRecord.run_id == run_id
+        ).yield_per(_ROLLUP_FETCH_SIZE):
+            rollups.add(row, row.gross_pay_cents, row.overtime_pay_cents, row.premium_pay_cents)
+        rollups.store(db, run.period_start, run.period_end, run.processing_system, commit=False)
+        finish_run(db, run)
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+
+def _try_finalize(db: Session, run_id: int):
+    """Finalize from a worker; a failure is retried by the next requeue sweep."""
+    try:
+        finalize_if_complete(db, run_id)
+    except Exception as e:
+        print(f"Error finalizing payroll run {run_id}: {e}")
+
+
+def queue_status(db: Session, run_id: int) -> Optional[Dict[str, Any]]:
+    """Item counts by state plus crew processed and errors for a run."""
+    run = db.get(PayrollRun, run_id)
+    if run is None:
+        return None
+
+    items = {state: 0 for state in OPEN_STATES + ("done", "failed")}
+    processed = errors = 0
+    for state, count, state_processed, state_errors in db.query(
+        BatchWorkItem.status, func.count(BatchWorkItem.id),
+        func.coalesce(func.sum(BatchWorkItem.processed), 0),
+        func.coalesce(func.sum(BatchWorkItem.errors), 0)
+    ).filter(BatchWorkItem.run_id == run_id).group_by(BatchWorkItem.status):
+        items[state] = count
+        processed += state_processed
+        errors += state_errors
+
+    return {
+        "run_id": run.id,
+        "period_start": run.period_start,
+        "period_end": run.period_end,
+        "system": run.processing_system,
+        "status": run.status,
+        "work_items": items,
+        "processed": processed,
+        "errors": errors,
+        "record_count": run.record_count,
+        "digest": run.digest,
+        "started_at": run.started_at,
+        "completed_at": run.completed_at,
+    }
+
+
+class BatchWorker:
+    """Claims and processes work items until told to stop (one per process)."""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        simulate_delay: bool = False,
+        poll_seconds: Optional[float] = None
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.simulate_delay = simulate_delay
+        self.poll_seconds = (
+            poll_seconds if poll_seconds is not None
+            else float(os.getenv("BATCH_POLL_SECONDS", "2"))
+        )
+        self.completed = 0
+        self.lost = 0
+        self.failed = 0
+
+    def run(self, exit_when_idle: bool = False, max_items: Optional[int] = None):
+        """
+        Work the queue. With ``exit_when_idle`` the worker returns once no
+        item is queued or claimed; otherwise it polls for new runs forever.
+        """
+        db = SessionLocal()
+        try:
+            handled = 0
+            while max_items is None or handled < max_items:
+                requeue_expired(db)
+                if self.run_once(db):
+                    handled += 1
+                    continue
+                if exit_when_idle and not db.query(BatchWorkItem).filter(
+                    BatchWorkItem.status.in_(OPEN_STATES)
+                ).count():
+                    return
+                db.rollback()
+                time.sleep(self.poll_seconds)
+        finally:
+            db.close()
+
+    def run_once(self, db: Session) -> bool:
+        """Claim and process one item; False when the queue is empty."""
+        item = claim_work_item(db, self.worker_id)
+        if item is None:
+            return False
+
+        try:
+            self._process(db, item)
+        except Exception as e:
+            db.rollback()
+            print(f"Error processing work item {item.id}: {e}")
+            self._release(db, item, str(e))
+        return True
+
+    def _process(self, db: Session, item: BatchWorkItem):
+        item_id, run_id = item.id, item.run_id
+        period_start, period_end = item.period_start, item.period_end
+        crew_id_range = (item.first_crew_id, item.last_crew_id)
+
+        crew_members = load_active_crew(db, crew_id_range)
+        index = AssignmentIndex.load(db, period_start, period_end, crew_id_range=crew_id_range)
+        rules = compiled_rules(item.processing_system, period_start.date())
+        if item.processing_system == "mainframe":
+            engine = BatchProcessor(db, index=index, rules=rules, run_id=run_id)
+        else:
+            engine = CrewPayOrchestrator(db, index=index, rules=rules, run_id=run_id)
+        db.rollback()  # end the read transaction; nothing is written until the end
+
+        renew_every = lease_seconds() / 3
+        renew_at = time.monotonic() + renew_every
+        payrolls: List[PayrollRecord] = []
+        errors = 0
+        for crew in crew_members:
+            if time.monotonic() >= renew_at:
+                if not self._renew_lease(item_id):
+                    self.lost += 1
+                    return
+                renew_at = time.monotonic() + renew_every
+            try:
+                payrolls.append(engine.calculate_payroll(
+                    crew,
+                    index.in_period(crew.id, period_start, period_end),
+                    period_start,
+                    period_end,
+                    time.time()
+                ))
+            except Exception as e:
+                errors += 1
+                print(f"Error processing {crew.employee_id}: {e}")
+
+            # Simulate mainframe processing time
+            if self.simulate_delay:
+                time.sleep(random.uniform(0.1, 0.3))
+
+        # Records and completion commit together, and only while we hold the claim
+        db.add_all(payrolls)
+        done = db.query(BatchWorkItem).filter(_holds_claim(item_id, self.worker_id)).update({
+            "status": "done",
+            "processed": len(payrolls),
+            "errors": errors,
+            "lease_expires_at": None,
+            "completed_at": datetime.utcnow()
+        }, synchronize_session=False)
+        if not done:
+            db.rollback()
+            self.lost += 1
+            return
+        db.commit()
+        self.completed += 1
+
+        _try_finalize(db, run_id)
+
+    def _renew_lease(self, item_id: int) -> bool:
+        """Extend our lease from a separate session; False if the claim was lost."""
+        db = SessionLocal()
+        try:
+            renewed = db.query(BatchWorkItem).filter(_holds_claim(item_id, self.worker_id)).update({
+                "lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds())
+            }, synchronize_session=False)
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    def _release(self, db: Session, item: BatchWorkItem, error: str):
+        """Give a failed item back to the queue, or fail it on its last attempt."""
+        final = item.attempts >= max_attempts()
+        released = db.query(BatchWorkItem).filter(_holds_claim(item.id, self.worker_id)).update({
+            "status": "failed" if final else "queued",
+            "claimed_by": None,
+            "lease_expires_at": None,
+            "last_error": error,
+            "completed_at": datetime.utcnow() if final else None
+        }, synchronize_session=False)
+        db.commit()
+        if released and final:
+            self.failed += 1
+            _try_finalize(db, item.run_id)
@@ -0,0 +1,240 @@
+"""
+In-process read-through cache for crew member lookups.
+
+Cached entries are immutable snapshots rather than ORM instances, so they can
+be shared across sessions and requests safely. Updates and deletes made
+through the ORM invalidate the affected entries once their transaction
+commits; invalidating at flush time would let another request reload and
+cache the old committed row before the commit lands. A load that started
+before an invalidation is not cached, for the same reason. Bulk
+``query(CrewMember).update()`` / ``delete()`` and ORM-enabled ``update()``
+/ ``delete()`` statements cannot name the rows they touch, so they drop the
+whole cache on commit. Changes written by other processes, or with plain
+SQL on a connection, are picked up once the entry's TTL expires.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.database import CrewMember
+from models.money import from_cents
+
+
+@dataclass(frozen=True)
+class CrewSnapshot:
+    """Read-only copy of the CrewMember columns used by the pay engines."""
+
+    id: int
+    employee_id: str
+    first_name: str
+    last_name: str
+    position: str
+    base: str
+    hourly_rate_cents: int
+    status: str
+
+    @property
+    def hourly_rate(self) -> float:
+        return from_cents(self.hourly_rate_cents)
+
+    @classmethod
+    def from_model(cls, crew: CrewMember) -> "CrewSnapshot":
+        return cls(
+            id=crew.id,
+            employee_id=crew.employee_id,
+            first_name=crew.first_name,
+            last_name=crew.last_name,
+            position=crew.position,
+            base=crew.base,
+            hourly_rate_cents=crew.hourly_rate_cents,
+            status=crew.status,
+        )
+
+
+class CrewCache:
+    """Bounded LRU cache of crew snapshots with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped by every invalidation; loads that straddle one are not cached
+        self._generation = 0
+
+    def get(self, db: Session, crew_id: int) -> Optional[CrewSnapshot]:
+        """Return the crew snapshot, loading it from the database on a miss."""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(crew_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(crew_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        crew = db.query(CrewMember).filter(CrewMember.id == crew_id).first()
+        if not crew:
+            return None
+
+        snapshot = CrewSnapshot.from_model(crew)
+        self.put(snapshot, generation)
+        return snapshot
+
+    def get_many(self, db: Session, crew_ids: Iterable[int]) -> Dict[int, CrewSnapshot]:
+        """
+        Return snapshots for several crew members, keyed by id.
+
+        Cached entries are served directly and all misses are loaded with a
+        single IN query. Ids that do not exist are absent from the result.
+        """
+        now = time.monotonic()
+        found: Dict[int, CrewSnapshot] = {}
+        missing = []
+
+        with self._lock:
+            for crew_id in dict.fromkeys(crew_ids):
+                entry = self._entries.get(crew_id)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(crew_id)
+                    self.hits += 1
+                    found[crew_id] = entry[0]
+                else:
+                    self.misses += 1
+                    missing.append(crew_id)
+            generation = self._generation
+
+        if missing:
+            for crew in db.query(CrewMember).filter(CrewMember.id.in_(missing)):
+                snapshot = CrewSnapshot.from_model(crew)
+                self.put(snapshot, generation)
+                found[snapshot.id] = snapshot
+
+        return found
+
+    def put(self, snapshot: CrewSnapshot, generation: Optional[int] = None):
+        """
+        Insert or refresh a snapshot, evicting the least recently used.
+
+        ``generation`` is the cache generation read before the snapshot was
+        loaded; if an invalidation has happened since, the snapshot may
+        predate it and is not stored.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[snapshot.id] = (snapshot, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, crew_id: int):
+        """Drop a single crew member from the cache."""
+        self.invalidate_many([crew_id])
+
+    def invalidate_many(self, crew_ids: Iterable[int]):
+        """Drop several crew members from the cache."""
+        with self._lock:
+            self._generation += 1
+            for crew_id in crew_ids:
+                if self._entries.pop(crew_id, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_all(self):
+        """Drop every entry, counting each as an invalidation."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def clear(self):
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+crew_cache = CrewCache(
+    maxsize=int(os.getenv("CREW_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("CREW_CACHE_TTL_SECONDS", "300"))
+)
+
+
+# Session.info key for crew ids written but not yet committed; ALL_CREW
+# stands for a bulk statement whose rows are unknown
+_PENDING_INFO = "crew_cache_invalidations"
+ALL_CREW = None
+
+
+def _pending(session: Session) -> Optional[Set[int]]:
+    return session.info.setdefault(_PENDING_INFO, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_crew_writes(session, flush_context):
+    """Note updated and deleted crew members until the session commits."""
+    crew_ids = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, CrewMember) and session.is_modified(obj, include_collections=False)
+    ] + [obj.id for obj in session.deleted if isinstance(obj, CrewMember)]
+    if crew_ids:
+        pending = _pending(session)
+        if pending is not ALL_CREW:
+            pending.update(crew_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _capture_bulk_crew_writes(orm_execute_state):
+    """Bulk updates and deletes of crew members invalidate the whole cache."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ is CrewMember for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info[_PENDING_INFO] = ALL_CREW
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    if _PENDING_INFO not in session.info:
+        return
+    pending = session.info.pop(_PENDING_INFO)
+    if pending is ALL_CREW:
+        crew_cache.invalidate_all()
+    elif pending:
+        crew_cache.invalidate_many(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(_PENDING_INFO, None)
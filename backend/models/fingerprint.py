@@ -0,0 +1,75 @@
+"""
+Content fingerprints for payroll records and digests over whole runs.
+
+A record's fingerprint is a 64-bit BLAKE2b hash of what it pays: credit
+and paid time in whole minutes and every pay component in cents. Two
+records with the same fingerprint pay the same, whichever engine, run or
+processing time produced them. It is stored as a signed BIGINT.
+
+A run's digest is a Merkle root over its (crew member id, fingerprint)
+leaves in crew id order, so two runs of a period paid identically exactly
+when their digests match. MerkleDigest folds leaves as they stream in and
+keeps only one pending node per tree level.
+"""
+
+import struct
+from hashlib import blake2b
+from typing import List, Tuple
+
+from models.money import to_minutes
+
+# Domain separation between leaf and interior node hashes
+_LEAF = b"\x00"
+_NODE = b"\x01"
+_DIGEST_SIZE = 16
+
+_CONTENT = struct.Struct("<7q")
+_ENTRY = struct.Struct("<qq")
+
+
+def record_fingerprint(payroll) -> int:
+    """Fingerprint of a PayrollRecord's (or PayBreakdown's) pay content."""
+    content = _CONTENT.pack(
+        to_minutes(payroll.credit_hours),
+        to_minutes(payroll.paid_hours),
+        payroll.base_pay_cents or 0,
+        payroll.per_diem_pay_cents or 0,
+        payroll.overtime_pay_cents or 0,
+        payroll.premium_pay_cents or 0,
+        payroll.gross_pay_cents or 0,
+    )
+    return int.from_bytes(blake2b(content, digest_size=8).digest(), "little", signed=True)
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return blake2b(_NODE + left + right, digest_size=_DIGEST_SIZE).digest()
+
+
+class MerkleDigest:
+    """Streaming Merkle root over (crew member id, fingerprint) leaves."""
+
+    def __init__(self):
+        self._pending: List[Tuple[int, bytes]] = []  # (height, hash), heights strictly decreasing
+        self.count = 0
+
+    def add(self, crew_member_id: int, fingerprint: int):
+        """Add the next leaf; leaves must arrive in crew id order."""
+        height = 0
+        digest = blake2b(
+            _LEAF + _ENTRY.pack(crew_member_id, fingerprint or 0), digest_size=_DIGEST_SIZE
+        ).digest()
+        while self._pending and self._pending[-1][0] == height:
+            _, left = self._pending.pop()
+            digest = _node(left, digest)
+            height += 1
+        self._pending.append((height, digest))
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        """Root of the leaves added so far (hex); incomplete subtrees fold right to left."""
+        if not self._pending:
+            return blake2b(_LEAF, digest_size=_DIGEST_SIZE).hexdigest()
+        digest = self._pending[-1][1]
+        for _, left in reversed(self._pending[:-1]):
+            digest = _node(left, digest)
+        return digest.hex()
@@ -0,0 +1,52 @@
+"""
+Fixed-point money arithmetic.
+
+Rates and pay components are held as integer cents and credit time as whole
+minutes, so the pay engines, storage and the comparison analyzer all see
+exact values: adding up a fleet never drifts, and two engines that agree
+produce bit-identical totals. Dollars only appear at the edges (API
+responses, exports and explanations).
+"""
+
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+CENTS_PER_DOLLAR = 100
+MINUTES_PER_HOUR = 60
+# Multipliers and factors (1.5x overtime, 1.5 international per diem days)
+# are stored in basis points so they stay integral too
+BASIS_POINTS = 10_000
+
+
+def round_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding half up, for a positive denominator."""
+    quotient, remainder = divmod(numerator, denominator)
+    return quotient + (1 if 2 * remainder >= denominator else 0)
+
+
+def _fixed(value, scale: int) -> int:
+    # Go through the shortest repr so 85.45 becomes 8545, not 8544
+    return int((Decimal(repr(float(value))) * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_cents(dollars: Optional[float]) -> Optional[int]:
+    """Dollars to integer cents, rounding half up."""
+    return None if dollars is None else _fixed(dollars, CENTS_PER_DOLLAR)
+
+
+def from_cents(cents: Optional[int]) -> Optional[float]:
+    """Integer cents back to a dollar float for display."""
+    return None if cents is None else cents / CENTS_PER_DOLLAR
+
+
+def to_minutes(hours: Optional[float]) -> int:
+    """Hours to whole minutes, rounding half up."""
+    # Called per assignment in batch runs; durations rarely land on exactly
+    # half a minute, so plain float rounding is precise enough here
+    return math.floor(hours * MINUTES_PER_HOUR + 0.5) if hours else 0
+
+
+def to_basis_points(factor: float) -> int:
+    """A multiplier such as 1.5 to basis points (15000)."""
+    return _fixed(factor, BASIS_POINTS)
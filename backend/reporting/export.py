@@ -0,0 +1,209 @@
+"""
+Streaming export of payroll results for downstream finance systems.
+
+Rows are read through a server-side cursor (``yield_per``) and written out
+chunk by chunk, so memory stays flat no matter how many records a period has.
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.schemas import PayrollResponse
+from models.database import CrewMember, PayrollRecord
+
+# Exported columns mirror the PayrollResponse schema, in the same order.
+# Nested duty violations are not flat columns and are left out.
+EXPORT_FIELDS = [field for field in PayrollResponse.model_fields if field != "violations"]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _export_statement(period_start: datetime, period_end: datetime, system: str):
+    """Build the column-only select for one period and engine."""
+    columns = {
+        "payroll_id": PayrollRecord.id,
+        "crew_member": CrewMember.first_name + " " + CrewMember.last_name,
+        "period_start": PayrollRecord.period_start,
+        "period_end": PayrollRecord.period_end,
+        "credit_hours": PayrollRecord.credit_hours,
+        "paid_hours": PayrollRecord.paid_hours,
+        "tafb_hours": PayrollRecord.tafb_hours,
+        "base_pay": PayrollRecord.base_pay,
+        "per_diem_pay": PayrollRecord.per_diem_pay,
+        "overtime_pay": PayrollRecord.overtime_pay,
+        "premium_pay": PayrollRecord.premium_pay,
+        "gross_pay": PayrollRecord.gross_pay,
+        "processing_system": PayrollRecord.processing_system,
+        "processing_time_seconds": PayrollRecord.processing_time_seconds,
+        "processing_status": PayrollRecord.processing_status,
+        "explanation": PayrollRecord.calculation_details,
+    }
+
+    return (
+        select(*[columns[field].label(field) for field in EXPORT_FIELDS])
+        .join(CrewMember, CrewMember.id == PayrollRecord.crew_member_id)
+        .where(
+            PayrollRecord.period_start == period_start,
+            PayrollRecord.period_end == period_end,
+            PayrollRecord.processing_system == system,
+        )
+        .order_by(PayrollRecord.id)
+    )
+
+
+def _iter_chunks(
+    db: Session,
+    period_start: datetime,
+    period_end: datetime,
+    system: str,
+    chunk_size: int,
+) -> Iterator[list]:
+    """Yield lists of result rows, at most ``chunk_size`` at a time."""
+    statement = _export_statement(period_start, period_end, system)
+    # Core execution skips ORM row loading; the rows are plain tuples anyway
+    result = db.connection().execute(statement.execution_options(yield_per=chunk_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands buffered bytes back to a generator."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _arrow_schema():
+    """Arrow schema matching the PayrollResponse field types."""
+    import pyarrow as pa
+
+    types = {
+        "payroll_id": pa.int64(),
+        "crew_member": pa.string(),
+        "period_start": pa.timestamp("us"),
+        "period_end": pa.timestamp("us"),
+        "processing_system": pa.string(),
+        "processing_status": pa.string(),
+        "explanation": pa.string(),
+    }
+    return pa.schema([(field, types.get(field, pa.float64())) for field in EXPORT_FIELDS])
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError(
+            "Arrow and Parquet exports require the optional 'pyarrow' package"
+        )
+
+
+def _stream_csv(chunks: Iterator[list]) -> Iterator[bytes]:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_FIELDS)
+
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield text.getvalue().encode("utf-8")
+        text.seek(0)
+        text.truncate(0)
+
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+def _record_batch(chunk: list, schema):
+    import pyarrow as pa
+
+    columns = list(zip(*chunk))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _stream_arrow(chunks: Iterator[list]) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(_record_batch(chunk, schema))
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def _stream_parquet(chunks: Iterator[list]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_batches([_record_batch(chunk, schema)]))
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def stream_payroll_export(
+    db: Session,
+    period_start: datetime,
+    period_end: datetime,
+    system: str,
+    export_format: str = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Stream all payroll records for a period and engine as encoded bytes.
+
+    Supported formats are ``csv``, ``arrow`` (IPC stream) and ``parquet``.
+    Raises ValueError for unknown formats or when pyarrow is not installed.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    if export_format != "csv":
+        _load_pyarrow()
+
+    chunks = _iter_chunks(db, period_start, period_end, system, chunk_size)
+
+    if export_format == "arrow":
+        return _stream_arrow(chunks)
+    if export_format == "parquet":
+        return _stream_parquet(chunks)
+    return _stream_csv(chunks)
@@ -0,0 +1,127 @@
+"""
+Materialized per-period payroll rollups by crew base and position.
+
+Batch runs feed every payroll they produce into a RollupAccumulator and
+store the totals once at the end, so dashboards read a handful of
+pre-aggregated rows instead of scanning payroll_records.
+
+Totals are int64 cents held in ``array('q')`` rows, so fleet-wide sums are
+exact and accumulate without boxing a float object per addition.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.database import CrewMember, PayrollRollup
+from models.money import from_cents
+
+# Slots in each group's totals row
+_HEADCOUNT, _GROSS, _OVERTIME, _PREMIUM = range(4)
+
+
+class RollupAccumulator:
+    """Accumulates payroll totals per (base, position) during a batch run."""
+
+    def __init__(self):
+        self._totals: Dict[Tuple[str, str], array] = {}
+
+    def add(
+        self,
+        crew: CrewMember,
+        gross_pay_cents: int,
+        overtime_pay_cents: int,
+        premium_pay_cents: int
+    ):
+        """Add one crew member's pay (in cents) to its base/position group."""
+        key = (crew.base, crew.position)
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = array("q", [0, 0, 0, 0])
+        totals[_HEADCOUNT] += 1
+        totals[_GROSS] += gross_pay_cents
+        totals[_OVERTIME] += overtime_pay_cents
+        totals[_PREMIUM] += premium_pay_cents
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    @property
+    def gross_pay_cents(self) -> int:
+        """Exact gross pay across every group."""
+        return sum(totals[_GROSS] for totals in self._totals.values())
+
+    @property
+    def gross_pay(self) -> float:
+        return from_cents(self.gross_pay_cents)
+
+    def store(
+        self,
+        db: Session,
+        period_start: datetime,
+        period_end: datetime,
+        system: str,
+        commit: bool = True
+    ) -> int:
+        """
+        Replace the stored rollups for a period and engine with these totals.
+
+        A batch covers the whole active roster, so its totals supersede any
+        earlier run of the same period. Rows are upserted on their (base,
+        position) key: existing groups are updated in place, new ones added
+        and groups the batch no longer has deleted, all through the session
+        so its identity map never holds a stale row. With ``commit=False``
+        the rows are only flushed, for callers that commit them together
+        with other writes. Returns the number of groups stored.
+        """
+        existing = {
+            (row.base, row.position): row
+            for row in db.query(PayrollRollup).filter(
+                PayrollRollup.period_start == period_start,
+                PayrollRollup.period_end == period_end,
+                PayrollRollup.processing_system == system
+            )
+        }
+
+        now = datetime.utcnow()
+        for (base, position), (headcount, gross, overtime, premium) in self._totals.items():
+            row = existing.pop((base, position), None)
+            if row is None:
+                row = PayrollRollup(
+                    period_start=period_start,
+                    period_end=period_end,
+                    processing_system=system,
+                    base=base,
+                    position=position
+                )
+                db.add(row)
+            row.headcount = headcount
+            row.gross_pay_cents = gross
+            row.overtime_pay_cents = overtime
+            row.premium_pay_cents = premium
+            row.updated_at = now
+
+        for row in existing.values():
+            db.delete(row)
+
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+        return len(self._totals)
+
+
+def get_rollups(
+    db: Session,
+    period_start: datetime,
+    period_end: datetime,
+    system: str
+) -> List[PayrollRollup]:
+    """Fetch the stored rollups for a period and engine."""
+    return db.query(PayrollRollup).filter(
+        PayrollRollup.period_start == period_start,
+        PayrollRollup.period_end == period_end,
+        PayrollRollup.processing_system == system
+    ).order_by(PayrollRollup.base, PayrollRollup.position).all()
@@ -0,0 +1,304 @@
+"""
+Declarative pay rules compiled into per-group evaluators.
+
+Rules are keyed by engine ("mainframe" or "ai_agent") and may be narrowed to
+a crew base, a position, a contract version and an effective date. A rule
+only needs to set the parameters it changes; more specific rules override
+less specific ones (engine-wide < base < position < base and position), and
+among equally specific rules the latest effective date wins. A higher
+priority beats all of that, which is how what-if overrides
+(RuleSet.with_overrides) take effect over every contract rule.
+
+Compiling resolves the rule set once for an engine, date and contract
+version. Each (base, position) group then gets a PayEvaluator with its
+parameters pre-converted to fixed point, so evaluating thousands of crew
+does no rule lookups and no float arithmetic.
+
+Per diem can also be paid per hour of time away from base
+(``per_diem_per_tafb_hour``), measured over the trips built by
+scheduling.pairings. The built-in rules leave it at zero so historic pay is
+unchanged, and trips are only built when a rule sets it; a contract rule
+such as rules/tafb_per_diem.json turns it on.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from models.money import (
+    BASIS_POINTS, MINUTES_PER_HOUR, from_cents, round_div, to_basis_points,
+    to_cents, to_minutes
+)
+from scheduling.pairings import build_trips
+
+PARAMETER_NAMES = (
+    "guarantee_hours",
+    "overtime_multiplier",
+    "per_diem_per_credit_hour",
+    "per_diem_per_day",
+    "per_diem_per_tafb_hour",
+    "international_per_diem_factor",
+    "red_eye_premium",
+)
+
+# Priority given to what-if overrides, above any contract rule
+OVERRIDE_PRIORITY = 1
+
+
+@dataclass
+class PayRule:
+    """One declarative rule; unset parameters inherit from broader rules."""
+
+    system: str
+    parameters: Dict[str, float] = field(default_factory=dict)
+    base: Optional[str] = None
+    position: Optional[str] = None
+    contract_version: Optional[str] = None
+    effective_date: date = date.min
+    priority: int = 0
+
+    def __post_init__(self):
+        unknown = set(self.parameters) - set(PARAMETER_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown pay rule parameter(s): {', '.join(sorted(unknown))}")
+
+    @property
+    def specificity(self) -> int:
+        return (1 if self.base is not None else 0) + (2 if self.position is not None else 0)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PayRule":
+        data = dict(data)
+        if isinstance(data.get("effective_date"), str):
+            data["effective_date"] = date.fromisoformat(data["effective_date"])
+        return cls(**data)
+
+
+# Contract terms both engines have always applied
+DEFAULT_RULES = [
+    PayRule("mainframe", {
+        "guarantee_hours": 75.0,
+        "overtime_multiplier": 1.5,
+        "per_diem_per_credit_hour": 2.50,
+        "per_diem_per_day": 0.0,
+        "per_diem_per_tafb_hour": 0.0,
+        "international_per_diem_factor": 1.0,
+        "red_eye_premium": 50.0,
+    }),
+    PayRule("ai_agent", {
+        "guarantee_hours": 75.0,
+        "overtime_multiplier": 1.5,
+        "per_diem_per_credit_hour": 0.0,
+        "per_diem_per_day": 50.0,
+        "per_diem_per_tafb_hour": 0.0,
+        "international_per_diem_factor": 1.5,
+        "red_eye_premium": 75.0,
+    }),
+]
+
+
+class PayBreakdown(NamedTuple):
+    """Pay components in fixed point: credit time in minutes, money in cents."""
+
+    credit_minutes: int
+    paid_minutes: int
+    per_diem_days: float
+    base_pay_cents: int
+    per_diem_pay_cents: int
+    overtime_pay_cents: int
+    premium_pay_cents: int
+    gross_pay_cents: int
+    # None unless TAFB per diem is in force, as trips are not built otherwise
+    away_minutes: Optional[int] = None
+
+    @property
+    def credit_hours(self) -> float:
+        return self.credit_minutes / MINUTES_PER_HOUR
+
+    @property
+    def paid_hours(self) -> float:
+        return self.paid_minutes / MINUTES_PER_HOUR
+
+    @property
+    def tafb_hours(self) -> Optional[float]:
+        if self.away_minutes is None:
+            return None
+        return self.away_minutes / MINUTES_PER_HOUR
+
+    @property
+    def premium_pay(self) -> float:
+        return from_cents(self.premium_pay_cents)
+
+    @property
+    def gross_pay(self) -> float:
+        return from_cents(self.gross_pay_cents)
+
+
+class PayEvaluator:
+    """
+    Resolved pay parameters for one (base, position) group.
+
+    The float parameters are kept for inspection; evaluation only uses their
+    fixed-point forms (minutes, cents and basis points), so every component
+    is an exact integer number of cents. ``base`` is the group's crew base,
+    which trips away from base start and end at.
+    """
+
+    __slots__ = PARAMETER_NAMES + (
+        "base", "_guarantee_minutes", "_overtime_bp", "_per_diem_hour_cents",
+        "_per_diem_day_cents", "_per_diem_tafb_cents", "_international_day_bp",
+        "_red_eye_cents",
+    )
+
+    def __init__(self, parameters: Dict[str, float], base: Optional[str] = None):
+        missing = [name for name in PARAMETER_NAMES if name not in parameters]
+        if missing:
+            raise ValueError(f"Pay rules leave parameter(s) unset: {', '.join(missing)}")
+        for name in PARAMETER_NAMES:
+            setattr(self, name, float(parameters[name]))
+        self.base = base
+
+        self._guarantee_minutes = to_minutes(self.guarantee_hours)
+        self._overtime_bp = to_basis_points(self.overtime_multiplier)
+        self._per_diem_hour_cents = to_cents(self.per_diem_per_credit_hour)
+        self._per_diem_day_cents = to_cents(self.per_diem_per_day)
+        self._per_diem_tafb_cents = to_cents(self.per_diem_per_tafb_hour)
+        self._international_day_bp = to_basis_points(self.international_per_diem_factor)
+        self._red_eye_cents = to_cents(self.red_eye_premium)
+
+    def evaluate(self, hourly_rate_cents: int, assignments: Iterable) -> PayBreakdown:
+        """Compute a crew member's pay components for a period's assignments."""
+        assignments = list(assignments)
+
+        credit_minutes = sum([to_minutes(a.credit_hours) for a in assignments])
+        if credit_minutes == 0:
+            # Calculate from duty times
+            for assignment in assignments:
+                if assignment.duty_start and assignment.duty_end:
+                    seconds = (assignment.duty_end - assignment.duty_start).total_seconds()
+                    credit_minutes += round_div(int(seconds), 60)
+
+        per_diem_day_bp = 0
+        red_eyes = 0
+        for assignment in assignments:
+            flight = assignment.flight
+            if flight:
+                per_diem_day_bp += self._international_day_bp if flight.is_international else BASIS_POINTS
+                if flight.is_red_eye:
+                    red_eyes += 1
+
+        away_minutes = None
+        if self._per_diem_tafb_cents:
+            away_minutes = sum(trip.away_minutes for trip in build_trips(self.base, assignments))
+
+        paid_minutes = max(credit_minutes, self._guarantee_minutes)
+        base_pay = round_div(paid_minutes * hourly_rate_cents, MINUTES_PER_HOUR)
+        per_diem_pay = (
+            round_div(credit_minutes * self._per_diem_hour_cents, MINUTES_PER_HOUR)
+            + round_div(per_diem_day_bp * self._per_diem_day_cents, BASIS_POINTS)
+        )
+        if away_minutes is not None:
+            per_diem_pay += round_div(away_minutes * self._per_diem_tafb_cents, MINUTES_PER_HOUR)
+        overtime_minutes = max(0, credit_minutes - self._guarantee_minutes)
+        overtime_pay = round_div(
+            overtime_minutes * hourly_rate_cents * self._overtime_bp,
+            MINUTES_PER_HOUR * BASIS_POINTS
+        )
+        premium_pay = red_eyes * self._red_eye_cents
+        gross_pay = base_pay + per_diem_pay + overtime_pay + premium_pay
+
+        return PayBreakdown(
+            credit_minutes, paid_minutes, per_diem_day_bp / BASIS_POINTS, base_pay,
+            per_diem_pay, overtime_pay, premium_pay, gross_pay, away_minutes
+        )
+
+
+class CompiledRules:
+    """Rules resolved for one engine, date and contract version."""
+
+    def __init__(self, rules: List[PayRule]):
+        # Broad rules first so narrower and later ones overwrite them
+        self._rules = sorted(rules, key=lambda r: (r.priority, r.specificity, r.effective_date))
+        self._evaluators: Dict[Tuple[Optional[str], Optional[str]], PayEvaluator] = {}
+
+    def evaluator_for(self, base: Optional[str], position: Optional[str]) -> PayEvaluator:
+        """Return the (memoized) evaluator for a crew base and position."""
+        key = (base, position)
+        evaluator = self._evaluators.get(key)
+        if evaluator is None:
+            parameters = {}
+            for rule in self._rules:
+                if rule.base in (None, base) and rule.position in (None, position):
+                    parameters.update(rule.parameters)
+            evaluator = self._evaluators[key] = PayEvaluator(parameters, base)
+        return evaluator
+
+
+class RuleSet:
+    """A collection of pay rules that can be compiled per engine and date."""
+
+    def __init__(self, rules: Iterable[PayRule]):
+        self.rules = list(rules)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "RuleSet":
+        """
+        Built-in defaults plus any rules from a JSON file.
+
+        The file (``PAY_RULES_PATH``) holds a list of rule objects using the
+        PayRule field names, with ``effective_date`` as an ISO date.
+        """
+        rules = list(DEFAULT_RULES)
+        path = path or os.getenv("PAY_RULES_PATH")
+        if path:
+            with open(path) as f:
+                rules.extend(PayRule.from_dict(item) for item in json.load(f))
+        return cls(rules)
+
+    def with_overrides(self, overrides: Iterable[PayRule]) -> "RuleSet":
+        """
+        A copy of this rule set with ``overrides`` applied on top.
+
+        Overrides win over every existing rule whatever its specificity or
+        effective date, and apply from any date under any contract version.
+        Among themselves the usual specificity order holds, so a base or
+        position override beats an engine-wide one.
+        """
+        return RuleSet(self.rules + [
+            replace(
+                rule,
+                priority=OVERRIDE_PRIORITY,
+                effective_date=date.min,
+                contract_version=None
+            )
+            for rule in overrides
+        ])
+
+    def compile(
+        self,
+        system: str,
+        as_of: date,
+        contract_version: Optional[str] = None
+    ) -> CompiledRules:
+        """Resolve the rules in force for an engine on a given date."""
+        contract_version = contract_version or os.getenv("PAY_CONTRACT_VERSION")
+        return CompiledRules([
+            rule for rule in self.rules
+            if rule.system == system
+            and rule.effective_date <= as_of
+            and rule.contract_version in (None, contract_version)
+        ])
+
+
+@lru_cache(maxsize=1)
+def default_rule_set() -> RuleSet:
+    return RuleSet.load()
+
+
+@lru_cache(maxsize=64)
+def compiled_rules(system: str, as_of: date) -> CompiledRules:
+    """Compiled default rules, cached so each period is compiled once per process."""
+    return default_rule_set().compile(system, as_of)
@@ -0,0 +1,183 @@
+"""
+In-memory interval index over crew assignments.
+
+Built once per batch (one query), then shared by both pay engines and the
+comparison path so period and overlap questions never go back to the
+database. Per crew, assignments are kept sorted by duty start, so period
+queries binary-search their bounds: O(log n + k). Overlap queries go through
+a centered interval tree, built for a crew member on their first overlap
+query. Each node holds the duties that contain its center point, sorted by
+start and by end, and every node a query visits off its O(log n) search
+path reports at least one overlap. So the search is O(log n + k) however
+long the duties are; the k results are then put back in duty-start order.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.database import CrewAssignment
+from scheduling.records import load_assignment_records
+
+
+class _Node:
+    """Centered interval tree node; duties are (start, end, position) tuples."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, duties: List[Tuple[datetime, datetime, int]]):
+        endpoints = sorted([d[0] for d in duties] + [d[1] for d in duties])
+        # An endpoint, so at least one duty contains it and the node is never empty
+        self.center = center = endpoints[len(endpoints) // 2]
+
+        left, here, right = [], [], []
+        for duty in duties:
+            if duty[1] < center:
+                left.append(duty)
+            elif duty[0] > center:
+                right.append(duty)
+            else:
+                here.append(duty)
+
+        self.by_start = sorted(here)
+        self.by_end = sorted(here, key=lambda d: d[1], reverse=True)
+        self.left = _Node(left) if left else None
+        self.right = _Node(right) if right else None
+
+
+class _CrewIntervals:
+    """Sorted duty intervals and an interval tree for one crew member."""
+
+    __slots__ = ("assignments", "starts", "tree")
+
+    def __init__(self, assignments: List[CrewAssignment]):
+        assignments.sort(key=lambda a: (a.duty_start, _duty_end(a)))
+        self.assignments = assignments
+        self.starts = [a.duty_start for a in assignments]
+        # Built on the first overlap query, so period-only users never pay for
+        # it; threads racing to build it just build equal trees
+        self.tree = None
+
+    def overlapping(self, start: datetime, end: datetime) -> List[int]:
+        """Positions of the duties overlapping the open interval (start, end)."""
+        if self.tree is None:
+            self.tree = _Node([
+                (a.duty_start, _duty_end(a), position)
+                for position, a in enumerate(self.assignments)
+            ])
+
+        found = []
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            center = node.center
+            # Every duty at the node contains its center
+            if end <= center:
+                for duty in node.by_start:
+                    if duty[0] >= end:
+                        break
+                    if duty[1] > start:
+                        found.append(duty[2])
+            elif start >= center:
+                for duty in node.by_end:
+                    if duty[1] <= start:
+                        break
+                    if duty[0] < end:
+                        found.append(duty[2])
+            else:
+                found.extend(duty[2] for duty in node.by_start)
+
+            # Left duties end before the center, right ones start after it
+            if node.left is not None and start < center:
+                stack.append(node.left)
+            if node.right is not None and end > center:
+                stack.append(node.right)
+
+        found.sort()
+        return found
+
+
+def _duty_end(assignment) -> datetime:
+    # Open-ended duties are treated as zero-length at their start
+    return assignment.duty_end or assignment.duty_start
+
+
+class AssignmentIndex:
+    """Per-crew sorted index keyed on duty start and end."""
+
+    def __init__(self, assignments: Iterable[CrewAssignment]):
+        grouped = defaultdict(list)
+        count = 0
+        for assignment in assignments:
+            if assignment.duty_start is None:
+                continue
+            grouped[assignment.crew_member_id].append(assignment)
+            count += 1
+
+        self._crew: Dict[int, _CrewIntervals] = {
+            crew_id: _CrewIntervals(items) for crew_id, items in grouped.items()
+        }
+        self._count = count
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        period_start: datetime,
+        period_end: datetime,
+        crew_ids: Optional[List[int]] = None,
+        crew_id_range: Optional[Tuple[int, int]] = None
+    ) -> "AssignmentIndex":
+        """
+        Build the index from all assignments starting within a window.
+
+        Rows are loaded as compact AssignmentRecords (flight flags
+        included) rather than ORM instances, so they are unaffected by
+        per-crew commits in the engines and safe to share across threads.
+        """
+        return cls(load_assignment_records(
+            db, period_start, period_end, crew_ids, crew_id_range=crew_id_range
+        ))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def crew_ids(self) -> List[int]:
+        return list(self._crew)
+
+    def for_crew(self, crew_id: int) -> List[CrewAssignment]:
+        """All indexed assignments for a crew member, sorted by duty start."""
+        intervals = self._crew.get(crew_id)
+        return list(intervals.assignments) if intervals else []
+
+    def in_period(
+        self,
+        crew_id: int,
+        period_start: datetime,
+        period_end: datetime
+    ) -> List[CrewAssignment]:
+        """Assignments whose duty starts within [period_start, period_end]."""
+        intervals = self._crew.get(crew_id)
+        if not intervals:
+            return []
+
+        lo = bisect_left(intervals.starts, period_start)
+        hi = bisect_right(intervals.starts, period_end)
+        return intervals.assignments[lo:hi]
+
+    def overlapping(
+        self,
+        crew_id: int,
+        start: datetime,
+        end: datetime
+    ) -> List[CrewAssignment]:
+        """Assignments whose duty interval overlaps the open interval (start, end)."""
+        intervals = self._crew.get(crew_id)
+        if not intervals:
+            return []
+
+        assignments = intervals.assignments
+        return [assignments[position] for position in intervals.overlapping(start, end)]
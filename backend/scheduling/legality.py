@@ -0,0 +1,121 @@
+"""
+Duty legality and rest-period validation.
+
+Runs before pay calculation to flag assignment data that would silently
+inflate credit hours: overlapping duties, too little rest between duties and
+duties longer than the allowed maximum. Each crew member's duties are sorted
+once and swept in a single pass, so a fleet of n assignments costs
+O(n log n) rather than a pairwise comparison.
+"""
+
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+from models.database import DutyViolation
+from scheduling.index import AssignmentIndex
+
+OVERLAP = "overlap"
+INSUFFICIENT_REST = "insufficient_rest"
+DUTY_TOO_LONG = "duty_too_long"
+
+
+@dataclass
+class Violation:
+    """A single flagged duty problem."""
+
+    crew_member_id: int
+    kind: str
+    assignment_id: int
+    other_assignment_id: Optional[int]
+    hours: float
+    detail: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class DutyValidator:
+    """Detects overlapping duties, rest violations and over-long duties."""
+
+    def __init__(
+        self,
+        min_rest_hours: Optional[float] = None,
+        max_duty_hours: Optional[float] = None
+    ):
+        self.min_rest_hours = (
+            min_rest_hours if min_rest_hours is not None
+            else float(os.getenv("DUTY_MIN_REST_HOURS", "10"))
+        )
+        self.max_duty_hours = (
+            max_duty_hours if max_duty_hours is not None
+            else float(os.getenv("DUTY_MAX_HOURS", "14"))
+        )
+
+    def validate_crew(self, crew_id: int, assignments: Iterable) -> List[Violation]:
+        """
+        Sweep one crew member's duties in start order.
+
+        Each duty is checked against the previous duty that ends latest:
+        starting before it ends is an overlap, starting too soon after is a
+        rest violation.
+        """
+        duties = sorted(
+            (a for a in assignments if a.duty_start and a.duty_end),
+            key=lambda a: (a.duty_start, a.duty_end)
+        )
+
+        violations = []
+        latest = None
+
+        for duty in duties:
+            duty_hours = (duty.duty_end - duty.duty_start).total_seconds() / 3600
+            if duty_hours > self.max_duty_hours:
+                violations.append(Violation(
+                    crew_id, DUTY_TOO_LONG, duty.id, None, duty_hours,
+                    f"Duty of {duty_hours:.2f}h exceeds the {self.max_duty_hours:.1f}h limit"
+                ))
+
+            if latest is not None:
+                gap_hours = (duty.duty_start - latest.duty_end).total_seconds() / 3600
+                if gap_hours < 0:
+                    violations.append(Violation(
+                        crew_id, OVERLAP, duty.id, latest.id, -gap_hours,
+                        f"Overlaps assignment {latest.id} by {-gap_hours:.2f}h"
+                    ))
+                elif gap_hours < self.min_rest_hours:
+                    violations.append(Violation(
+                        crew_id, INSUFFICIENT_REST, duty.id, latest.id, gap_hours,
+                        f"Only {gap_hours:.2f}h rest after assignment {latest.id} "
+                        f"(minimum {self.min_rest_hours:.1f}h)"
+                    ))
+
+            if latest is None or duty.duty_end > latest.duty_end:
+                latest = duty
+
+        return violations
+
+    def validate_index(self, index: AssignmentIndex) -> Dict[int, List[Violation]]:
+        """Validate every crew member in an index; crew without problems are omitted."""
+        results = {}
+        for crew_id in index.crew_ids():
+            violations = self.validate_crew(crew_id, index.for_crew(crew_id))
+            if violations:
+                results[crew_id] = violations
+        return results
+
+
+def attach_violations(payroll, violations: List[Violation]):
+    """Record violations on an (unsaved) PayrollRecord and flag its status."""
+    for violation in violations:
+        payroll.violations.append(DutyViolation(
+            crew_member_id=violation.crew_member_id,
+            kind=violation.kind,
+            assignment_id=violation.assignment_id,
+            other_assignment_id=violation.other_assignment_id,
+            hours=violation.hours,
+            detail=violation.detail
+        ))
+
+    if violations:
+        payroll.processing_status = "flagged"
@@ -0,0 +1,101 @@
+"""
+Pairing (trip) construction for time-away-from-base per diem.
+
+A trip starts with a leg departing the crew member's base and ends with the
+first leg that arrives back there; time away from base (TAFB) runs from the
+first leg's duty start to the last leg's duty end. Legs are chained in one
+pass over the crew member's assignments in duty-start order, which the
+AssignmentIndex and the batch loaders already provide, so building trips for
+a whole fleet costs O(n) on top of the pay calculation itself.
+
+Schedules cut by the pay period are still counted: a trip whose first leg
+does not depart base (it began before the period) or that has not returned
+by the last leg is kept and marked incomplete, with TAFB measured over the
+legs inside the period.
+"""
+
+from typing import Iterable, List, Optional
+
+from models.money import round_div
+
+
+class Trip:
+    """One chain of legs away from base."""
+
+    __slots__ = ("start", "end", "legs", "complete")
+
+    def __init__(self, start, end, legs: int, complete: bool):
+        self.start = start
+        self.end = end
+        self.legs = legs
+        self.complete = complete
+
+    @property
+    def away_minutes(self) -> int:
+        return round_div(int((self.end - self.start).total_seconds()), 60)
+
+    def __repr__(self) -> str:
+        return (
+            f"Trip(start={self.start}, end={self.end}, legs={self.legs}, "
+            f"complete={self.complete})"
+        )
+
+
+def _in_start_order(assignments: List) -> bool:
+    for previous, current in zip(assignments, assignments[1:]):
+        if current.duty_start < previous.duty_start:
+            return False
+    return True
+
+
+def build_trips(base: Optional[str], assignments: Iterable) -> List[Trip]:
+    """
+    Chain a crew member's assignments into trips from and back to ``base``.
+
+    Legs without duty times or without a routed flight (origin and
+    destination) are skipped; they neither open nor close a trip. A leg that
+    departs base while a trip is still open closes that trip as incomplete,
+    since the return leg is missing from the data.
+    """
+    if not base:
+        return []
+
+    legs = [a for a in assignments if a.duty_start and a.duty_end]
+    if not _in_start_order(legs):
+        legs.sort(key=lambda a: a.duty_start)
+
+    trips = []
+    start = end = None
+    count = 0
+    complete = False
+
+    for leg in legs:
+        flight = leg.flight
+        origin = getattr(flight, "origin", None)
+        destination = getattr(flight, "destination", None)
+        if not origin or not destination:
+            continue
+
+        if start is not None and origin == base:
+            trips.append(Trip(start, end, count, False))
+            start = None
+
+        if start is None:
+            start, end, count = leg.duty_start, leg.duty_end, 0
+            complete = origin == base
+
+        end = max(end, leg.duty_end)
+        count += 1
+
+        if destination == base:
+            trips.append(Trip(start, end, count, complete))
+            start = end = None
+
+    if start is not None:
+        trips.append(Trip(start, end, count, False))
+    return trips
+
+
+def away_minutes(base: Optional[str], assignments: Iterable) -> int:
+    """Total minutes away from base over a crew member's trips."""
+    return sum(trip.away_minutes for trip in build_trips(base, assignments))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Report where API cold-start time goes.
+
+Imports ``main`` in a fresh interpreter with ``-X importtime`` and breaks the
+import cost down by top-level package, then times engine creation and the
+startup schema check against the configured DATABASE_URL.
+
+Usage:
+    python startup_report.py [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def measure_imports(module: str = "main"):
+    """Return (total_seconds, {package: self_seconds}, [(module, cumulative_seconds)])."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    by_package = defaultdict(float)
+    modules = []
+    total = 0.0
+
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name_stripped = name.strip()
+        by_package[name_stripped.split(".")[0]] += int(self_us) / 1e6
+        modules.append((name_stripped, int(cumulative_us) / 1e6))
+        if name_stripped == module:
+            total = int(cumulative_us) / 1e6
+
+    return total, dict(by_package), modules
+
+
+def measure_init():
+    """Time lazy engine creation and the startup schema check."""
+    from models.database import get_engine, ensure_schema
+
+    timings = {}
+    start = time.perf_counter()
+    get_engine()
+    timings["create_engine"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ensure_schema()
+    timings["ensure_schema (first)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ensure_schema()
+    timings["ensure_schema (up to date)"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="rows per section")
+    args = parser.parse_args()
+
+    total, by_package, modules = measure_imports()
+
+    print(f"\nImport of main: {total:.3f}s\n")
+    print(f"{'Package (self time)':<40}{'seconds':>10}{'share':>8}")
+    for package, seconds in sorted(by_package.items(), key=lambda kv: -kv[1])[:args.top]:
+        share = seconds / total * 100 if total else 0
+        print(f"{package:<40}{seconds:>10.3f}{share:>7.1f}%")
+
+    print(f"\n{'Module (cumulative)':<40}{'seconds':>10}")
+    for name, seconds in sorted(modules, key=lambda m: -m[1])[:args.top]:
+        print(f"{name:<40}{seconds:>10.3f}")
+
+    print(f"\n{'Init step':<40}{'seconds':>10}")
+    try:
+        for step, seconds in measure_init().items():
+            print(f"{step:<40}{seconds:>10.3f}")
+    except Exception as e:
+        print(f"Database init not measured: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
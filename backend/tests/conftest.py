@@ -0,0 +1,38 @@
+"""
+Shared test fixtures.
+
+Tests run against an in-memory SQLite database (override with
+TEST_DATABASE_URL, e.g. a scratch PostgreSQL database) whose schema is
+created once per session. Everything a test writes is rolled back when it
+finishes, so tests can reuse fixed ids and names.
+"""
+
+import os
+
+# Before anything reads DATABASE_URL; tests must never touch the real database
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "sqlite://")
+
+import pytest
+from models.cache import crew_cache
+from models.database import ephemeral_session, init_db
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    """Create the tables once for the whole run."""
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def clear_crew_cache():
+    """Rolled-back crew ids are reused, so cached snapshots must not outlive a test."""
+    crew_cache.clear()
+    yield
+    crew_cache.clear()
+
+
+@pytest.fixture
+def db_session():
+    """Session whose writes are rolled back after the test."""
+    with ephemeral_session() as db:
+        yield db
@@ -0,0 +1,50 @@
+"""
+Tests for per-class admission control.
+"""
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from api.admission import AdmissionLimit
+
+
+def test_queue_full_is_rejected_with_429():
+    """Over concurrency plus queue, requests are turned away immediately."""
+    limit = AdmissionLimit("batch", max_concurrent=1, max_queue=1, queue_timeout_seconds=5)
+
+    async def run():
+        await limit.acquire()
+        queued = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await limit.acquire()
+
+        limit.release(hold_seconds=4.0)
+        await queued
+        return rejected.value
+
+    rejected = asyncio.run(run())
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "2"
+    stats = limit.stats()
+    assert (stats["active"], stats["queued"], stats["admitted"], stats["rejected"]) == (1, 0, 2, 1)
+    assert stats["avg_hold_seconds"] == 4.0
+
+
+def test_queue_timeout_is_503_and_frees_the_queue():
+    """A queued request that waits too long gets 503 and leaves the queue."""
+    limit = AdmissionLimit("single", max_concurrent=1, max_queue=5, queue_timeout_seconds=0.01)
+
+    async def run():
+        await limit.acquire()
+        with pytest.raises(HTTPException) as timed_out:
+            await limit.acquire()
+        limit.release()
+        await limit.acquire()
+        return timed_out.value
+
+    timed_out = asyncio.run(run())
+    assert timed_out.status_code == 503
+    assert "Retry-After" in timed_out.headers
+    stats = limit.stats()
+    assert (stats["active"], stats["queued"], stats["timed_out"]) == (1, 0, 1)
@@ -2,22 +2,11 @@
 Tests for AI agent orchestrator.
 """
 
-import pytest
 from datetime import datetime, timedelta
-from models.database import SessionLocal, init_db
 from agents.orchestrator import CrewPayOrchestrator
 from mainframe.data_loader import DataLoader
 
 
-@pytest.fixture
-def db_session():
-    """Create test database session."""
-    init_db()
-    db = SessionLocal()
-    yield db
-    db.close()
-
-
 def test_process_crew_member(db_session):
     """Test AI agent processing."""
     loader = DataLoader(db_session)
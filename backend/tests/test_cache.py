@@ -0,0 +1,113 @@
+"""
+Tests for the crew member read-through cache.
+"""
+
+import uuid
+import pytest
+from models.database import CrewMember
+from models.cache import CrewCache, CrewSnapshot, crew_cache
+
+
+@pytest.fixture
+def crew(db_session):
+    """Create a crew member with a unique employee id."""
+    crew = CrewMember(
+        employee_id=f"CCH{uuid.uuid4().hex[:8]}",
+        first_name="Mike",
+        last_name="Brown",
+        position="First Officer",
+        base="TPA",
+        hourly_rate=80.0
+    )
+    db_session.add(crew)
+    db_session.commit()
+    return crew
+
+
+def _snapshot(crew_id):
+    return CrewSnapshot(crew_id, f"E{crew_id}", "A", "B", "Captain", "BUR", 100.0, "active")
+
+
+def test_read_through_hits_and_misses(db_session, crew):
+    """Second lookup is served from the cache."""
+    cache = CrewCache(maxsize=10, ttl_seconds=60)
+
+    first = cache.get(db_session, crew.id)
+    second = cache.get(db_session, crew.id)
+
+    assert first is second
+    assert first.hourly_rate == 80.0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.get(db_session, -1) is None
+
+
+def test_update_invalidates_entry(db_session, crew):
+    """ORM updates evict the stale snapshot."""
+    crew_cache.get(db_session, crew.id)
+
+    crew.hourly_rate = 95.0
+    db_session.commit()
+
+    assert crew_cache.get(db_session, crew.id).hourly_rate == 95.0
+
+
+def test_invalidation_waits_for_commit(db_session, crew):
+    """A flushed but uncommitted update leaves the committed snapshot cached."""
+    cached = crew_cache.get(db_session, crew.id)
+
+    crew.hourly_rate = 97.0
+    db_session.flush()
+    assert crew_cache.get(db_session, crew.id) is cached
+
+    db_session.rollback()
+    assert crew_cache.get(db_session, crew.id) is cached
+
+    db_session.query(CrewMember).filter(CrewMember.id == crew.id).update(
+        {CrewMember.hourly_rate_cents: 9_900}, synchronize_session=False
+    )
+    db_session.commit()
+    assert crew_cache.get(db_session, crew.id).hourly_rate == 99.0
+
+
+def test_load_straddling_invalidation_is_not_cached():
+    """A snapshot read before an invalidation cannot be stored after it."""
+    cache = CrewCache(maxsize=10, ttl_seconds=60)
+    generation = cache._generation
+    cache.invalidate(7)
+    cache.put(_snapshot(7), generation)
+
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted past maxsize."""
+    cache = CrewCache(maxsize=2, ttl_seconds=60)
+    for crew_id in (1, 2, 3):
+        cache.put(_snapshot(crew_id))
+
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entry_reloads(db_session, crew):
+    """Entries past their TTL are reloaded from the database."""
+    cache = CrewCache(maxsize=10, ttl_seconds=0)
+    cache.put(_snapshot(crew.id))
+
+    assert cache.get(db_session, crew.id).employee_id == crew.employee_id
+    assert cache.stats()["misses"] == 1
+
+
+def test_get_many_loads_misses_in_one_query(db_session, crew):
+    """Cached ids are served directly; unknown ids are left out."""
+    cache = CrewCache(maxsize=10, ttl_seconds=60)
+    cache.put(_snapshot(-5))
+
+    found = cache.get_many(db_session, [-5, crew.id, crew.id, -1])
+
+    assert sorted(found) == sorted([-5, crew.id])
+    assert found[crew.id].employee_id == crew.employee_id
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.get(db_session, crew.id) is found[crew.id]
@@ -0,0 +1,56 @@
+"""
+Tests for single-flight coalescing of identical concurrent requests.
+"""
+
+import asyncio
+import threading
+import pytest
+from api.coalescing import SingleFlight
+
+
+def test_identical_calls_share_one_computation():
+    """Concurrent calls with the same key run once and all get the result."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        release.wait(timeout=5)
+        return {"value": value}
+
+    async def run():
+        same = [asyncio.create_task(flight.do("a", compute, 1)) for _ in range(5)]
+        other = asyncio.create_task(flight.do("b", compute, 2))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*same), await other
+
+    same, other = asyncio.run(run())
+
+    assert sorted(calls) == [1, 2]
+    assert all(result is same[0] for result in same)
+    assert other == {"value": 2}
+    assert flight.stats()["executions"] == 2
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    """A failed computation fails all waiters; the next call runs again."""
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+    with pytest.raises(ValueError):
+        asyncio.run(flight.do("k", fail))
+    assert flight.stats()["errors"] == 2
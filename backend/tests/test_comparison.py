@@ -6,22 +6,13 @@ import pytest
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from models.database import SessionLocal, init_db
+from models.database import PayrollRecord
 from mainframe.data_loader import DataLoader
 from mainframe.batch_processor import BatchProcessor
 from agents.orchestrator import CrewPayOrchestrator
 from comparison.analyzer import ComparisonAnalyzer
 
 
-@pytest.fixture
-def db_session():
-    """Create test database session."""
-    init_db()
-    db = SessionLocal()
-    yield db
-    db.close()
-
-
 @pytest.fixture
 def sample_data(db_session):
     """Load sample data for testing."""
@@ -111,3 +102,24 @@ def test_edge_cases(db_session, sample_data):
     )
     
     assert ai_result['gross_pay'] >= 0
+
+
+def test_analyzer_compares_exact_cents():
+    """A one-cent difference is reported; identical cents are a match."""
+    
+    def record(gross_pay_cents):
+        return PayrollRecord(
+            credit_hours=80.0,
+            gross_pay_cents=gross_pay_cents,
+            per_diem_pay_cents=20_000,
+            premium_pay_cents=5_000
+        )
+    
+    analyzer = ComparisonAnalyzer()
+    
+    same = analyzer.compare_payroll_records(record(900_001), record(900_001), 1.0, 0.5)
+    assert same['metrics']['accuracy_match'] is True
+    
+    off_by_one = analyzer.compare_payroll_records(record(900_001), record(900_002), 1.0, 0.5)
+    assert [d['field'] for d in off_by_one['differences']] == ["gross_pay"]
+    assert off_by_one['differences'][0]['difference'] == 0.01
@@ -0,0 +1,121 @@
+"""
+Tests for lazy engine setup, the startup schema check and read routing.
+"""
+
+from sqlalchemy import create_engine, inspect, text
+
+from models import database
+from models.database import (
+    SCHEMA_VERSION, ReadReplicaRouter, SessionLocal, ensure_schema, ephemeral_session,
+    get_engine, get_schema_version, is_memory_database, migrate_columns, migrate_indexes
+)
+
+
+def test_ensure_schema_is_noop_when_current():
+    """Once the version is recorded, the startup check does nothing."""
+    ensure_schema()
+
+    assert get_schema_version() == SCHEMA_VERSION
+    assert ensure_schema() is False
+
+
+def test_engine_is_shared():
+    """The lazily created engine is created once and reused."""
+    assert get_engine() is get_engine()
+
+
+def test_ephemeral_session_rolls_back_commits():
+    """Commits made inside ephemeral_session, from any session, are discarded on exit."""
+    assert is_memory_database("sqlite://") and not is_memory_database("sqlite:///crew.db")
+
+    with ephemeral_session() as db:
+        db.add(database.CrewMember(employee_id="EPH-1"))
+        db.commit()
+
+        other = SessionLocal()
+        other.add(database.CrewMember(employee_id="EPH-2"))
+        other.commit()
+        other.close()
+
+        assert db.query(database.CrewMember).filter(
+            database.CrewMember.employee_id.like("EPH-%")
+        ).count() == 2
+
+    with SessionLocal() as db:
+        assert db.query(database.CrewMember).filter(
+            database.CrewMember.employee_id.like("EPH-%")
+        ).count() == 0
+
+
+def test_migrate_columns_backfills_cents(tmp_path, monkeypatch):
+    """Databases from before integer cents get cents columns filled from dollars."""
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE crew_members (id INTEGER PRIMARY KEY, hourly_rate FLOAT)"))
+        conn.execute(text(
+            "CREATE TABLE payroll_records (id INTEGER PRIMARY KEY, base_pay FLOAT, "
+            "per_diem_pay FLOAT, overtime_pay FLOAT, premium_pay FLOAT, gross_pay FLOAT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE payroll_rollups (id INTEGER PRIMARY KEY, gross_pay FLOAT, "
+            "overtime_pay FLOAT, premium_pay FLOAT)"
+        ))
+        conn.execute(text("INSERT INTO crew_members VALUES (1, 85.45)"))
+        conn.execute(text("INSERT INTO payroll_records VALUES (1, 6408.75, 0.1, 0.2, 50.0, 6459.05)"))
+
+    monkeypatch.setattr(database, "_engine", legacy)
+    migrate_columns(2)
+
+    with legacy.connect() as conn:
+        assert conn.execute(text("SELECT hourly_rate_cents FROM crew_members")).scalar() == 8545
+        assert conn.execute(text(
+            "SELECT per_diem_pay_cents, gross_pay_cents FROM payroll_records"
+        )).one() == (10, 645905)
+
+
+def test_migrate_indexes_builds_indexes_added_to_existing_tables(tmp_path, monkeypatch):
+    """An index added to a table that already exists is created on upgrade."""
+    existing = create_engine(f"sqlite:///{tmp_path / 'existing.db'}")
+    database.Base.metadata.create_all(existing)
+    with existing.begin() as conn:
+        conn.execute(text("DROP INDEX ix_payroll_records_period_system"))
+
+    monkeypatch.setattr(database, "_engine", existing)
+    migrate_indexes()
+
+    indexes = {index["name"] for index in inspect(existing).get_indexes("payroll_records")}
+    assert "ix_payroll_records_period_system" in indexes
+
+
+def _sqlite_replica(tmp_path, employee_id):
+    """A replica stand-in: a separate SQLite file with one crew member."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    database.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(database.CrewMember.__table__.insert(), {"employee_id": employee_id})
+    return url
+
+
+def _read_employee_ids(router):
+    with database.ReadSessionLocal(bind=router.engine_for_read()) as db:
+        return [crew.employee_id for crew in db.query(database.CrewMember).all()]
+
+
+def test_read_router_uses_caught_up_replica(tmp_path):
+    """Reads go to a reachable replica within the lag limit."""
+    router = ReadReplicaRouter(urls=[_sqlite_replica(tmp_path, "REPLICA-1")], max_lag_seconds=5)
+
+    assert _read_employee_ids(router) == ["REPLICA-1"]
+    assert router.stats()["replica_reads"] == 1
+
+
+def test_read_router_falls_back_to_primary(tmp_path, monkeypatch):
+    """Lagging or unreachable replicas are skipped in favour of the primary."""
+    lagging = ReadReplicaRouter(urls=[_sqlite_replica(tmp_path, "REPLICA-1")], max_lag_seconds=5)
+    monkeypatch.setattr(ReadReplicaRouter, "replica_lag", staticmethod(lambda engine: 30.0))
+    assert lagging.engine_for_read() is get_engine()
+
+    unreachable = ReadReplicaRouter(urls=[f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    assert unreachable.engine_for_read() is get_engine()
+    assert unreachable.stats()["primary_fallbacks"] == 1
@@ -0,0 +1,91 @@
+"""
+Tests for distributed batch runs over the work queue.
+"""
+
+from datetime import datetime, timedelta
+from mainframe import distributed
+from mainframe.batch_processor import BatchProcessor
+from mainframe.distributed import (
+    BatchWorker, claim_work_item, enqueue_batch, queue_status, requeue_expired
+)
+from models.database import BatchWorkItem, CrewMember, PayrollRecord, PayrollRun
+from reporting.rollups import get_rollups
+
+PERIOD_START = datetime(2007, 2, 1)
+PERIOD_END = datetime(2007, 2, 28)
+
+
+def _roster(db, size):
+    for i in range(size):
+        db.add(CrewMember(
+            employee_id=f"DIST-{i}", first_name="Dist", last_name=str(i),
+            position="Captain" if i % 2 else "Flight Attendant", base="BUR",
+            hourly_rate=80.0 + i, status="active"
+        ))
+    db.commit()
+
+
+def test_workers_drain_queue_and_finalize_run(db_session):
+    """Chunks processed by several workers add up to the same run a single process produces."""
+    _roster(db_session, 5)
+    run, items = enqueue_batch(db_session, PERIOD_START, PERIOD_END, chunk_size=2)
+    assert items == 3
+    assert queue_status(db_session, run.id)["work_items"]["queued"] == 3
+
+    workers = [BatchWorker(f"worker-{i}", poll_seconds=0) for i in range(2)]
+    while any(worker.run_once(db_session) for worker in workers):
+        pass
+
+    status = queue_status(db_session, run.id)
+    assert status["status"] == "completed"
+    assert status["work_items"]["done"] == 3 and status["processed"] == 5
+    assert sum(worker.completed for worker in workers) == 3
+    assert [r.headcount for r in get_rollups(db_session, PERIOD_START, PERIOD_END, "mainframe")] == [2, 3]
+
+    single = BatchProcessor(db_session).run_batch_job(
+        PERIOD_START, PERIOD_END, simulate_delay=False, shadow_sample_rate=0
+    )
+    assert db_session.get(PayrollRun, single["run_id"]).digest == status["digest"]
+
+
+def test_expired_lease_is_requeued_and_late_result_discarded(db_session):
+    """A worker that lost its lease cannot save a second copy of the item's payroll."""
+    _roster(db_session, 2)
+    run, _ = enqueue_batch(db_session, PERIOD_START, PERIOD_END, chunk_size=10)
+
+    stalled = BatchWorker("stalled")
+    item = claim_work_item(db_session, stalled.worker_id)
+    assert claim_work_item(db_session, "other") is None
+
+    item.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    assert requeue_expired(db_session) == 1
+
+    BatchWorker("rescuer").run(exit_when_idle=True)
+    stalled._process(db_session, item)
+
+    assert stalled.lost == 1
+    assert db_session.query(PayrollRecord).filter(PayrollRecord.run_id == run.id).count() == 2
+    finished = db_session.query(BatchWorkItem).filter(BatchWorkItem.run_id == run.id).one()
+    assert (finished.status, finished.claimed_by, finished.attempts) == ("done", "rescuer", 2)
+    assert db_session.get(PayrollRun, run.id).status == "completed"
+
+
+def test_failed_finalize_leaves_run_running_until_next_sweep(db_session, monkeypatch):
+    """A finalizer that fails part way commits nothing; the requeue sweep finishes the run."""
+    _roster(db_session, 2)
+    run, _ = enqueue_batch(db_session, PERIOD_START, PERIOD_END, chunk_size=10)
+
+    def crash(db, run):
+        raise RuntimeError("finalizer died")
+
+    monkeypatch.setattr(distributed, "finish_run", crash)
+    assert BatchWorker("crashing").run_once(db_session)
+    db_session.expire_all()
+    assert db_session.get(PayrollRun, run.id).status == "running"
+    assert get_rollups(db_session, PERIOD_START, PERIOD_END, "mainframe") == []
+
+    monkeypatch.undo()
+    requeue_expired(db_session)
+    assert queue_status(db_session, run.id)["status"] == "completed"
+    assert len(get_rollups(db_session, PERIOD_START, PERIOD_END, "mainframe")) == 2
@@ -0,0 +1,91 @@
+"""
+Tests for streaming payroll export.
+"""
+
+import csv
+import io
+import uuid
+import pytest
+from datetime import datetime
+from models.database import CrewMember, PayrollRecord
+from reporting.export import EXPORT_FIELDS, stream_payroll_export
+
+
+@pytest.fixture
+def exported_period(db_session):
+    """Create payroll records for an isolated period."""
+    period_start = datetime(2001, 1, 1)
+    period_end = datetime(2001, 1, 31)
+
+    crew = CrewMember(
+        employee_id=f"EXP{uuid.uuid4().hex[:8]}",
+        first_name="Jane",
+        last_name="Smith",
+        position="Captain",
+        base="BUR",
+        hourly_rate=100.0
+    )
+    db_session.add(crew)
+    db_session.commit()
+
+    db_session.query(PayrollRecord).filter(
+        PayrollRecord.period_start == period_start
+    ).delete()
+
+    for system in ["mainframe", "mainframe", "ai_agent"]:
+        db_session.add(PayrollRecord(
+            crew_member_id=crew.id,
+            period_start=period_start,
+            period_end=period_end,
+            credit_hours=80.0,
+            paid_hours=80.0,
+            base_pay=8000.0,
+            per_diem_pay=200.0,
+            overtime_pay=750.0,
+            premium_pay=50.0,
+            gross_pay=9000.0,
+            processing_system=system,
+            processing_time_seconds=0.01,
+            processing_status="completed",
+            calculation_details="Mainframe batch calculation"
+        ))
+    db_session.commit()
+
+    return period_start, period_end
+
+
+def test_csv_export_matches_response_schema(db_session, exported_period):
+    """CSV export streams one row per record with PayrollResponse columns."""
+    period_start, period_end = exported_period
+
+    content = b"".join(stream_payroll_export(
+        db_session, period_start, period_end, "mainframe", chunk_size=1
+    ))
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+
+    assert rows[0] == EXPORT_FIELDS
+    assert len(rows) == 3
+    assert rows[1][EXPORT_FIELDS.index("crew_member")] == "Jane Smith"
+    assert float(rows[1][EXPORT_FIELDS.index("gross_pay")]) == 9000.0
+
+
+def test_arrow_export(db_session, exported_period):
+    """Arrow IPC export round-trips through pyarrow."""
+    pa = pytest.importorskip("pyarrow")
+    period_start, period_end = exported_period
+
+    content = b"".join(stream_payroll_export(
+        db_session, period_start, period_end, "ai_agent", export_format="arrow"
+    ))
+    table = pa.ipc.open_stream(content).read_all()
+
+    assert table.column_names == EXPORT_FIELDS
+    assert table.num_rows == 1
+
+
+def test_unknown_format_rejected(db_session):
+    """Unsupported formats raise before any query runs."""
+    with pytest.raises(ValueError):
+        stream_payroll_export(
+            db_session, datetime(2001, 1, 1), datetime(2001, 1, 31), "mainframe", export_format="xlsx"
+        )
@@ -2,22 +2,11 @@
 Tests for mainframe batch processor.
 """
 
-import pytest
 from datetime import datetime, timedelta
-from models.database import SessionLocal, init_db
 from mainframe.batch_processor import BatchProcessor
 from mainframe.data_loader import DataLoader
 
 
-@pytest.fixture
-def db_session():
-    """Create test database session."""
-    init_db()
-    db = SessionLocal()
-    yield db
-    db.close()
-
-
 def test_process_single_crew_member(db_session):
     """Test processing a single crew member."""
     loader = DataLoader(db_session)
@@ -50,3 +39,64 @@ def test_batch_job(db_session):
     assert stats['processed'] > 0
     assert stats['errors'] >= 0
     assert stats['total_pay'] > 0
+
+
+def test_bucket_by_period_sweep():
+    """Each assignment lands in every period containing its duty start."""
+    from types import SimpleNamespace
+
+    day = lambda d: datetime(2024, 1, 1) + timedelta(days=d)
+    assignments = [
+        SimpleNamespace(crew_member_id=1, duty_start=day(d))
+        for d in (0, 10, 31, 45, 95)
+    ]
+    periods = [(day(0), day(30)), (day(20), day(50)), (day(31), day(60))]
+
+    buckets = BatchProcessor(None)._bucket_by_period(assignments, periods)
+
+    starts = lambda key: [(a.duty_start - day(0)).days for a in buckets.get(key, [])]
+    assert starts((1, 0)) == [0, 10]
+    assert starts((1, 1)) == [31, 45]
+    assert starts((1, 2)) == [31, 45]
+
+
+def test_batch_job_keeps_supplied_empty_index(db_session):
+    """An empty index passed in is used as is, not reloaded per chunk."""
+    from models.database import PayrollRecord
+    from scheduling.index import AssignmentIndex
+
+    loader = DataLoader(db_session)
+    loader.generate_all_sample_data(num_crew=3, num_flights=20)
+    period_start = datetime.now().replace(day=1)
+    period_end = period_start + timedelta(days=30)
+
+    stats = BatchProcessor(db_session, index=AssignmentIndex([])).run_batch_job(
+        period_start, period_end, simulate_delay=False, shadow_sample_rate=0
+    )
+
+    records = db_session.query(PayrollRecord).filter(PayrollRecord.run_id == stats['run_id']).all()
+    assert len(records) == stats['processed'] == 3
+    assert all(record.credit_hours == 0 for record in records)
+
+
+def test_multi_period_batch_streams_roster_in_chunks(db_session):
+    """Chunked multi-period runs match one single-period run per period."""
+    from models.database import PayrollRun
+
+    loader = DataLoader(db_session)
+    loader.generate_all_sample_data(num_crew=5, num_flights=40)
+    first = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    periods = [(first, first + timedelta(days=14)), (first + timedelta(days=15), first + timedelta(days=30))]
+
+    stats = BatchProcessor(db_session, chunk_size=2).run_multi_period_batch(
+        periods, simulate_delay=False
+    )
+
+    assert stats['total_crew'] == 5 and stats['processed'] == 10
+    for period, period_stats in zip(periods, stats['periods']):
+        single = BatchProcessor(db_session).run_batch_job(
+            *period, simulate_delay=False, shadow_sample_rate=0
+        )
+        assert period_stats['total_pay'] == single['total_pay']
+        assert (db_session.get(PayrollRun, period_stats['run_id']).digest
+                == db_session.get(PayrollRun, single['run_id']).digest)
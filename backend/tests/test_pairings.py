@@ -0,0 +1,106 @@
+"""
+Tests for trip construction and time-away-from-base per diem.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from mainframe.batch_processor import BatchProcessor
+from models.database import CrewAssignment, CrewMember, Flight, PayrollRecord
+from rules.engine import DEFAULT_RULES, PayRule, RuleSet
+from scheduling.pairings import build_trips
+from scheduling.records import FlightFlags
+
+START = datetime(2024, 5, 1)
+SAMPLE_RULES = os.path.join(os.path.dirname(__file__), "..", "rules", "tafb_per_diem.json")
+
+
+def _leg(origin, destination, hours_in, duration=3.0):
+    duty_start = START + timedelta(hours=hours_in)
+    return SimpleNamespace(
+        credit_hours=duration,
+        duty_start=duty_start,
+        duty_end=duty_start + timedelta(hours=duration),
+        flight=FlightFlags.of(False, False, origin, destination)
+    )
+
+
+def test_legs_chain_into_trips_from_base():
+    """Trips open on leaving base, close on returning, and keep cut-off ends."""
+    legs = [
+        _leg("TPA", "BUR", 0),       # trip already under way when the period began
+        _leg("BUR", "TPA", 24),
+        _leg("TPA", "FLL", 30),
+        _leg("FLL", "BUR", 48),      # back at base: 27h away
+        _leg("BUR", "MCO", 96),      # still out when the period ends
+    ]
+    unrouted = SimpleNamespace(
+        credit_hours=1.0, duty_start=START + timedelta(hours=40),
+        duty_end=START + timedelta(hours=41), flight=None
+    )
+
+    trips = build_trips("BUR", list(reversed(legs)) + [unrouted])
+
+    assert [(t.legs, t.complete, t.away_minutes) for t in trips] == [
+        (1, False, 180), (3, True, 27 * 60), (1, False, 180)
+    ]
+    assert build_trips(None, legs) == []
+
+
+def test_tafb_per_diem_is_paid_per_hour_away():
+    """A TAFB rate adds per diem for each hour away; the default rules skip trips."""
+    legs = [_leg("BUR", "TPA", 0, 5.0), _leg("TPA", "BUR", 20, 5.0)]
+    as_of = date(2024, 5, 1)
+
+    default = RuleSet(DEFAULT_RULES).compile("ai_agent", as_of).evaluator_for("BUR", "Captain")
+    rules = RuleSet(DEFAULT_RULES).with_overrides([
+        PayRule("ai_agent", {"per_diem_per_tafb_hour": 2.25}, base="BUR")
+    ]).compile("ai_agent", as_of)
+
+    before = default.evaluate(10_000, legs)
+    after = rules.evaluator_for("BUR", "Captain").evaluate(10_000, legs)
+    elsewhere = rules.evaluator_for("TPA", "Captain").evaluate(10_000, legs)
+
+    assert before.tafb_hours is None and after.tafb_hours == 25.0
+    assert after.per_diem_pay_cents - before.per_diem_pay_cents == 25 * 225
+    assert after.gross_pay_cents - before.gross_pay_cents == 25 * 225
+    # The override only covers BUR
+    assert elsewhere.tafb_hours is None
+    assert elsewhere.per_diem_pay_cents == before.per_diem_pay_cents
+
+
+def test_sample_rule_pays_tafb_per_diem_in_batch(db_session):
+    """A batch under the shipped TAFB rule stores time away and pays per diem on it."""
+    crew = CrewMember(
+        employee_id="TAFB-1", first_name="Trip", last_name="Pay", position="Captain",
+        base="BUR", hourly_rate=100.0, status="active"
+    )
+    db_session.add(crew)
+    db_session.flush()
+    for origin, destination, hours_in in [("BUR", "TPA", 8), ("TPA", "FLL", 32), ("FLL", "BUR", 56)]:
+        departure = START + timedelta(hours=hours_in)
+        flight = Flight(
+            flight_number=f"TF{hours_in}", origin=origin, destination=destination,
+            scheduled_departure=departure, scheduled_arrival=departure + timedelta(hours=3),
+            is_red_eye=False, is_international=False
+        )
+        db_session.add(flight)
+        db_session.flush()
+        db_session.add(CrewAssignment(
+            crew_member_id=crew.id, flight_id=flight.id, position="Captain",
+            duty_start=departure, duty_end=departure + timedelta(hours=4), credit_hours=3.0
+        ))
+    db_session.commit()
+
+    period_end = START + timedelta(days=30)
+    rules = RuleSet.load(SAMPLE_RULES).compile("mainframe", START.date())
+    BatchProcessor(db_session, rules=rules).run_batch_job(
+        START, period_end, simulate_delay=False, shadow_sample_rate=0
+    )
+
+    payroll = db_session.query(PayrollRecord).filter(
+        PayrollRecord.crew_member_id == crew.id
+    ).one()
+    # Out at 08:00 on day one, back at 16:00 on day three
+    assert payroll.tafb_hours == 52.0
+    assert payroll.per_diem_pay_cents == 52 * 225
@@ -0,0 +1,140 @@
+"""
+Tests for event-driven payroll recompute.
+"""
+
+from datetime import datetime, timedelta
+import threading
+import time
+import pytest
+from agents import recompute
+from agents.recompute import RecomputeRunner
+from mainframe.batch_processor import BatchProcessor
+from models.database import CrewAssignment, CrewMember, Flight, PayrollRecord
+
+PERIOD_START = datetime(2006, 5, 1)
+PERIOD_END = datetime(2006, 5, 31)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    runner = RecomputeRunner(enabled=True, debounce_seconds=0.5, max_workers=1)
+    monkeypatch.setattr(recompute, "recompute_runner", runner)
+    yield runner
+    runner.shutdown()
+
+
+def _paid_crew_with_flight(db):
+    """A crew member with one flight and a mainframe payroll for the period."""
+    crew = CrewMember(
+        employee_id="RECOMP-1", first_name="Re", last_name="Compute",
+        position="Captain", base="BUR", hourly_rate=100.0, status="active"
+    )
+    departure = datetime(2006, 5, 3, 9)
+    flight = Flight(
+        flight_number="RC100", origin="BUR", destination="TPA",
+        scheduled_departure=departure, scheduled_arrival=departure + timedelta(hours=5),
+        is_red_eye=False, is_international=False
+    )
+    db.add_all([crew, flight])
+    db.flush()
+    assignment = CrewAssignment(
+        crew_member_id=crew.id, flight_id=flight.id, position="Captain",
+        duty_start=departure, duty_end=departure + timedelta(hours=6), credit_hours=5.0
+    )
+    db.add(assignment)
+    db.flush()
+    db.add(BatchProcessor(db).calculate_payroll(
+        crew, [assignment], PERIOD_START, PERIOD_END, 0.0
+    ))
+    db.commit()
+    return crew, flight, assignment
+
+
+def _wait_until_pending(runner, count=1, timeout=5.0):
+    # Tests share one connection with the runner, so never write while it resolves
+    deadline = time.monotonic() + timeout
+    while runner.stats()["pending"] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _payrolls(db, crew):
+    return db.query(PayrollRecord).filter(
+        PayrollRecord.crew_member_id == crew.id
+    ).order_by(PayrollRecord.id).all()
+
+
+def test_changes_are_debounced_into_one_recompute(db_session, runner):
+    """Several committed edits to a crew member's period trigger a single recalculation."""
+    crew, flight, assignment = _paid_crew_with_flight(db_session)
+    # Creating the payroll's own assignment counts as a change too
+    assert runner.wait_idle()
+    before = len(_payrolls(db_session, crew))
+
+    assignment.duty_start += timedelta(hours=1)
+    db_session.commit()
+    _wait_until_pending(runner)
+    flight.is_red_eye = True
+    db_session.commit()
+    assert runner.wait_idle()
+
+    payrolls = _payrolls(db_session, crew)
+    assert len(payrolls) == before + 1
+    latest = payrolls[-1]
+    assert (latest.period_start, latest.period_end) == (PERIOD_START, PERIOD_END)
+    assert latest.processing_system == "mainframe"
+    assert latest.premium_pay_cents > payrolls[0].premium_pay_cents
+    assert runner.stats()["debounced"] >= 1
+
+
+def test_rolled_back_and_out_of_period_changes_are_ignored(db_session, runner):
+    """Only committed changes inside a calculated period cause a recompute."""
+    crew, flight, assignment = _paid_crew_with_flight(db_session)
+    assert runner.wait_idle()
+    recomputed = runner.stats()["recomputed"]
+
+    assignment.credit_hours = 9.0
+    db_session.flush()
+    db_session.rollback()
+
+    db_session.add(CrewAssignment(
+        crew_member_id=crew.id, flight_id=flight.id, position="Captain",
+        duty_start=datetime(2006, 7, 1, 9), duty_end=datetime(2006, 7, 1, 15), credit_hours=5.0
+    ))
+    db_session.commit()
+    assert runner.wait_idle()
+
+    assert runner.stats()["recomputed"] == recomputed
+
+
+def test_shutdown_reruns_a_key_that_came_due_while_running(monkeypatch):
+    """Flushing on shutdown never runs a key twice at once; the running task repeats it."""
+    runner = RecomputeRunner(enabled=True, debounce_seconds=0, max_workers=2)
+    key = (1, PERIOD_START, PERIOD_END, "mainframe")
+    release = threading.Event()
+    calls, active = [], []
+
+    def recompute_once(k):
+        active.append(k)
+        calls.append(len(active))
+        release.wait(5)
+        active.remove(k)
+
+    monkeypatch.setattr(runner, "_resolve", lambda changes, flight_ids: {key})
+    monkeypatch.setattr(runner, "_recompute_once", recompute_once)
+
+    runner.notify({(1, PERIOD_START)}, set())
+    while not calls:
+        time.sleep(0.01)
+    runner.debounce_seconds = 60
+    runner.notify({(1, PERIOD_START)}, set())
+    _wait_until_pending(runner)
+
+    stopper = threading.Thread(target=runner.shutdown)
+    stopper.start()
+    time.sleep(0.1)
+    release.set()
+    stopper.join(5)
+
+    # Run twice, one after the other
+    assert calls == [1, 1]
+    assert runner.stats()["pending"] == 0 and runner.stats()["running"] == 0
@@ -0,0 +1,41 @@
+"""
+Tests for materialized payroll rollups.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from reporting.rollups import RollupAccumulator, get_rollups
+
+
+def test_rollups_group_by_base_and_position(db_session):
+    """Totals are grouped per base/position and replaced on re-run."""
+    period_start = datetime(2002, 3, 1)
+    period_end = datetime(2002, 3, 31)
+
+    captain = SimpleNamespace(base="BUR", position="Captain")
+    attendant = SimpleNamespace(base="TPA", position="Flight Attendant")
+
+    rollups = RollupAccumulator()
+    rollups.add(captain, 900_000, 50_000, 5_000)
+    rollups.add(captain, 800_000, 0, 0)
+    rollups.add(attendant, 400_010, 10_000, 7_500)
+    assert rollups.gross_pay_cents == 2_100_010
+    assert rollups.store(db_session, period_start, period_end, "mainframe") == 2
+
+    rows = get_rollups(db_session, period_start, period_end, "mainframe")
+    assert [(r.base, r.position, r.headcount) for r in rows] == [
+        ("BUR", "Captain", 2),
+        ("TPA", "Flight Attendant", 1),
+    ]
+    assert rows[0].gross_pay == 17000.0
+    assert rows[0].overtime_pay == 500.0
+
+    # A later batch for the same period supersedes the earlier totals
+    rerun = RollupAccumulator()
+    rerun.add(captain, 100_000, 0, 0)
+    rerun.store(db_session, period_start, period_end, "mainframe")
+
+    rows = get_rollups(db_session, period_start, period_end, "mainframe")
+    assert len(rows) == 1
+    assert rows[0].gross_pay == 1000.0
+    assert get_rollups(db_session, period_start, period_end, "ai_agent") == []
@@ -0,0 +1,116 @@
+"""
+Tests for the compiled pay rule engine.
+"""
+
+import json
+import pytest
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from rules.engine import DEFAULT_RULES, PayRule, RuleSet
+
+
+def _assignment(credit_hours: float, red_eye: bool = False, international: bool = False):
+    start = datetime(2024, 3, 1, 8)
+    return SimpleNamespace(
+        credit_hours=credit_hours,
+        duty_start=start,
+        duty_end=start + timedelta(hours=credit_hours + 2),
+        flight=SimpleNamespace(is_red_eye=red_eye, is_international=international)
+    )
+
+
+def test_default_rules_match_engine_constants():
+    """Built-in rules reproduce the engines' historic pay terms."""
+    assignments = [_assignment(40.0, red_eye=True), _assignment(45.0, international=True)]
+    rules = RuleSet(DEFAULT_RULES)
+
+    mainframe = rules.compile("mainframe", date(2024, 3, 1)).evaluator_for("BUR", "Captain")
+    pay = mainframe.evaluate(10_000, assignments)
+    assert pay.paid_hours == 85.0
+    assert pay.overtime_pay_cents == 10 * 10_000 * 3 // 2
+    assert pay.per_diem_pay_cents == 85 * 250
+    assert pay.premium_pay_cents == 5_000
+
+    ai_agent = rules.compile("ai_agent", date(2024, 3, 1)).evaluator_for("BUR", "Captain")
+    pay = ai_agent.evaluate(10_000, assignments)
+    assert pay.per_diem_days == 2.5
+    assert pay.per_diem_pay_cents == 12_500
+    assert pay.premium_pay_cents == 7_500
+
+
+def test_pay_is_exact_in_cents():
+    """Components are whole cents and always add up to gross pay exactly."""
+    evaluator = RuleSet(DEFAULT_RULES).compile("mainframe", date(2024, 3, 1)).evaluator_for("BUR", "Captain")
+
+    # 80h20m at $85.45/h: overtime of 5h20m is 5.333...h * 85.45 * 1.5
+    pay = evaluator.evaluate(8_545, [_assignment(80 + 1 / 3)])
+
+    assert pay.credit_minutes == 4_820
+    assert pay.base_pay_cents == 686_448          # 4820 * 8545 / 60 = 686448.33
+    assert pay.overtime_pay_cents == 68_360       # 320 * 8545 * 1.5 / 60 = 68360.0
+    assert pay.gross_pay_cents == (
+        pay.base_pay_cents + pay.per_diem_pay_cents
+        + pay.overtime_pay_cents + pay.premium_pay_cents
+    )
+
+
+def test_specific_and_later_rules_win():
+    """Base/position rules override engine-wide ones from their effective date."""
+    rules = RuleSet([
+        *DEFAULT_RULES,
+        PayRule("mainframe", {"guarantee_hours": 80.0}, base="BUR"),
+        PayRule("mainframe", {"red_eye_premium": 60.0}, position="Captain"),
+        PayRule("mainframe", {"red_eye_premium": 90.0}, base="BUR", position="Captain",
+                effective_date=date(2024, 6, 1)),
+    ])
+
+    before = rules.compile("mainframe", date(2024, 5, 31))
+    after = rules.compile("mainframe", date(2024, 6, 1))
+
+    assert before.evaluator_for("BUR", "Captain").guarantee_hours == 80.0
+    assert before.evaluator_for("BUR", "Captain").red_eye_premium == 60.0
+    assert after.evaluator_for("BUR", "Captain").red_eye_premium == 90.0
+    assert after.evaluator_for("TPA", "Captain").red_eye_premium == 60.0
+    assert after.evaluator_for("TPA", "First Officer").guarantee_hours == 75.0
+
+
+def test_overrides_beat_every_contract_rule():
+    """What-if overrides apply over specific, dated and versioned rules alike."""
+    rules = RuleSet([
+        *DEFAULT_RULES,
+        PayRule("mainframe", {"red_eye_premium": 90.0}, base="BUR", position="Captain",
+                contract_version="2024"),
+    ])
+    overridden = rules.with_overrides([
+        PayRule("mainframe", {"red_eye_premium": 100.0}, effective_date=date(2099, 1, 1)),
+        PayRule("mainframe", {"guarantee_hours": 80.0}, position="Captain"),
+    ])
+
+    compiled = overridden.compile("mainframe", date(2024, 6, 1), contract_version="2024")
+    assert compiled.evaluator_for("BUR", "Captain").red_eye_premium == 100.0
+    assert compiled.evaluator_for("BUR", "Captain").guarantee_hours == 80.0
+    assert compiled.evaluator_for("TPA", "First Officer").guarantee_hours == 75.0
+    assert len(rules.rules) == len(DEFAULT_RULES) + 1
+
+
+def test_contract_version_and_file_loading(tmp_path):
+    """Rules from PAY_RULES_PATH apply only to their contract version."""
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{
+        "system": "ai_agent",
+        "parameters": {"per_diem_per_day": 65.0},
+        "contract_version": "2025",
+        "effective_date": "2025-01-01"
+    }]))
+    rules = RuleSet.load(str(path))
+
+    current = rules.compile("ai_agent", date(2025, 2, 1), contract_version="2025")
+    legacy = rules.compile("ai_agent", date(2025, 2, 1), contract_version="2019")
+
+    assert current.evaluator_for("FLL", "Flight Attendant").per_diem_per_day == 65.0
+    assert legacy.evaluator_for("FLL", "Flight Attendant").per_diem_per_day == 50.0
+
+
+def test_unknown_parameter_rejected():
+    with pytest.raises(ValueError):
+        PayRule("mainframe", {"holiday_bonus": 100.0})
@@ -0,0 +1,127 @@
+"""
+Tests for payroll run fingerprints, digests and run diffs.
+"""
+
+from datetime import datetime, timedelta
+from comparison.runs import diff_runs, finish_run
+from mainframe.batch_processor import BatchProcessor
+from models.database import CrewAssignment, CrewMember, Flight, PayrollRecord, PayrollRun
+from models.fingerprint import MerkleDigest, record_fingerprint
+from rules.engine import PayRule, default_rule_set
+
+
+def test_fingerprint_covers_pay_content_only():
+    """Engine and timing do not change a fingerprint; any pay field does."""
+    pay = dict(credit_hours=80.5, paid_hours=80.5, base_pay_cents=805000,
+               per_diem_pay_cents=12000, overtime_pay_cents=0,
+               premium_pay_cents=5000, gross_pay_cents=822000)
+    mainframe = PayrollRecord(processing_system="mainframe", processing_time_seconds=0.2, **pay)
+    ai_agent = PayrollRecord(processing_system="ai_agent", processing_time_seconds=0.01, **pay)
+    assert record_fingerprint(mainframe) == record_fingerprint(ai_agent)
+
+    ai_agent.premium_pay_cents += 1
+    assert record_fingerprint(mainframe) != record_fingerprint(ai_agent)
+
+    def digest(leaves):
+        merkle = MerkleDigest()
+        for crew_member_id, fingerprint in leaves:
+            merkle.add(crew_member_id, fingerprint)
+        return merkle.hexdigest()
+
+    leaves = [(crew_id, crew_id * 7919) for crew_id in range(1, 12)]
+    assert digest(leaves) == digest(list(leaves))
+    assert digest(leaves) != digest(leaves[:-1] + [(11, 0)])
+    assert digest(leaves) != digest(leaves[:-1])
+
+
+def _crew(db, employee_id, red_eyes):
+    crew = CrewMember(
+        employee_id=employee_id, first_name="Run", last_name="Diff",
+        position="Captain", base="BUR", hourly_rate=100.0, status="active"
+    )
+    db.add(crew)
+    db.flush()
+    for i in range(red_eyes):
+        departure = datetime(2005, 3, 2 + i, 23)
+        flight = Flight(
+            flight_number=f"RUN{crew.id}{i}", origin="BUR", destination="TPA",
+            scheduled_departure=departure, scheduled_arrival=departure + timedelta(hours=5),
+            is_red_eye=True, is_international=False
+        )
+        db.add(flight)
+        db.flush()
+        db.add(CrewAssignment(
+            crew_member_id=crew.id, flight_id=flight.id, position="Captain",
+            duty_start=departure, duty_end=departure + timedelta(hours=6), credit_hours=5.0
+        ))
+    db.commit()
+    return crew
+
+
+def test_run_diff_finds_crew_whose_pay_changed(db_session):
+    """A rule change between runs shows up only for the crew it affects."""
+    _crew(db_session, "RUN-1", 0)
+    red_eye = _crew(db_session, "RUN-2", 2)
+    period_start, period_end = datetime(2005, 3, 1), datetime(2005, 3, 31)
+
+    def run(rules=None):
+        stats = BatchProcessor(db_session, rules=rules).run_batch_job(
+            period_start, period_end, simulate_delay=False, shadow_sample_rate=0
+        )
+        return db_session.get(PayrollRun, stats["run_id"])
+
+    first, rerun = run(), run()
+    assert first.status == "completed" and first.record_count == 2
+    assert first.digest == rerun.digest
+    assert diff_runs(db_session, first.id, rerun.id)["identical"]
+
+    changed = run(default_rule_set().with_overrides(
+        [PayRule("mainframe", {"red_eye_premium": 100.0})]
+    ).compile("mainframe", period_start.date()))
+    diff = diff_runs(db_session, first.id, changed.id)
+
+    assert not diff["identical"]
+    assert diff["crew_compared"] == 2
+    assert (diff["added"], diff["removed"]) == ([], [])
+    assert [crew["crew_member_id"] for crew in diff["changed"]] == [red_eye.id]
+    # $50 more per red-eye, reported in ComparisonAnalyzer's terms
+    fields = {d["field"]: d for d in diff["changed"][0]["differences"]}
+    assert set(fields) == {"gross_pay", "premium_pay"}
+    assert fields["premium_pay"]["difference"] == 100.0
+    assert fields["gross_pay"]["run_b"] - fields["gross_pay"]["run_a"] == 100.0
+    assert diff["gross_pay_delta"] == 100.0
+
+
+def test_duplicate_crew_records_use_the_latest(db_session):
+    """A second record for a crew member in a run replaces the first in digests and diffs."""
+    crew = _crew(db_session, "RUN-3", 1)
+    period_start, period_end = datetime(2005, 3, 1), datetime(2005, 3, 31)
+    processor = BatchProcessor(db_session)
+    first = db_session.get(PayrollRun, processor.run_batch_job(
+        period_start, period_end, simulate_delay=False, shadow_sample_rate=0
+    )["run_id"])
+    second = db_session.get(PayrollRun, processor.run_batch_job(
+        period_start, period_end, simulate_delay=False, shadow_sample_rate=0
+    )["run_id"])
+
+    # A later record for the same crew in the second run, e.g. a retried chunk
+    original = db_session.query(PayrollRecord).filter(PayrollRecord.run_id == second.id).one()
+    retried = PayrollRecord(
+        crew_member_id=crew.id, period_start=period_start, period_end=period_end,
+        run_id=second.id, processing_system="mainframe", processing_time_seconds=0.0,
+        **{field: getattr(original, field) for field in (
+            "credit_hours", "paid_hours", "base_pay_cents", "per_diem_pay_cents",
+            "overtime_pay_cents", "premium_pay_cents"
+        )},
+        gross_pay_cents=original.gross_pay_cents + 100
+    )
+    retried.fingerprint = record_fingerprint(retried)
+    db_session.add(retried)
+    db_session.commit()
+    finish_run(db_session, second)
+
+    assert second.record_count == 1
+    diff = diff_runs(db_session, first.id, second.id)
+    assert diff["crew_compared"] == 1
+    assert [crew["crew_member_id"] for crew in diff["changed"]] == [crew.id]
+    assert diff["gross_pay_delta"] == 1.0
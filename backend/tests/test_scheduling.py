@@ -0,0 +1,193 @@
+"""
+Tests for assignment scheduling helpers.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from models.cache import CrewSnapshot
+from models.database import CrewAssignment, CrewMember, Flight
+from scheduling.index import AssignmentIndex
+from scheduling.records import (
+    AssignmentRecord, FlightFlags, iter_active_crew_chunks, load_assignment_records
+)
+from scheduling.legality import (
+    DutyValidator, OVERLAP, INSUFFICIENT_REST, DUTY_TOO_LONG
+)
+
+
+def _at(hours: float) -> datetime:
+    return datetime(2024, 6, 1) + timedelta(hours=hours)
+
+
+def _duty(crew_id: int, start: float, end: float, duty_id: int = 0):
+    return SimpleNamespace(
+        id=duty_id,
+        crew_member_id=crew_id,
+        duty_start=_at(start),
+        duty_end=_at(end)
+    )
+
+
+def _ids(assignments):
+    return [a.id for a in assignments]
+
+
+def test_index_period_query():
+    """Period queries match the engines' duty_start BETWEEN filter."""
+    index = AssignmentIndex([
+        _duty(1, 48, 52, 3),
+        _duty(1, 0, 4, 1),
+        _duty(1, 24, 30, 2),
+        _duty(2, 24, 30, 4),
+    ])
+
+    assert len(index) == 4
+    assert _ids(index.in_period(1, _at(0), _at(24))) == [1, 2]
+    assert _ids(index.in_period(1, _at(1), _at(100))) == [2, 3]
+    assert index.in_period(99, _at(0), _at(100)) == []
+
+
+def test_index_overlap_query():
+    """Overlap queries include long duties that started much earlier."""
+    index = AssignmentIndex([
+        _duty(1, 0, 40, 1),   # long duty spanning the later ones
+        _duty(1, 10, 12, 2),
+        _duty(1, 20, 22, 3),
+        _duty(1, 50, 55, 4),
+    ])
+
+    assert _ids(index.overlapping(1, _at(21), _at(30))) == [1, 3]
+    assert _ids(index.overlapping(1, _at(40), _at(50))) == []
+    assert _ids(index.overlapping(1, _at(41), _at(60))) == [4]
+
+
+def test_index_overlap_query_matches_brute_force():
+    """The interval tree returns exactly the overlapping duties, in start order."""
+    rng = random.Random(7)
+    duties = [_duty(1, 0, 500, 0)] + [
+        _duty(1, start, start + rng.choice([0, 1, 3, 12]), i)
+        for i, start in enumerate(rng.sample(range(480), 200), 1)
+    ]
+    index = AssignmentIndex(list(duties))
+    in_order = sorted(duties, key=lambda d: (d.duty_start, d.duty_end))
+
+    for _ in range(200):
+        start = rng.uniform(-10, 510)
+        end = start + rng.uniform(0, 20)
+        expected = [d.id for d in in_order if d.duty_start < _at(end) and d.duty_end > _at(start)]
+        assert _ids(index.overlapping(1, _at(start), _at(end))) == expected
+
+
+def test_duty_validator_sweep():
+    """Overlaps, short rest and long duties are each flagged once."""
+    validator = DutyValidator(min_rest_hours=10, max_duty_hours=14)
+
+    violations = validator.validate_crew(1, [
+        _duty(1, 0, 20, 1),    # too long, and covers the next duty
+        _duty(1, 5, 8, 2),     # overlaps 1
+        _duty(1, 26, 30, 3),   # 6h after 1 ends
+        _duty(1, 45, 50, 4),   # 15h rest: legal
+    ])
+
+    assert [(v.kind, v.assignment_id, v.other_assignment_id) for v in violations] == [
+        (DUTY_TOO_LONG, 1, None),
+        (OVERLAP, 2, 1),
+        (INSUFFICIENT_REST, 3, 1),
+    ]
+
+
+def test_validate_index_skips_clean_crew():
+    """Fleet validation only reports crew with problems."""
+    index = AssignmentIndex([
+        _duty(1, 0, 4, 1),
+        _duty(1, 2, 6, 2),
+        _duty(2, 0, 4, 3),
+        _duty(2, 30, 34, 4),
+    ])
+
+    results = DutyValidator(min_rest_hours=10, max_duty_hours=14).validate_index(index)
+
+    assert list(results) == [1]
+    assert results[1][0].kind == OVERLAP
+
+
+def test_load_assignment_records(db_session):
+    """Batch loading yields slotted records with shared flight flags."""
+    start = datetime(2001, 4, 1)
+    red_eye = Flight(flight_number="XP901", is_red_eye=True, is_international=False)
+    db_session.add(red_eye)
+    db_session.flush()
+    db_session.add_all([
+        CrewAssignment(crew_member_id=1, flight_id=red_eye.id, credit_hours=3.5,
+                       duty_start=start + timedelta(hours=30), duty_end=start + timedelta(hours=35)),
+        CrewAssignment(crew_member_id=1, flight_id=None, credit_hours=2.0,
+                       duty_start=start, duty_end=start + timedelta(hours=3)),
+        CrewAssignment(crew_member_id=2, flight_id=red_eye.id, credit_hours=1.0,
+                       duty_start=start + timedelta(days=60), duty_end=start + timedelta(days=60, hours=2)),
+    ])
+    db_session.commit()
+
+    records = load_assignment_records(
+        db_session, start, start + timedelta(days=30), order_by_start=True
+    )
+
+    assert all(isinstance(r, AssignmentRecord) for r in records)
+    assert [r.credit_hours for r in records] == [2.0, 3.5]
+    assert records[0].flight is None
+    assert records[1].flight is FlightFlags.of(True, False)
+    assert not hasattr(records[1], "__dict__")
+
+
+def test_iter_active_crew_chunks(db_session):
+    """The active roster streams in id order, one bounded chunk at a time."""
+    tag = datetime.utcnow().strftime("%H%M%S%f")
+    crew = [
+        CrewMember(employee_id=f"CHK{tag}-{i}", first_name="Chunk", last_name=str(i),
+                   position="Captain", base="BUR", hourly_rate=90.0,
+                   status="inactive" if i == 2 else "active")
+        for i in range(5)
+    ]
+    db_session.add_all(crew)
+    db_session.commit()
+
+    chunks = list(iter_active_crew_chunks(db_session, chunk_size=2))
+    streamed = [snapshot for chunk in chunks for snapshot in chunk]
+    ids = [snapshot.id for snapshot in streamed]
+
+    assert all(1 <= len(chunk) <= 2 for chunk in chunks)
+    assert ids == sorted(ids)
+    assert [s.last_name for s in streamed if s.employee_id.startswith(f"CHK{tag}")] == ["0", "1", "3", "4"]
+    assert all(isinstance(s, CrewSnapshot) for s in streamed)
+
+
+def test_duty_violations_route_sweeps_active_crew_in_chunks(db_session, monkeypatch):
+    """The fleet check streams crew in chunks and skips inactive crew between them."""
+    from api.routes import list_duty_violations
+
+    monkeypatch.setenv("BATCH_CHUNK_SIZE", "1")
+    start = datetime(2001, 9, 1)
+    crew = [
+        CrewMember(employee_id=f"DV-{i}", first_name="Duty", last_name=str(i),
+                   position="Captain", base="BUR", hourly_rate=90.0,
+                   status="inactive" if i == 1 else "active")
+        for i in range(3)
+    ]
+    db_session.add_all(crew)
+    db_session.flush()
+    for member in crew:
+        db_session.add_all([
+            CrewAssignment(crew_member_id=member.id, credit_hours=3.0,
+                           duty_start=start, duty_end=start + timedelta(hours=4)),
+            CrewAssignment(crew_member_id=member.id, credit_hours=3.0,
+                           duty_start=start + timedelta(hours=2), duty_end=start + timedelta(hours=6)),
+        ])
+    db_session.commit()
+
+    response = list_duty_violations(start, start + timedelta(days=1), db_session)
+    violations = json.loads(response.body)
+
+    assert [(v["crew_member_id"], v["kind"]) for v in violations] == [
+        (crew[0].id, OVERLAP), (crew[2].id, OVERLAP)
+    ]
@@ -0,0 +1,65 @@
+"""
+Tests for the fast payroll response serialization path.
+"""
+
+import json
+from datetime import datetime
+from api.schemas import PayrollResponse
+from api.serialization import payroll_response, serialized
+from models.database import PayrollRecord
+
+
+def _payroll():
+    return PayrollRecord(
+        id=7,
+        crew_member_id=1,
+        period_start=datetime(2024, 5, 1),
+        period_end=datetime(2024, 5, 31),
+        credit_hours=80.0,
+        paid_hours=80.0,
+        base_pay=8000.0,
+        per_diem_pay=200.0,
+        overtime_pay=750.0,
+        premium_pay=50.0,
+        gross_pay=9000.0,
+        processing_system="mainframe",
+        processing_time_seconds=0.02,
+        processing_status="completed",
+        calculation_details="Mainframe batch calculation"
+    )
+
+
+def test_payroll_response_matches_validated_model():
+    """Attribute-built response equals the hand-built, validated one."""
+    payroll = _payroll()
+
+    fast = payroll_response(payroll, "Jane Smith", payroll.calculation_details)
+    validated = PayrollResponse(
+        payroll_id=7,
+        crew_member="Jane Smith",
+        period_start=payroll.period_start,
+        period_end=payroll.period_end,
+        credit_hours=80.0,
+        paid_hours=80.0,
+        base_pay=8000.0,
+        per_diem_pay=200.0,
+        overtime_pay=750.0,
+        premium_pay=50.0,
+        gross_pay=9000.0,
+        processing_system="mainframe",
+        processing_time_seconds=0.02,
+        processing_status="completed",
+        explanation="Mainframe batch calculation"
+    )
+
+    assert fast.model_dump() == validated.model_dump()
+
+
+def test_serialized_response_reports_timing():
+    """Encoded body matches the schema and carries a Server-Timing stage."""
+    response = serialized([payroll_response(_payroll(), "Jane Smith")])
+
+    body = json.loads(response.body)
+    assert body[0]["payroll_id"] == 7
+    assert body[0]["period_start"] == "2024-05-01T00:00:00"
+    assert response.headers["Server-Timing"].startswith("serialize;dur=")
@@ -0,0 +1,89 @@
+"""
+Tests for sampled shadow runs of the AI engine.
+"""
+
+import json
+import time
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from models.database import CrewMember
+from mainframe.batch_processor import BatchProcessor
+from comparison.shadow import ShadowRunner, get_drift_summaries
+
+
+@pytest.fixture
+def crew(db_session):
+    crew = CrewMember(
+        employee_id=f"SHD-{uuid.uuid4().hex[:8]}",
+        first_name="Shadow",
+        last_name="Tester",
+        position="Captain",
+        base="TPA",
+        hourly_rate=100.0,
+        status="active"
+    )
+    db_session.add(crew)
+    db_session.commit()
+    return crew
+
+
+def _red_eye(start: datetime, hours: float):
+    return SimpleNamespace(
+        id=None,
+        credit_hours=hours,
+        duty_start=start,
+        duty_end=start + timedelta(hours=hours),
+        flight=SimpleNamespace(is_red_eye=True, is_international=False)
+    )
+
+
+def test_shadow_batch_stores_drift_summary(db_session, crew):
+    """Sampled crew are re-run by the AI engine and summarized off the batch thread."""
+    period_start = datetime(2003, 1, 1)
+    period_end = datetime(2003, 1, 31)
+    assignments = [_red_eye(datetime(2003, 1, 5), 80.0)]
+
+    runner = ShadowRunner(max_workers=1)
+    shadow = runner.start_batch(period_start, period_end, sample_rate=1.0)
+
+    mainframe = BatchProcessor(db_session).calculate_payroll(
+        crew, assignments, period_start, period_end, time.time()
+    )
+    assert shadow.should_sample()
+    assert shadow.submit(crew, mainframe, assignments)
+    shadow.close().result(timeout=10)
+    runner.shutdown()
+
+    summary = get_drift_summaries(db_session, period_start, period_end)[0]
+    assert summary.id == shadow.summary_id
+    assert summary.status == "completed"
+    assert (summary.crew_offered, summary.sampled, summary.compared) == (1, 1, 1)
+
+    # The engines' per diem and red-eye terms differ, so the gross pay drifts
+    assert summary.mismatches == 1
+    assert summary.max_difference_crew_member_id == crew.id
+    assert summary.max_difference_cents == summary.total_difference_cents > 0
+    assert json.loads(summary.field_mismatches)["premium_pay"] == 1
+    assert runner.stats()["compared"] == 1
+
+
+def test_shadow_skips_when_queue_full(db_session, crew):
+    """A full shadow queue drops samples instead of blocking the batch."""
+    period_start = datetime(2003, 2, 1)
+    period_end = datetime(2003, 2, 28)
+
+    runner = ShadowRunner(max_pending=0)
+    shadow = runner.start_batch(period_start, period_end, sample_rate=1.0)
+    mainframe = BatchProcessor(db_session).calculate_payroll(
+        crew, [], period_start, period_end, time.time()
+    )
+
+    assert shadow.submit(crew, mainframe, []) is False
+    shadow.close().result(timeout=10)
+    runner.shutdown()
+
+    summary = get_drift_summaries(db_session, period_start, period_end)[0]
+    assert (summary.sampled, summary.skipped, summary.compared) == (0, 1, 0)
+    assert ShadowRunner(sample_rate=0).start_batch(period_start, period_end) is None
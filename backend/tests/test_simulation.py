@@ -0,0 +1,55 @@
+"""
+Tests for what-if payroll simulation.
+"""
+
+from datetime import datetime, timedelta
+from models.database import CrewAssignment, CrewMember, Flight, PayrollRecord
+from rules.engine import PayRule
+from rules.simulation import simulate_rule_changes
+
+
+def _crew_with_red_eyes(db, base, position, red_eyes):
+    crew = CrewMember(
+        employee_id=f"SIM-{base}-{position}", first_name="Sim", last_name="Crew",
+        position=position, base=base, hourly_rate=100.0, status="active"
+    )
+    db.add(crew)
+    db.flush()
+    for i in range(red_eyes):
+        departure = datetime(2004, 1, 2 + i, 23)
+        flight = Flight(
+            flight_number=f"SIM{crew.id}{i}", origin="TPA", destination="BUR",
+            scheduled_departure=departure, scheduled_arrival=departure + timedelta(hours=5),
+            is_red_eye=True, is_international=False
+        )
+        db.add(flight)
+        db.flush()
+        db.add(CrewAssignment(
+            crew_member_id=crew.id, flight_id=flight.id, position=position,
+            duty_start=departure, duty_end=departure + timedelta(hours=6), credit_hours=5.0
+        ))
+    db.commit()
+    return crew
+
+
+def test_simulation_reports_deltas_without_persisting(db_session):
+    """Overrides change pay only in memory; deltas are grouped by base and position."""
+    _crew_with_red_eyes(db_session, "BUR", "Captain", 2)
+    _crew_with_red_eyes(db_session, "TPA", "First Officer", 1)
+    period_start, period_end = datetime(2004, 1, 1), datetime(2004, 1, 31)
+
+    result = simulate_rule_changes(
+        db_session, "mainframe", period_start, period_end,
+        [PayRule("mainframe", {"red_eye_premium": 100.0}),
+         PayRule("mainframe", {"guarantee_hours": 80.0}, position="Captain")]
+    )
+
+    captains = result.groups[("BUR", "Captain")]
+    officers = result.groups[("TPA", "First Officer")]
+    assert (captains.headcount, officers.headcount) == (1, 1)
+    # $50 more per red-eye, plus 5 more guaranteed hours at $100 for the captain
+    assert captains.delta_cents("premium_pay_cents") == 2 * 5000
+    assert captains.delta_cents("base_pay_cents") == 5 * 10000
+    assert officers.delta_cents("gross_pay_cents") == 5000
+    assert result.total_cents("scenario") - result.total_cents("baseline") == 65000
+    assert db_session.query(PayrollRecord).count() == 0
@@ -9,15 +9,24 @@ This script demonstrates:
 
 Usage:
     python demo/demo_script.py
+    python demo/demo_script.py --benchmark [--sample 50] [--concurrency 8] [--json PATH]
+
+Benchmark mode skips the walkthrough: it processes a sample of crew through
+both engines concurrently, prints latency/throughput statistics and the ROI
+table built from them, and saves the raw measurements as JSON.
 """
 
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
+import argparse
 import requests
 import time
 import json
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from rich.console import Console
 from rich.table import Table
@@ -25,12 +34,24 @@ from rich.panel import Panel
 from rich.progress import Progress
 from rich import print as rprint
 
+from load_test import percentile
+
 console = Console()
 
 # Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api/v1")
 # For Railway deployment, set: API_BASE_URL=https://your-app.railway.app/api/v1
 
+# Crew sampled to measure the ROI step's processing numbers in the walkthrough
+ROI_BENCHMARK_SAMPLE = int(os.getenv("ROI_BENCHMARK_SAMPLE", "10"))
+# Fleet size the measured throughput is projected onto
+FLEET_SIZE = int(os.getenv("FLEET_SIZE", "1200"))
+
+ENGINES = {
+    "mainframe": "/mainframe/process",
+    "ai_agent": "/ai-agent/process",
+}
+
 def clear_screen():
     """Clear terminal screen."""
     import os
@@ -341,62 +362,246 @@ def demo_step_3_comparison(crew_id):
     
     return comparison
 
-def demo_step_4_roi():
-    """Demo Step 4: ROI and Business Impact"""
-    clear_screen()
-    
-    console.print("\n")
-    console.print(Panel.fit(
-        "[bold blue]Step 4: Business Impact & ROI[/bold blue]\n"
-        "Financial benefits for Avelo Airlines",
-        border_style="blue"
-    ))
-    
-    console.print("\n[bold yellow]📊 Projected Annual Savings:[/bold yellow]\n")
-    
-    # ROI Table
-    roi_table = Table(title="Annual ROI Analysis")
-    roi_table.add_column("Category", style="cyan")
-    roi_table.add_column("Current (Mainframe)", style="red")
-    roi_table.add_column("With AI Agents", style="green")
-    roi_table.add_column("Savings", style="yellow")
+def _distribution(values):
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+def run_benchmark(sample=50, concurrency=8, period_start=None, period_end=None):
+    """
+    Process a sample of crew through both engines concurrently.
+    
+    Requests for both engines share one thread pool. requests.Session is
+    not documented as thread-safe, so each worker thread gets its own
+    keep-alive session. Returns the raw per-request measurements and a
+    per-engine summary of client latency, server processing time and
+    throughput.
+    """
+    period_start = period_start or datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period_end = period_end or period_start + timedelta(days=30)
+    
+    response = requests.get(f"{API_BASE_URL}/crew", params={"limit": sample}, timeout=30)
+    response.raise_for_status()
+    crew_ids = [crew['id'] for crew in response.json()]
+    if not crew_ids:
+        raise RuntimeError("No crew members found. Please load sample data first.")
+    
+    local = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+    
+    def worker_session():
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+            with sessions_lock:
+                sessions.append(session)
+        return session
+    
+    def process(engine, crew_id):
+        started = time.perf_counter()
+        measurement = {"engine": engine, "crew_member_id": crew_id}
+        try:
+            reply = worker_session().post(
+                f"{API_BASE_URL}{ENGINES[engine]}",
+                json={
+                    "crew_member_id": crew_id,
+                    "period_start": period_start.isoformat(),
+                    "period_end": period_end.isoformat(),
+                    "system": engine
+                },
+                timeout=120
+            )
+            measurement["status"] = reply.status_code
+            if reply.ok:
+                result = reply.json()
+                measurement["processing_time_seconds"] = result['processing_time_seconds']
+                measurement["gross_pay"] = result['gross_pay']
+        except requests.RequestException as e:
+            measurement["status"] = type(e).__name__
+        finished = time.perf_counter()
+        measurement["start_offset_seconds"] = started
+        measurement["latency_seconds"] = finished - started
+        return measurement
+    
+    # Interleave the engines so both are under load for the whole run
+    jobs = [(engine, crew_id) for crew_id in crew_ids for engine in ENGINES]
+    run_start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            measurements = list(pool.map(lambda job: process(*job), jobs))
+        wall_time = time.perf_counter() - run_start
+    finally:
+        for session in sessions:
+            session.close()
+    
+    for m in measurements:
+        m["start_offset_seconds"] -= run_start
+    
+    summary = {}
+    for engine in ENGINES:
+        rows = [m for m in measurements if m["engine"] == engine]
+        ok = [m for m in rows if m["status"] == 200]
+        span = (
+            max(m["start_offset_seconds"] + m["latency_seconds"] for m in rows) - min(m["start_offset_seconds"] for m in rows)
+            if rows else 0.0
+        )
+        summary[engine] = {
+            "requests": len(rows),
+            "succeeded": len(ok),
+            "failed": len(rows) - len(ok),
+            "throughput_per_second": len(ok) / span if span else 0.0,
+            "latency_seconds": _distribution([m["latency_seconds"] for m in ok]),
+            "processing_time_seconds": _distribution([m["processing_time_seconds"] for m in ok]),
+            "gross_pay_total": round(sum(m["gross_pay"] for m in ok), 2),
+        }
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "api_base_url": API_BASE_URL,
+        "period_start": period_start.isoformat(),
+        "period_end": period_end.isoformat(),
+        "sample": len(crew_ids),
+        "concurrency": concurrency,
+        "wall_time_seconds": wall_time,
+        "summary": summary,
+        "measurements": measurements,
+    }
+
+def benchmark_table(benchmark):
+    """Latency and throughput per engine."""
+    table = Table(title=f"Benchmark: {benchmark['sample']} crew, {benchmark['concurrency']} concurrent requests")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Mainframe", style="red", justify="right")
+    table.add_column("AI Agent", style="green", justify="right")
+    
+    mf = benchmark['summary']['mainframe']
+    ai = benchmark['summary']['ai_agent']
+    
+    table.add_row("Succeeded / failed", f"{mf['succeeded']} / {mf['failed']}", f"{ai['succeeded']} / {ai['failed']}")
+    table.add_row("Throughput", f"{mf['throughput_per_second']:.1f} crew/s", f"{ai['throughput_per_second']:.1f} crew/s")
+    for pct in ("p50", "p95", "p99"):
+        table.add_row(
+            f"Latency {pct}",
+            f"{mf['latency_seconds'][pct] * 1000:.0f} ms",
+            f"{ai['latency_seconds'][pct] * 1000:.0f} ms"
+        )
+    table.add_row(
+        "Server processing p50",
+        f"{mf['processing_time_seconds']['p50'] * 1000:.0f} ms",
+        f"{ai['processing_time_seconds']['p50'] * 1000:.0f} ms"
+    )
+    table.add_row("Gross pay total", f"${mf['gross_pay_total']:,.2f}", f"${ai['gross_pay_total']:,.2f}")
+    return table
+
+def _faster(before, after):
+    return f"{(before - after) / before * 100:.0f}% faster" if before > 0 else "-"
+
+def roi_table(benchmark):
+    """Annual ROI table; processing rows come from the benchmark measurements."""
+    table = Table(title="Annual ROI Analysis")
+    table.add_column("Category", style="cyan")
+    table.add_column("Current (Mainframe)", style="red")
+    table.add_column("With AI Agents", style="green")
+    table.add_column("Savings", style="yellow")
+    
+    mf = benchmark['summary']['mainframe']
+    ai = benchmark['summary']['ai_agent']
+    mf_latency = mf['latency_seconds']['p50']
+    ai_latency = ai['latency_seconds']['p50']
+    mf_run = FLEET_SIZE / mf['throughput_per_second'] if mf['throughput_per_second'] else 0.0
+    ai_run = FLEET_SIZE / ai['throughput_per_second'] if ai['throughput_per_second'] else 0.0
     
-    roi_table.add_row(
+    table.add_row(
         "Pay Disputes/Claims",
         "~1,200/year",
         "<60/year",
         "95% reduction"
     )
     
-    roi_table.add_row(
-        "Processing Time",
-        "40 hrs/payroll",
-        "12 hrs/payroll",
-        "70% faster"
+    table.add_row(
+        "Time per Crew (p50)",
+        f"{mf_latency * 1000:.0f} ms",
+        f"{ai_latency * 1000:.0f} ms",
+        _faster(mf_latency, ai_latency)
     )
     
-    roi_table.add_row(
+    table.add_row(
+        f"Payroll Run ({FLEET_SIZE:,} crew)",
+        f"{mf_run / 60:.1f} min",
+        f"{ai_run / 60:.1f} min",
+        _faster(mf_run, ai_run)
+    )
+    
+    table.add_row(
         "Error Rate",
         "~5%",
         "<1%",
         "80% improvement"
     )
     
-    roi_table.add_row(
+    table.add_row(
         "Compliance Issues",
         "~12/year",
         "0",
         "100% compliant"
     )
     
-    roi_table.add_row(
+    table.add_row(
         "[bold]Annual Cost Savings[/bold]",
         "-",
         "-",
         "[bold]$600,000[/bold]"
     )
     
-    console.print(roi_table)
+    return table
+
+def save_benchmark(benchmark, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(benchmark, f, indent=2)
+
+def benchmark_mode(sample, concurrency, json_path):
+    """Non-interactive benchmark: measure, print the tables and export JSON."""
+    console.print(f"[cyan]Benchmarking {sample} crew through both engines ({concurrency} concurrent requests)...[/cyan]")
+    benchmark = run_benchmark(sample=sample, concurrency=concurrency)
+    
+    console.print(f"\nCompleted in {benchmark['wall_time_seconds']:.1f}s\n")
+    console.print(benchmark_table(benchmark))
+    console.print(roi_table(benchmark))
+    
+    save_benchmark(benchmark, json_path)
+    console.print(f"[green]📁 Raw measurements saved to {json_path}[/green]\n")
+
+def demo_step_4_roi():
+    """Demo Step 4: ROI and Business Impact"""
+    clear_screen()
+    
+    console.print("\n")
+    console.print(Panel.fit(
+        "[bold blue]Step 4: Business Impact & ROI[/bold blue]\n"
+        "Financial benefits for Avelo Airlines",
+        border_style="blue"
+    ))
+    
+    console.print(f"\n[cyan]Measuring both engines on {ROI_BENCHMARK_SAMPLE} crew members...[/cyan]")
+    try:
+        benchmark = run_benchmark(sample=ROI_BENCHMARK_SAMPLE)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return None
+    
+    console.print(benchmark_table(benchmark))
+    
+    console.print("\n[bold yellow]📊 Projected Annual Savings:[/bold yellow]\n")
+    
+    console.print(roi_table(benchmark))
     
     console.print("\n[bold yellow]💡 Key Benefits:[/bold yellow]")
     console.print("✅ Eliminate 95% of daily crew pay claims")
@@ -413,6 +618,8 @@ def demo_step_4_roi():
     console.print("• Weeks 13-16: Full rollout\n")
     
     input("Press Enter to complete demo...")
+    
+    return benchmark
 
 def demo_conclusion():
     """Demo conclusion."""
@@ -434,7 +641,14 @@ def demo_conclusion():
     console.print("\n[bold]Thank you for watching this demo![/bold]\n")
 
 def main():
-    """Run complete demo."""
+    """Run complete demo, or the benchmark with --benchmark."""
+    parser = argparse.ArgumentParser(description="Crew pay demo")
+    parser.add_argument("--benchmark", action="store_true", help="run the non-interactive benchmark only")
+    parser.add_argument("--sample", type=int, default=50, help="crew members to benchmark")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent benchmark requests")
+    parser.add_argument("--json", default="demo/results/benchmark.json", help="benchmark results file")
+    args = parser.parse_args()
+    
     try:
         # Check API health
         response = requests.get(f"{API_BASE_URL}/health", timeout=5)
@@ -443,6 +657,10 @@ def main():
             console.print(f"[yellow]Expected API at: {API_BASE_URL}[/yellow]")
             return
         
+        if args.benchmark:
+            benchmark_mode(args.sample, args.concurrency, args.json)
+            return
+        
         # Run demo steps
         demo_intro()
         
@@ -472,7 +690,7 @@ def main():
         if not comparison:
             return
         
-        demo_step_4_roi()
+        benchmark = demo_step_4_roi()
         demo_conclusion()
         
         # Save results
@@ -482,6 +700,7 @@ def main():
                 "mainframe": mainframe_result,
                 "ai_agent": ai_result,
                 "comparison": comparison,
+                "benchmark": benchmark,
                 "timestamp": datetime.now().isoformat()
             }, f, indent=2)
         